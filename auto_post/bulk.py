@@ -0,0 +1,184 @@
+"""
+Bulk processing for the catalogue maintenance scripts (fix_titles.py,
+backfill_landing_links.py).
+
+Work runs in two phases:
+    compute   the per-post Gemini call, for many posts at once: posts go out
+              in batches of BULK_BATCH_SIZE over BULK_WORKERS threads (the
+              gateway in llm.py still applies the Gemini rate limits)
+    apply     the Sanity writes, afterwards: apply_mutations() sends them as
+              batched transactions (mutations.py), apply() one at a time
+
+Both phases record progress in a checkpoint (BULK_STATE_DIR/<name>.json)
+after every batch or write, so an interrupted run picks up where it stopped,
+and the results of a dry run are reused by the --apply run that follows.
+The checkpoint is removed once an apply run completes without failures.
+Key items with input_key() so a post edited since its result was computed
+gets a new key, and is recomputed instead of overwritten with a stale result.
+"""
+
+import os
+import json
+import time
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, Sequence, Tuple, TypeVar
+
+from .config import BULK_STATE_DIR, BULK_WORKERS, BULK_BATCH_SIZE
+from .mutations import MutationBatcher
+from .utils import write_json_atomic
+
+T = TypeVar('T')
+
+
+def input_key(item_id: str, *inputs: Any) -> str:
+    """Checkpoint key for an item: its ID plus a hash of the inputs its
+    result is computed from."""
+    payload = json.dumps(inputs, sort_keys=True, ensure_ascii=False, default=str)
+    return f"{item_id}:{hashlib.sha256(payload.encode('utf-8')).hexdigest()[:16]}"
+
+
+class BulkCheckpoint:
+    """Computed results and applied keys of one bulk job, saved as JSON."""
+
+    def __init__(self, name: str, state_dir: str = BULK_STATE_DIR):
+        self.path = os.path.join(state_dir, f'{name}.json')
+        self.results: Dict[str, Any] = {}
+        self.applied = set()
+        self._lock = threading.Lock()
+        if os.path.exists(self.path):
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                self.results = data.get('results', {})
+                self.applied = set(data.get('applied', []))
+            except (OSError, ValueError) as e:
+                print(f"  Ignoring unreadable checkpoint {self.path}: {e}")
+
+    def save(self) -> None:
+        with self._lock:
+            data = {'results': self.results, 'applied': sorted(self.applied), 'saved_at': time.time()}
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            write_json_atomic(self.path, data, ensure_ascii=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self.results, self.applied = {}, set()
+            if os.path.exists(self.path):
+                os.remove(self.path)
+
+
+class BulkRunner:
+    """Compute-then-apply over a list of items, checkpointed by item key."""
+
+    def __init__(self, name: str, workers: int = BULK_WORKERS, batch_size: int = BULK_BATCH_SIZE,
+                 fresh: bool = False):
+        self.name = name
+        self.workers = max(1, workers)
+        self.batch_size = max(1, batch_size)
+        self.checkpoint = BulkCheckpoint(name)
+        if fresh:
+            self.checkpoint.clear()
+
+    def _work(self, work: Callable[[T], Any], item: T) -> Any:
+        try:
+            return work(item)
+        except Exception as e:
+            print(f"  Error: {e}")
+            return None
+
+    def compute(self, items: Sequence[T], key: Callable[[T], str], work: Callable[[T], Any],
+                on_result: Optional[Callable[[T, Any], None]] = None) -> Dict[str, Any]:
+        """Run work(item) for every item without a checkpointed result, a batch at a
+        time. A None result (or an exception) isn't checkpointed, so the item is
+        retried next run. on_result(item, result) is called in this thread, in
+        item order, for every item (checkpointed ones included).
+        Returns {key: result} for the items that have one."""
+        results = self.checkpoint.results
+        pending = [item for item in items if key(item) not in results]
+        done = len(items) - len(pending)
+        if done:
+            print(f"{self.name}: {done} of {len(items)} result(s) restored from checkpoint")
+        if pending:
+            print(f"{self.name}: computing {len(pending)} item(s) in batches of {self.batch_size} "
+                  f"({self.workers} worker(s))")
+
+        started = time.monotonic()
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            for start in range(0, len(pending), self.batch_size):
+                batch = pending[start:start + self.batch_size]
+                outputs = list(executor.map(lambda item: self._work(work, item), batch))
+                for item, output in zip(batch, outputs):
+                    if output is not None:
+                        results[key(item)] = output
+                self.checkpoint.save()
+                finished = start + len(batch)
+                elapsed = time.monotonic() - started
+                print(f"  [{done + finished}/{len(items)}] {finished / elapsed:.1f} item(s)/s")
+
+        if on_result:
+            for item in items:
+                if key(item) in results:
+                    on_result(item, results[key(item)])
+        return {key(item): results[key(item)] for item in items if key(item) in results}
+
+    def apply(self, items: Sequence[T], key: Callable[[T], str], fn: Callable[[T], bool]) -> Tuple[int, int, int]:
+        """Run fn(item) for each item not applied yet, recording each success.
+        Returns (applied, skipped as already applied, failed)."""
+        applied = skipped = failed = 0
+        for item in items:
+            item_key = key(item)
+            if item_key in self.checkpoint.applied:
+                skipped += 1
+                continue
+            try:
+                ok = fn(item)
+            except Exception as e:
+                print(f"  Error: {e}")
+                ok = False
+            if ok:
+                self.checkpoint.applied.add(item_key)
+                self.checkpoint.save()
+                applied += 1
+            else:
+                failed += 1
+        if skipped:
+            print(f"{self.name}: {skipped} item(s) already applied in an earlier run")
+        if not failed:
+            self.checkpoint.clear()
+        return applied, skipped, failed
+
+    def apply_mutations(self, items: Sequence[T], key: Callable[[T], str], mutation: Callable[[T], Dict],
+                        label: Optional[Callable[[T], str]] = None) -> Tuple[int, int, int]:
+        """Like apply(), with mutation(item) written to Sanity in batched
+        transactions; the checkpoint is saved after every request.
+        Returns (applied, skipped as already applied, failed)."""
+        labels = {key(item): (label or key)(item) for item in items}
+        counts = {'applied': 0, 'failed': 0}
+
+        def record(outcomes):
+            for outcome in outcomes:
+                if outcome.ok:
+                    self.checkpoint.applied.add(outcome.ref)
+                    counts['applied'] += 1
+                    print(f"  UPDATED: {labels[outcome.ref][:60]}")
+                else:
+                    counts['failed'] += 1
+                    print(f"  FAILED: {labels[outcome.ref][:60]} - {outcome.error}")
+            self.checkpoint.save()
+
+        skipped = 0
+        with MutationBatcher(on_results=record) as batcher:
+            for item in items:
+                item_key = key(item)
+                if item_key in self.checkpoint.applied:
+                    skipped += 1
+                    continue
+                batcher.add(mutation(item), ref=item_key)
+        if skipped:
+            print(f"{self.name}: {skipped} item(s) already applied in an earlier run")
+        print(batcher.summary())
+        if not counts['failed']:
+            self.checkpoint.clear()
+        return counts['applied'], skipped, counts['failed']
@@ -18,9 +18,31 @@ SANITY_HEADERS = {
     'Authorization': f"Bearer {SANITY_TOKEN}",
     'Content-Type': 'application/json'
 }
+# Mutations are sent as transactions by mutations.py
+SANITY_BATCH_SIZE = int(os.environ.get('SANITY_BATCH_SIZE', '50'))                  # mutations per transaction
+SANITY_MUTATION_VISIBILITY = os.environ.get('SANITY_MUTATION_VISIBILITY', 'async')  # sync | async | deferred
+SANITY_MUTATION_RETRIES = int(os.environ.get('SANITY_MUTATION_RETRIES', '3'))       # retries of 429/5xx/network errors
 
 # --- GEMINI CONFIGURATION ---
 GEMINI_API_KEY = os.environ.get('GEMINI_API_KEY', '')
+# Every Gemini/Imagen call goes through the gateway in llm.py
+LLM_MAX_RETRIES = int(os.environ.get('LLM_MAX_RETRIES', '2'))  # retries of 429/5xx responses per call
+# Requests per minute allowed per model (missing or 0 = no limit); concurrency is API_CONCURRENCY
+LLM_MODEL_RPM = {
+    'gemini-3-flash-preview': float(os.environ.get('GEMINI_FLASH_RPM', '60')),
+    'gemini-2.5-flash': float(os.environ.get('GEMINI_25_FLASH_RPM', '60')),
+    'imagen-4.0-generate-001': float(os.environ.get('IMAGEN_RPM', '20')),
+}
+# Opt-in on-disk cache of identical Gemini text requests (see llm_cache.py)
+LLM_CACHE_ENABLED = os.environ.get('LLM_CACHE_ENABLED', 'false').lower() == 'true'
+LLM_CACHE_BYPASS = os.environ.get('LLM_CACHE_BYPASS', 'false').lower() == 'true'  # skip lookups, still store fresh responses
+LLM_CACHE_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'llm_cache.db')
+LLM_CACHE_TTL = float(os.environ.get('LLM_CACHE_TTL', '168'))       # hours a response is reused
+LLM_CACHE_MAX_MB = float(os.environ.get('LLM_CACHE_MAX_MB', '50'))  # least recently used responses evicted past this
+# Bulk maintenance scripts (fix_titles.py, backfill_landing_links.py, see bulk.py)
+BULK_WORKERS = int(os.environ.get('BULK_WORKERS', '4'))            # Gemini calls in flight at once
+BULK_BATCH_SIZE = int(os.environ.get('BULK_BATCH_SIZE', '20'))     # posts per checkpointed batch
+BULK_STATE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), '.bulk_state')
 
 # --- ARGIL CONFIGURATION ---
 ARGIL_API_KEY = os.environ.get('ARGIL_API_KEY', '')
@@ -31,24 +53,87 @@ ARGIL_BASE_URL = 'https://api.argil.ai/v1'
 USEAPI_TOKEN = os.environ.get('USEAPI_TOKEN', '')
 USEAPI_GOOGLE_EMAIL = os.environ.get('USEAPI_GOOGLE_EMAIL', '')
 USEAPI_BASE_URL = 'https://api.useapi.net/v1/google-flow'
+# Account-wide limits shared by every Flow caller in the process (see flow_client.py)
+FLOW_ACCOUNT_CONCURRENCY = int(os.environ.get('FLOW_ACCOUNT_CONCURRENCY', '2'))        # Flow requests in flight at once
+FLOW_REQUESTS_PER_MINUTE = float(os.environ.get('FLOW_REQUESTS_PER_MINUTE', '20'))     # token bucket rate
+FLOW_CAPTCHA_RETRIES = int(os.environ.get('FLOW_CAPTCHA_RETRIES', '8'))                # captcha failures before a request gives up
+FLOW_CAPTCHA_BACKOFF = float(os.environ.get('FLOW_CAPTCHA_BACKOFF', '5'))              # first account-wide pause (seconds), doubles per failure
+FLOW_CAPTCHA_BACKOFF_MAX = float(os.environ.get('FLOW_CAPTCHA_BACKOFF_MAX', '120'))    # longest pause
+FLOW_REFERENCE_CACHE_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'flow_reference_cache.json')
+FLOW_REFERENCE_CACHE_TTL = float(os.environ.get('FLOW_REFERENCE_CACHE_TTL', '72'))  # hours an uploaded reference image is reused
 
 # --- VIDEO GENERATION CONFIGURATION ---
 ENABLE_VIDEO_GENERATION = os.environ.get('ENABLE_VIDEO_GENERATION', 'true').lower() == 'true'
 VIDEO_SEED_MODE = os.environ.get('VIDEO_SEED_MODE', 'r2v')  # 'r2v' (reference only, natural animation) or 'i2v' (startImage, can cause mouth artifacts)
+VIDEO_CONCAT_MODE = os.environ.get('VIDEO_CONCAT_MODE', 'server')  # 'server' (Flow concatenate, no fades) or 'local' (ffmpeg crossfades + hook text, one encode)
 _BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 VIDEOS_DIR = os.path.join(_BASE_DIR, 'videos')
 SPOKESPERSON_IMAGES_DIR = os.path.join(_BASE_DIR, 'assets')
+# Local ffmpeg encodes share one scheduler (see encoding.py); 0 = derive from the core count
+ENCODE_MAX_JOBS = int(os.environ.get('ENCODE_MAX_JOBS', '0'))   # ffmpeg processes at once
+ENCODE_THREADS = int(os.environ.get('ENCODE_THREADS', '0'))     # -threads given to each ffmpeg process
+ENCODE_HWACCEL = os.environ.get('ENCODE_HWACCEL', 'false').lower() == 'true'  # use a hardware H.264 encoder if ffmpeg lists one
+# Scene image candidates are scored against ref_front.png (see face_scoring.py)
+FACE_SCORING_WORKERS = int(os.environ.get('FACE_SCORING_WORKERS', '4'))    # candidates downloaded/scored at once
+VIDEO_STATE_DIR = os.path.join(VIDEOS_DIR, '.state')                          # per-video Flow checkpoints (see video_state.py)
+VIDEO_STATE_MAX_AGE = float(os.environ.get('VIDEO_STATE_MAX_AGE', '48'))     # hours before a checkpoint is discarded
+# Video jobs are queued by run.py and generated by video_worker.py (see video_queue.py)
+VIDEO_QUEUE_FILE = os.path.join(_BASE_DIR, 'video_queue.db')
+VIDEO_WORKER_CONCURRENCY = int(os.environ.get('VIDEO_WORKER_CONCURRENCY', '1'))  # video jobs run at once (each renders 3 variants)
+VIDEO_JOB_LEASE = float(os.environ.get('VIDEO_JOB_LEASE', '600'))               # seconds a claim stays valid without renewal
+VIDEO_JOB_MAX_ATTEMPTS = int(os.environ.get('VIDEO_JOB_MAX_ATTEMPTS', '3'))     # attempts before a job is marked failed
+VIDEO_JOB_RETRY_DELAY = float(os.environ.get('VIDEO_JOB_RETRY_DELAY', '300'))  # seconds before a failed job is retried, doubled per attempt
+
+# --- HTTP TRANSPORT (shared pooled session, see transport.py) ---
+HTTP_POOL_CONNECTIONS = int(os.environ.get('HTTP_POOL_CONNECTIONS', '32'))  # number of per-host pools kept alive
+HTTP_POOL_MAXSIZE = int(os.environ.get('HTTP_POOL_MAXSIZE', '16'))          # max keep-alive connections per host
+HTTP_MAX_RETRIES = int(os.environ.get('HTTP_MAX_RETRIES', '2'))             # connect/5xx/429 retries (idempotent methods only)
+HTTP_BACKOFF_FACTOR = float(os.environ.get('HTTP_BACKOFF_FACTOR', '0.5'))   # exponential backoff between retries
 
 # --- SCRAPING CONFIGURATION ---
 REQUEST_HEADERS = {
     'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
 }
+SCRAPE_MAX_WORKERS = int(os.environ.get('SCRAPE_MAX_WORKERS', '8'))          # sources scraped concurrently
+SCRAPE_TIME_BUDGET = float(os.environ.get('SCRAPE_TIME_BUDGET', '120'))      # wall-clock seconds for the whole scrape phase
+SCRAPE_HOST_DELAY = float(os.environ.get('SCRAPE_HOST_DELAY', '1'))          # min seconds between requests to the same host
+SCRAPE_CACHE_ENABLED = os.environ.get('SCRAPE_CACHE_ENABLED', 'true').lower() == 'true'  # ETag/Last-Modified/hash cache
+SCRAPE_CACHE_FILE = os.path.join(_BASE_DIR, 'scrape_cache.json')
+SCRAPER_PARSER = os.environ.get('SCRAPER_PARSER', 'html.parser')  # 'html.parser', 'lxml' or 'strainer' (see parsing.py)
+SOURCE_HEALTH_BACKEND = os.environ.get('SOURCE_HEALTH_BACKEND', 'json').lower()  # 'json' or 'sqlite'
+
+# --- ARTICLE SELECTION (local pre-ranking before Gemini, see ranking.py) ---
+SELECTION_CANDIDATES = int(os.environ.get('SELECTION_CANDIDATES', '25'))        # top-ranked items sent to Gemini
+SELECTION_MAX_PER_SOURCE = int(os.environ.get('SELECTION_MAX_PER_SOURCE', '5'))  # keeps the shortlist varied
+SELECTION_PROMPT_TOPICS = int(os.environ.get('SELECTION_PROMPT_TOPICS', '100'))  # most similar used topics shown to Gemini
+# Relative weight of each scraped category when ranking (unknown categories get 0.5)
+SELECTION_CATEGORY_PRIORITY = {
+    'mass_torts': 1.0,
+    'personal_injury': 1.0,
+    'employment_law': 1.0,
+    'motor_vehicle': 0.9,
+    'workers_comp': 0.8,
+    'general_legal': 0.6,
+    'general_law': 0.6,
+}
+
+# --- PUBLISHING PIPELINE (see pipeline.py) ---
+PIPELINE_MAX_WORKERS = int(os.environ.get('PIPELINE_MAX_WORKERS', '3'))  # articles generated/published concurrently
+# Max concurrent calls per external API, shared by every thread in the process
+API_CONCURRENCY = {
+    'gemini': int(os.environ.get('GEMINI_CONCURRENCY', '3')),
+    'imagen': int(os.environ.get('IMAGEN_CONCURRENCY', '2')),
+    'sanity': int(os.environ.get('SANITY_CONCURRENCY', '4')),
+}
 
 # --- PRE-DEFINED TITLES ---
 TITLES_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'titles.json')
 
 # --- USED TOPICS TRACKING (prevents duplicate blog posts about same news story) ---
 USED_TOPICS_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'used_topics.json')
+USED_TOPICS_INDEX_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'used_topics_index.json')
+USED_TOPICS_MAX = int(os.environ.get('USED_TOPICS_MAX', '0'))          # 0 keeps every topic (the index keeps lookups fast)
+DEDUPE_THRESHOLD = float(os.environ.get('DEDUPE_THRESHOLD', '0.6'))    # MinHash similarity at which a headline counts as covered (see dedupe.py)
 
 # --- NEWS SOURCES ---
 NEWS_SOURCES = [
@@ -258,70 +343,88 @@ STATE_SLUGS = {
 }
 
 # --- PRACTICE AREA KEYWORDS (for filtering general news sources) ---
-# Articles from general news must contain at least one keyword to be included
-PRACTICE_AREA_KEYWORDS = [
-    # Personal Injury
-    'personal injury', 'injured', 'injury lawsuit', 'injury claim', 'accident victim',
-    'negligence', 'liability', 'damages awarded', 'settlement', 'compensation',
-
-    # Medical Malpractice
-    'medical malpractice', 'medical negligence', 'surgical error', 'misdiagnosis',
-    'hospital negligence', 'doctor sued', 'patient death', 'medical error',
-    'birth injury', 'anesthesia error', 'nursing home abuse', 'elder abuse',
-
-    # Motor Vehicle Accidents
-    'car accident', 'car crash', 'auto accident', 'vehicle accident', 'truck accident',
-    'motorcycle accident', 'pedestrian hit', 'drunk driver', 'dui crash', 'fatal crash',
-    'hit and run', 'multi-vehicle', 'rollover', 'head-on collision', 'rear-end',
-    'uber accident', 'lyft accident', 'rideshare accident', 'bus accident',
-
-    # Wrongful Death
-    'wrongful death', 'fatal accident', 'death lawsuit', 'family sues', 'killed',
-    'fatality', 'deceased', 'survivor lawsuit',
-
-    # Dog Bites
-    'dog bite', 'dog attack', 'animal attack', 'pit bull attack', 'mauled',
-    'dog owner liable', 'dangerous dog',
-
-    # Premises Liability
-    'slip and fall', 'trip and fall', 'premises liability', 'property owner liable',
-    'unsafe conditions', 'negligent security', 'swimming pool accident',
-    'amusement park injury', 'store injury', 'parking lot assault',
-
-    # Product Liability
-    'product recall', 'defective product', 'product liability', 'consumer safety',
-    'fda recall', 'cpsc recall', 'product defect', 'manufacturer liable',
-    'toxic exposure', 'contaminated', 'dangerous product',
-
-    # Employment Law
-    'employment discrimination', 'workplace discrimination', 'wrongful termination',
-    'sexual harassment', 'wage theft', 'unpaid overtime', 'retaliation',
-    'hostile work environment', 'eeoc', 'ada violation', 'fmla violation',
-    'whistleblower', 'class action employment',
-
-    # Civil Rights
-    'civil rights', 'police brutality', 'excessive force', 'false arrest',
-    'wrongful imprisonment', 'civil liberties', 'constitutional violation',
-    'section 1983', 'prisoner rights', 'inmate abuse',
-
-    # Worker's Compensation
-    'workers compensation', 'workplace injury', 'on the job injury', 'osha violation',
-    'osha fine', 'workplace safety', 'occupational hazard', 'work accident',
-    'construction accident', 'industrial accident', 'warehouse injury',
-
-    # Social Security Disability
-    'social security disability', 'ssdi', 'ssi benefits', 'disability benefits',
-    'disability claim', 'disability denied',
-
-    # Intellectual Property
-    'patent infringement', 'trademark infringement', 'copyright infringement',
-    'intellectual property lawsuit', 'trade secret',
-
-    # Professional Malpractice
-    'legal malpractice', 'accounting malpractice', 'professional negligence',
-    'fiduciary duty', 'breach of duty',
-
-    # Class Action
-    'class action', 'mass tort', 'multidistrict litigation', 'mdl',
-    'class certification', 'bellwether trial'
-]
+# Articles from general news must contain at least one keyword to be included.
+# Grouped by practice area so matches report which areas an item touches.
+PRACTICE_AREA_KEYWORD_GROUPS = {
+    'personal_injury': [
+        'personal injury', 'injured', 'injury lawsuit', 'injury claim', 'accident victim',
+        'negligence', 'liability', 'damages awarded', 'settlement', 'compensation'
+    ],
+
+    'medical_malpractice': [
+        'medical malpractice', 'medical negligence', 'surgical error', 'misdiagnosis',
+        'hospital negligence', 'doctor sued', 'patient death', 'medical error',
+        'birth injury', 'anesthesia error', 'nursing home abuse', 'elder abuse'
+    ],
+
+    'motor_vehicle': [
+        'car accident', 'car crash', 'auto accident', 'vehicle accident', 'truck accident',
+        'motorcycle accident', 'pedestrian hit', 'drunk driver', 'dui crash', 'fatal crash',
+        'hit and run', 'multi-vehicle', 'rollover', 'head-on collision', 'rear-end',
+        'uber accident', 'lyft accident', 'rideshare accident', 'bus accident'
+    ],
+
+    'wrongful_death': [
+        'wrongful death', 'fatal accident', 'death lawsuit', 'family sues', 'killed',
+        'fatality', 'deceased', 'survivor lawsuit'
+    ],
+
+    'dog_bites': [
+        'dog bite', 'dog attack', 'animal attack', 'pit bull attack', 'mauled',
+        'dog owner liable', 'dangerous dog'
+    ],
+
+    'premises_liability': [
+        'slip and fall', 'trip and fall', 'premises liability', 'property owner liable',
+        'unsafe conditions', 'negligent security', 'swimming pool accident',
+        'amusement park injury', 'store injury', 'parking lot assault'
+    ],
+
+    'product_liability': [
+        'product recall', 'defective product', 'product liability', 'consumer safety',
+        'fda recall', 'cpsc recall', 'product defect', 'manufacturer liable',
+        'toxic exposure', 'contaminated', 'dangerous product'
+    ],
+
+    'employment_law': [
+        'employment discrimination', 'workplace discrimination', 'wrongful termination',
+        'sexual harassment', 'wage theft', 'unpaid overtime', 'retaliation',
+        'hostile work environment', 'eeoc', 'ada violation', 'fmla violation',
+        'whistleblower', 'class action employment'
+    ],
+
+    'civil_rights': [
+        'civil rights', 'police brutality', 'excessive force', 'false arrest',
+        'wrongful imprisonment', 'civil liberties', 'constitutional violation',
+        'section 1983', 'prisoner rights', 'inmate abuse'
+    ],
+
+    'workers_comp': [
+        'workers compensation', 'workplace injury', 'on the job injury', 'osha violation',
+        'osha fine', 'workplace safety', 'occupational hazard', 'work accident',
+        'construction accident', 'industrial accident', 'warehouse injury'
+    ],
+
+    'social_security_disability': [
+        'social security disability', 'ssdi', 'ssi benefits', 'disability benefits',
+        'disability claim', 'disability denied'
+    ],
+
+    'intellectual_property': [
+        'patent infringement', 'trademark infringement', 'copyright infringement',
+        'intellectual property lawsuit', 'trade secret'
+    ],
+
+    'professional_malpractice': [
+        'legal malpractice', 'accounting malpractice', 'professional negligence',
+        'fiduciary duty', 'breach of duty'
+    ],
+
+    'class_action': [
+        'class action', 'mass tort', 'multidistrict litigation', 'mdl',
+        'class certification', 'bellwether trial'
+    ]
+}
+
+# Flat list of every keyword (all areas)
+PRACTICE_AREA_KEYWORDS = [kw for keywords in PRACTICE_AREA_KEYWORD_GROUPS.values() for kw in keywords]
@@ -9,10 +9,13 @@ import time
 from datetime import datetime, timezone
 
 import requests as req
-from google import genai
 from google.genai import types
 
-from .config import GEMINI_API_KEY, CALCULATOR_SLUGS, STATE_SLUGS
+from .config import (GEMINI_API_KEY, CALCULATOR_SLUGS, STATE_SLUGS,
+                     SELECTION_CANDIDATES, SELECTION_PROMPT_TOPICS)
+from .ranking import rank_articles, shortlist, relevant_used_topics, offline_select
+from .llm import get_llm
+from . import transport
 
 
 def sanitize_json_control_chars(s):
@@ -178,7 +181,7 @@ def validate_external_urls(article_data, timeout=5):
 
     for full_match, link_text, link_url in links_to_check:
         try:
-            response = req.head(
+            response = transport.head(
                 link_url,
                 timeout=timeout,
                 allow_redirects=True,
@@ -186,7 +189,7 @@ def validate_external_urls(article_data, timeout=5):
             )
             # Some servers block HEAD requests, fall back to GET
             if response.status_code == 405:
-                response = req.get(
+                response = transport.get(
                     link_url,
                     timeout=timeout,
                     allow_redirects=True,
@@ -223,8 +226,6 @@ def detect_text_in_image(image_data):
         return False
 
     try:
-        client = genai.Client(api_key=GEMINI_API_KEY)
-
         prompt = """Analyze this image carefully and determine if it contains ANY visible text, words, letters, numbers, signs, labels, or writing of any kind.
 
 This includes:
@@ -238,12 +239,13 @@ This includes:
 
 Respond with ONLY "YES" if you detect ANY text/letters/numbers/writing, or "NO" if the image is completely free of any readable text."""
 
-        response = client.models.generate_content(
+        response = get_llm().generate_content(
             model='gemini-3-flash-preview',
             contents=[
                 prompt,
                 types.Part.from_bytes(data=image_data, mime_type='image/png'),
-            ]
+            ],
+            label='image text check',
         )
 
         result = response.text.strip().upper()
@@ -274,8 +276,6 @@ def generate_image_with_gemini(alt_text, max_retries=3):
         print("Error: GEMINI_API_KEY not set")
         return None
 
-    client = genai.Client(api_key=GEMINI_API_KEY)
-
     image_prompt = f"""NO TEXT, NO WORDS, NO LETTERS, NO WRITING, NO SIGNS, NO LABELS in this image.
 
 Generate a professional stock photo for a law firm blog article.
@@ -293,12 +293,13 @@ CRITICAL: This image must contain ZERO readable text, letters, numbers, or writi
 
     for attempt in range(max_retries):
         try:
-            response = client.models.generate_images(
+            response = get_llm().generate_images(
                 model='imagen-4.0-generate-001',
                 prompt=image_prompt,
                 config={
                     'number_of_images': 1,
-                }
+                },
+                label='featured image',
             )
 
             if response.generated_images and len(response.generated_images) > 0:
@@ -347,36 +348,41 @@ def select_best_articles(news_items, num_articles=2, used_topics=None):
     if not news_items:
         return []
 
-    if not GEMINI_API_KEY:
-        print("Warning: GEMINI_API_KEY not set, using fallback selection")
-        return news_items[:num_articles] if news_items else []
+    # Local pre-ranking: only the best candidates go to Gemini
+    ranked = rank_articles(news_items, used_topics)
 
-    print(f"Using Gemini to analyze {len(news_items)} articles for best {num_articles} selections...")
+    if not GEMINI_API_KEY:
+        print("Warning: GEMINI_API_KEY not set, using offline selection")
+        return offline_select(news_items, num_articles, used_topics, ranked)
 
-    client = genai.Client(api_key=GEMINI_API_KEY)
+    candidate_indices = shortlist(news_items, ranked, SELECTION_CANDIDATES)
+    candidates = [news_items[i] for i in candidate_indices]
+    print(f"Using Gemini to analyze top {len(candidates)} of {len(news_items)} articles for best {num_articles} selections...")
 
     articles_list = []
-    for i, item in enumerate(news_items):
-        articles_list.append({
+    for i, item in enumerate(candidates):
+        entry = {
             'index': i,
             'title': item.get('title', ''),
             'source': item.get('source', ''),
-            'category': item.get('category', ''),
-            'summary': item.get('summary', '')[:200] if item.get('summary') else ''
-        })
+            'category': item.get('category', '')
+        }
+        if item.get('summary'):
+            entry['summary'] = item['summary'][:200]
+        articles_list.append(entry)
 
-    articles_json = json.dumps(articles_list, indent=2)
+    articles_json = json.dumps(articles_list, separators=(',', ':'))
     today_date = datetime.now(timezone.utc).strftime('%Y-%m-%d')
 
-    # Format used topics for the prompt
-    used_topics_list = used_topics if used_topics else []
+    # Format used topics for the prompt (the ones closest to today's candidates)
+    used_topics_list = relevant_used_topics(candidates, used_topics, SELECTION_PROMPT_TOPICS) if used_topics else []
     used_topics_text = ""
     if used_topics_list:
         used_topics_text = f"""
 **CRITICAL - TOPICS ALREADY COVERED (DO NOT SELECT):**
 We have already published blog posts about these topics. Do NOT select any article that covers the same story, event, case, or subject matter - even if from a different source or with a different angle:
 
-{chr(10).join('- ' + topic for topic in used_topics_list[-100:])}
+{chr(10).join('- ' + topic for topic in used_topics_list)}
 
 For example, if we already covered "Columbia University $21M antisemitism settlement", reject ANY article about that settlement regardless of the source or headline.
 """
@@ -422,12 +428,13 @@ Example output:
 IMPORTANT: Return ONLY the JSON object, no additional text. Return empty array for selected_indices if no articles appear to be from today, meet the criteria, or if all suitable articles cover topics we've already blogged about."""
 
     try:
-        response = client.models.generate_content(
+        response = get_llm().generate_content(
             model='gemini-3-flash-preview',
             contents=prompt,
             config={
                 'response_mime_type': 'application/json'
-            }
+            },
+            label='article selection',
         )
 
         result = json.loads(response.text.strip())
@@ -442,12 +449,12 @@ IMPORTANT: Return ONLY the JSON object, no additional text. Return empty array f
 
         selected_articles = []
         for i, idx in enumerate(selected_indices):
-            if 0 <= idx < len(news_items):
-                selected = news_items[idx]
+            if isinstance(idx, int) and 0 <= idx < len(candidates):
+                selected = candidates[idx]
                 # Attach topic summary to the article for later tracking
                 if i < len(topic_summaries):
                     selected['topic_summary'] = topic_summaries[i]
-                print(f"Gemini selected article #{idx}: {selected.get('title', '')[:50]}...")
+                print(f"Gemini selected article #{candidate_indices[idx]}: {selected.get('title', '')[:50]}...")
                 selected_articles.append(selected)
             else:
                 print(f"Invalid index {idx}, skipping")
@@ -457,8 +464,8 @@ IMPORTANT: Return ONLY the JSON object, no additional text. Return empty array f
 
     except Exception as e:
         print(f"Error in Gemini selection: {e}")
-        print("No articles selected due to error")
-        return []
+        print("Falling back to offline selection from the local ranking")
+        return offline_select(news_items, num_articles, used_topics, ranked)
 
 
 def build_landing_page_database():
@@ -487,8 +494,6 @@ def generate_article(news_item, all_news, link_database, landing_page_database="
         print("Error: GEMINI_API_KEY not set")
         return None
 
-    client = genai.Client(api_key=GEMINI_API_KEY)
-
     primary_article = json.dumps(news_item, indent=2)
     related_articles = [item for item in all_news if item['url'] != news_item['url']][:5]
     related_context = json.dumps(related_articles, indent=2)
@@ -600,12 +605,14 @@ CRITICAL RULES:
     max_retries = 2
     for attempt in range(max_retries):
         try:
-            response = client.models.generate_content(
+            response = get_llm().generate_content(
                 model='gemini-3-flash-preview',
                 contents=prompt,
                 config={
                     'response_mime_type': 'application/json'
-                }
+                },
+                label='article',
+                cache=attempt == 0,  # a retry wants a fresh answer, not the rejected one
             )
 
             json_string = response.text.strip()
@@ -657,8 +664,6 @@ def generate_article_from_title(title, link_database, landing_page_database=""):
         print("Error: GEMINI_API_KEY not set")
         return None
 
-    client = genai.Client(api_key=GEMINI_API_KEY)
-
     prompt = f"""
 You are a senior SEO content writer for casevalue.law, a case evaluation website that helps people understand the value of their legal claims.
 
@@ -749,12 +754,14 @@ CRITICAL RULES:
     max_retries = 2
     for attempt in range(max_retries):
         try:
-            response = client.models.generate_content(
+            response = get_llm().generate_content(
                 model='gemini-3-flash-preview',
                 contents=prompt,
                 config={
                     'response_mime_type': 'application/json'
-                }
+                },
+                label='article from title',
+                cache=attempt == 0,  # a retry wants a fresh answer, not the rejected one
             )
 
             json_string = response.text.strip()
@@ -2,7 +2,7 @@
 Automated Source Curation Module
 
 Monitors scraper health, removes failing sources, and discovers AI-powered
-replacements with auto-generated scraper code.
+replacements described by declarative scraper specs.
 """
 
 import json
@@ -10,23 +10,24 @@ import os
 import re
 import ast
 import shutil
+import atexit
 import logging
+import threading
 from datetime import datetime, timezone
 from typing import Dict, List, Tuple, Optional, Any
 import time
 
-import requests
-from bs4 import BeautifulSoup
-from urllib.parse import urljoin
-from google import genai
-
-from .config import NEWS_SOURCES, REQUEST_HEADERS
+from .config import NEWS_SOURCES, REQUEST_HEADERS, SOURCE_HEALTH_BACKEND
+from .llm import get_llm
+from . import transport
+from .health_store import HealthStore, make_health_backend
+from .scraper_specs import CompiledSpec, validate_spec, save_spec
 
 # Paths - dynamically determine base directory
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 HEALTH_FILE = os.path.join(BASE_DIR, 'source_health.json')
+HEALTH_DB_FILE = os.path.join(BASE_DIR, 'source_health.db')
 CONFIG_FILE = os.path.join(BASE_DIR, 'auto_post', 'config.py')
-SCRAPERS_FILE = os.path.join(BASE_DIR, 'auto_post', 'scrapers.py')
 FAILED_SCRAPERS_DIR = os.path.join(BASE_DIR, 'failed_scrapers')
 LOG_FILE = os.path.join(BASE_DIR, 'curation.log')
 
@@ -41,7 +42,6 @@ logger.setLevel(logging.INFO)
 # Constants
 FAILURE_THRESHOLD = 3
 MAX_REPLACEMENTS_PER_RUN = 3
-MAX_CODE_GENERATION_ATTEMPTS = 2
 MAX_DISCOVERY_ATTEMPTS = 3
 
 
@@ -49,128 +49,57 @@ MAX_DISCOVERY_ATTEMPTS = 3
 # HEALTH TRACKING FUNCTIONS
 # ============================================================================
 
-def load_source_health() -> Dict:
-    """Load source health data from JSON file."""
-    if not os.path.exists(HEALTH_FILE):
-        # Initialize with empty structure
-        return {
-            'sources': {},
-            'replacement_queue': [],
-            'manual_review': []
-        }
-
-    try:
-        with open(HEALTH_FILE, 'r') as f:
-            return json.load(f)
-    except Exception as e:
-        logger.error(f"Error loading source health: {e}")
-        return {
-            'sources': {},
-            'replacement_queue': [],
-            'manual_review': []
-        }
+_health_store = None
+_health_store_lock = threading.Lock()
 
 
-def save_source_health(data: Dict) -> None:
-    """Save source health data to JSON file."""
-    try:
-        with open(HEALTH_FILE, 'w') as f:
-            json.dump(data, f, indent=2)
-    except Exception as e:
-        logger.error(f"Error saving source health: {e}")
+def get_health_store() -> HealthStore:
+    """Process-wide health store (backend chosen by SOURCE_HEALTH_BACKEND)."""
+    global _health_store
+    if _health_store is None:
+        with _health_store_lock:
+            if _health_store is None:
+                path = HEALTH_DB_FILE if SOURCE_HEALTH_BACKEND == 'sqlite' else HEALTH_FILE
+                backend = make_health_backend(SOURCE_HEALTH_BACKEND, path)
+                _health_store = HealthStore(backend, logger=logger)
+                # Safety net for runs that exit before the scrape phase flushes
+                atexit.register(_health_store.flush)
+    return _health_store
 
 
-def record_success(scraper_name: str) -> None:
-    """Record successful scrape - resets consecutive failures."""
-    health = load_source_health()
+def load_source_health() -> Dict:
+    """Return a copy of the current source health data (including unflushed counters)."""
+    return get_health_store().snapshot()
 
-    if scraper_name not in health['sources']:
-        health['sources'][scraper_name] = {
-            'consecutive_failures': 0,
-            'last_success': None,
-            'last_failure': None,
-            'total_successes': 0,
-            'total_failures': 0
-        }
 
-    source = health['sources'][scraper_name]
-    source['consecutive_failures'] = 0
-    source['last_success'] = datetime.now(timezone.utc).isoformat()
-    source['total_successes'] = source.get('total_successes', 0) + 1
+def save_source_health(data: Dict) -> None:
+    """Replace source health data and persist it immediately."""
+    store = get_health_store()
+    store.replace(data)
+    store.flush()
 
-    save_source_health(health)
-    logger.info(f"Success recorded for {scraper_name}")
 
+def flush_source_health() -> None:
+    """Persist counters recorded in memory since the last flush."""
+    get_health_store().flush()
 
-def record_failure(scraper_name: str, error: str) -> None:
-    """Record failed scrape - increments consecutive failures."""
-    health = load_source_health()
 
-    if scraper_name not in health['sources']:
-        health['sources'][scraper_name] = {
-            'consecutive_failures': 0,
-            'last_success': None,
-            'last_failure': None,
-            'total_successes': 0,
-            'total_failures': 0
-        }
+def record_success(scraper_name: str) -> None:
+    """Record successful scrape - resets consecutive failures (in memory until flushed)."""
+    get_health_store().record_success(scraper_name)
+    logger.info(f"Success recorded for {scraper_name}")
 
-    source = health['sources'][scraper_name]
-    source['consecutive_failures'] = source.get('consecutive_failures', 0) + 1
-    source['last_failure'] = datetime.now(timezone.utc).isoformat()
-    source['last_failure_reason'] = error
-    source['total_failures'] = source.get('total_failures', 0) + 1
 
-    save_source_health(health)
+def record_failure(scraper_name: str, error: str) -> None:
+    """Record failed scrape - increments consecutive failures (in memory until flushed)."""
+    source = get_health_store().record_failure(scraper_name, error)
     logger.warning(f"Failure recorded for {scraper_name}: {error} (consecutive: {source['consecutive_failures']})")
 
 
 # ============================================================================
-# CODE VALIDATION FUNCTIONS
+# SCRAPER VALIDATION FUNCTIONS
 # ============================================================================
 
-def validate_scraper_code(code_string: str) -> Tuple[bool, str]:
-    """
-    Multi-layer validation of AI-generated scraper code.
-
-    Returns:
-        (is_valid, error_message)
-    """
-    # 1. Syntax validation
-    try:
-        ast.parse(code_string)
-    except SyntaxError as e:
-        return False, f"Syntax error: {e}"
-
-    # 2. Security checks - dangerous patterns
-    dangerous_patterns = [
-        (r'\bexec\s*\(', 'exec() call'),
-        (r'\beval\s*\(', 'eval() call'),
-        (r'\b__import__\s*\(', '__import__() call'),
-        (r'\bos\.system\s*\(', 'os.system() call'),
-        (r'\bsubprocess\.', 'subprocess usage'),
-        (r'\bopen\s*\([^)]*["\']w', 'file write operation'),
-    ]
-
-    for pattern, desc in dangerous_patterns:
-        if re.search(pattern, code_string):
-            return False, f"Security risk: {desc} found"
-
-    # 3. Function signature validation
-    if not re.search(r'def scrape_\w+\(url\):', code_string):
-        return False, "Invalid function signature (must be: def scrape_X(url):)"
-
-    # 4. Return statement validation
-    if 'return news_items' not in code_string and 'return []' not in code_string:
-        return False, "Missing proper return statement"
-
-    # 5. Required imports check (should use these modules)
-    if 'requests' not in code_string or 'BeautifulSoup' not in code_string:
-        return False, "Missing required imports (requests, BeautifulSoup)"
-
-    return True, "Validation passed"
-
-
 def test_scraper_execution(scraper_func, url: str, expected_source: str, expected_category: str) -> Tuple[bool, Any]:
     """
     Execute generated scraper and validate output.
@@ -234,14 +163,12 @@ def find_replacement_source(category: str, original_name: str, original_url: str
         Or None if no suitable replacement found
     """
     try:
-        # Configure Gemini
+        # Gemini key (calls go through the shared gateway)
         api_key = os.getenv('GEMINI_API_KEY')
         if not api_key:
             logger.error("GEMINI_API_KEY not found in environment")
             return None
 
-        client = genai.Client(api_key=api_key)
-
         # Build discovery prompt
         prompt = f"""You are a research assistant for a legal news aggregation system.
 
@@ -289,9 +216,11 @@ IMPORTANT: Return ONLY valid JSON, no markdown formatting or code blocks."""
         logger.info(f"Searching for replacement for {original_name} in category {category}")
 
         # Call Gemini with web search
-        response = client.models.generate_content(
+        response = get_llm().generate_content(
             model='gemini-2.0-flash-exp',
-            contents=prompt
+            contents=prompt,
+            label='source discovery',
+            api_key=api_key,
         )
         result_text = response.text.strip()
 
@@ -320,7 +249,7 @@ IMPORTANT: Return ONLY valid JSON, no markdown formatting or code blocks."""
 
         # Validate URL is accessible
         try:
-            test_response = requests.get(result['url'], headers=REQUEST_HEADERS, timeout=10)
+            test_response = transport.get(result['url'], headers=REQUEST_HEADERS, timeout=10)
             test_response.raise_for_status()
             logger.info(f"Successfully validated replacement source: {result['name']} - {result['url']}")
         except Exception as e:
@@ -335,124 +264,58 @@ IMPORTANT: Return ONLY valid JSON, no markdown formatting or code blocks."""
 
 
 # ============================================================================
-# AI-POWERED SCRAPER CODE GENERATION
+# SCRAPER SPEC GENERATION
 # ============================================================================
 
-def get_example_scrapers() -> str:
-    """Get 2-3 example scrapers from scrapers.py to show pattern."""
-    try:
-        with open(SCRAPERS_FILE, 'r') as f:
-            content = f.read()
-
-        # Extract aboutlawsuits scraper (lines ~25-50)
-        aboutlawsuits_match = re.search(
-            r'def scrape_aboutlawsuits\(url\):.*?(?=\ndef\s|\nSCRAPERS\s|\Z)',
-            content,
-            re.DOTALL
-        )
-
-        # Extract fda scraper
-        fda_match = re.search(
-            r'def scrape_fda\(url\):.*?(?=\ndef\s|\nSCRAPERS\s|\Z)',
-            content,
-            re.DOTALL
-        )
-
-        examples = []
-        if aboutlawsuits_match:
-            examples.append(aboutlawsuits_match.group(0))
-        if fda_match:
-            examples.append(fda_match.group(0))
-
-        return '\n\n'.join(examples)
-    except Exception as e:
-        logger.error(f"Error reading example scrapers: {e}")
-        return ""
-
-
-def generate_scraper_code(source_name: str, source_url: str, category: str, scraping_strategy: Dict) -> Optional[str]:
+def build_scraper_spec(source_name: str, category: str, scraping_strategy: Dict) -> Dict:
     """
-    Use Gemini to generate scraper function code.
+    Turn Gemini's scraping_strategy selectors into a declarative scraper spec.
 
     Returns:
-        Complete function code as string, or None if generation fails
+        Spec dict for scraper_specs.json (see auto_post/scraper_specs.py)
     """
-    try:
-        # Configure Gemini
-        api_key = os.getenv('GEMINI_API_KEY')
-        if not api_key:
-            logger.error("GEMINI_API_KEY not found in environment")
-            return None
-
-        client = genai.Client(api_key=api_key)
-
-        # Get example scrapers
-        examples = get_example_scrapers()
-
-        # Sanitize name for function
-        func_name = re.sub(r'[^a-z0-9]', '', source_name.lower())
-
-        # Build code generation prompt
-        prompt = f"""You are an expert Python web scraper developer.
-
-TASK: Write a news scraper function for {source_name}.
-
-SOURCE DETAILS:
-- Name: {source_name}
-- URL: {source_url}
-- Category: {category}
-
-HTML STRUCTURE ANALYSIS:
-{json.dumps(scraping_strategy, indent=2)}
-
-PATTERN TO FOLLOW (examples from existing scrapers):
-
-{examples}
-
-REQUIREMENTS:
-1. Function name: scrape_{func_name}(url)
-2. Returns: List of dictionaries with keys: title, url, summary, source, category
-3. Limit to maximum 5 items
-4. Include try-except with proper error handling (print error, return [])
-5. Use REQUEST_HEADERS from config module for requests
-6. Set timeout of 30 seconds for requests
-7. Handle relative URLs using urljoin
-8. Deduplicate by URL if needed
-9. Source name in each item should be: "{source_name}"
-10. Category in each item should be: "{category}"
-11. Summary can be empty string if not available
-12. Use BeautifulSoup for HTML parsing
-
-CRITICAL REQUIREMENTS:
-- Follow the EXACT pattern shown in the examples
-- Include proper imports at the top: import requests, from bs4 import BeautifulSoup, from urllib.parse import urljoin
-- Use the CSS selectors from the HTML structure analysis above
-- Handle edge cases (missing elements, empty text, etc.)
-- Return empty list on any error
-
-OUTPUT: Return ONLY the complete Python function code with imports, no explanations, no markdown formatting."""
-
-        logger.info(f"Generating scraper code for {source_name}")
-
-        # Call Gemini
-        response = client.models.generate_content(
-            model='gemini-2.0-flash-exp',
-            contents=prompt
-        )
-        code = response.text.strip()
-
-        # Clean up response (remove markdown code blocks if present)
-        code = re.sub(r'^```python\s*', '', code)
-        code = re.sub(r'^```\s*', '', code)
-        code = re.sub(r'\s*```$', '', code)
-
-        logger.info(f"Generated code for {source_name} ({len(code)} characters)")
-
-        return code
-
-    except Exception as e:
-        logger.error(f"Error generating scraper code: {e}")
-        return None
+    def selector(key):
+        value = scraping_strategy.get(key)
+        return value.strip() if isinstance(value, str) else ''
+
+    article_selector = selector('article_selector')
+    title_selector = selector('title_selector')
+    link_selector = selector('link_selector')
+    summary_selector = selector('summary_selector')
+
+    spec = {'source': source_name, 'category': category}
+    if article_selector:
+        # Container nodes: title, link and summary are looked up inside each one
+        spec['items'] = article_selector
+        spec['link'] = ([{'select': link_selector}] if link_selector else []) + ['child', 'self', 'parent']
+        if title_selector:
+            spec['title'] = {'select': title_selector}
+        elif link_selector:
+            spec['title'] = 'link'
+        if summary_selector:
+            spec['summary'] = {'select': summary_selector}
+    else:
+        # Headline nodes only: the link is the node itself or next to it
+        spec['items'] = title_selector or link_selector
+
+    # Same floor test_scraper_execution enforces, so short nav links are skipped up front
+    spec['min_title_length'] = 10
+    return spec
+
+
+def save_failed_spec(func_name: str, discovered_source: Dict, category: str, reason: str, spec: Dict) -> None:
+    """Keep a rejected spec in failed_scrapers/ for debugging."""
+    os.makedirs(FAILED_SCRAPERS_DIR, exist_ok=True)
+    failed_file = os.path.join(FAILED_SCRAPERS_DIR, f"{func_name}_{int(time.time())}.json")
+    with open(failed_file, 'w') as f:
+        json.dump({
+            'name': discovered_source['name'],
+            'url': discovered_source['url'],
+            'category': category,
+            'reason': reason,
+            'scraping_strategy': discovered_source.get('scraping_strategy'),
+            'spec': spec
+        }, f, indent=2)
 
 
 # ============================================================================
@@ -564,6 +427,9 @@ def add_source_to_config(source_data: Dict) -> bool:
         # Remove backup after success
         os.remove(backup_path)
 
+        # Live list too, so a long-running process picks the source up without a reload
+        NEWS_SOURCES.append({**source_data, 'enabled': True})
+
         logger.info(f"Added source to config: {source_data['name']}")
         return True
 
@@ -576,74 +442,25 @@ def add_source_to_config(source_data: Dict) -> bool:
         return False
 
 
-def add_scraper_to_module(scraper_name: str, scraper_code: str) -> bool:
+def add_scraper_spec(scraper_name: str, spec: Dict) -> bool:
     """
-    Add new scraper function to scrapers.py.
+    Save a new scraper spec to scraper_specs.json and make it live in this process.
 
     Returns:
         True if successful, False otherwise
     """
     try:
-        # Backup scrapers first
-        backup_path = SCRAPERS_FILE + '.backup'
-        shutil.copy(SCRAPERS_FILE, backup_path)
-
-        # Read scrapers
-        with open(SCRAPERS_FILE, 'r') as f:
-            content = f.read()
-
-        # Find SCRAPERS dictionary location
-        scrapers_dict_match = re.search(r'(# Map scraper names to functions\s*\n)?SCRAPERS\s*=\s*\{', content)
-        if not scrapers_dict_match:
-            logger.error("Could not find SCRAPERS dictionary")
-            return False
-
-        insertion_point = scrapers_dict_match.start()
-
-        # Insert function before SCRAPERS dictionary
-        new_content = (
-            content[:insertion_point] +
-            f"\n\n{scraper_code}\n\n" +
-            content[insertion_point:]
-        )
-
-        # Update SCRAPERS dictionary
-        # Find closing brace of SCRAPERS dict
-        scrapers_end = new_content.find('}', new_content.find('SCRAPERS = {'))
-        if scrapers_end == -1:
-            logger.error("Could not find SCRAPERS dictionary closing brace")
-            return False
+        save_spec(scraper_name, spec)
 
-        new_entry = f"    '{scraper_name}': scrape_{scraper_name},\n"
-        new_content = (
-            new_content[:scrapers_end] +
-            new_entry +
-            new_content[scrapers_end:]
-        )
-
-        # Validate syntax
-        try:
-            ast.parse(new_content)
-        except SyntaxError as e:
-            logger.error(f"Generated invalid Python in scrapers: {e}")
-            return False
-
-        # Write updated scrapers
-        with open(SCRAPERS_FILE, 'w') as f:
-            f.write(new_content)
-
-        # Remove backup after success
-        os.remove(backup_path)
+        # Imported here: scrapers imports this module for health tracking
+        from .scrapers import register_scraper
+        register_scraper(scraper_name, spec)
 
-        logger.info(f"Added scraper to module: {scraper_name}")
+        logger.info(f"Added scraper spec: {scraper_name}")
         return True
 
     except Exception as e:
-        logger.error(f"Error adding scraper to module: {e}")
-        # Rollback
-        if os.path.exists(backup_path):
-            shutil.copy(backup_path, SCRAPERS_FILE)
-            os.remove(backup_path)
+        logger.error(f"Error adding scraper spec: {e}")
         return False
 
 
@@ -753,69 +570,23 @@ def run_source_curation() -> Dict:
             result['pending_replacements'].append(item['original_name'])
             continue
 
-        # Phase 4: Generate scraper code
+        # Phase 4: Build a declarative scraper spec
         func_name = re.sub(r'[^a-z0-9]', '', discovered_source['name'].lower())
+        spec = build_scraper_spec(discovered_source['name'], item['category'], discovered_source['scraping_strategy'])
 
-        code_generated = False
-        generated_code = None
-
-        for attempt in range(MAX_CODE_GENERATION_ATTEMPTS):
-            generated_code = generate_scraper_code(
-                discovered_source['name'],
-                discovered_source['url'],
-                item['category'],
-                discovered_source['scraping_strategy']
-            )
-
-            if not generated_code:
-                logger.warning(f"Code generation failed for {discovered_source['name']} (attempt {attempt + 1})")
-                continue
-
-            # Validate code
-            is_valid, error_msg = validate_scraper_code(generated_code)
-            if not is_valid:
-                logger.warning(f"Code validation failed: {error_msg} (attempt {attempt + 1})")
-                continue
-
-            code_generated = True
-            break
-
-        if not code_generated:
-            logger.error(f"Failed to generate valid code for {discovered_source['name']}")
-
-            # Save failed attempt for debugging
-            os.makedirs(FAILED_SCRAPERS_DIR, exist_ok=True)
-            failed_file = os.path.join(FAILED_SCRAPERS_DIR, f"{func_name}_{int(time.time())}.py")
-            with open(failed_file, 'w') as f:
-                f.write(f"# Failed scraper generation for {discovered_source['name']}\n")
-                f.write(f"# Category: {item['category']}\n")
-                f.write(f"# URL: {discovered_source['url']}\n")
-                f.write(f"# Validation error: {error_msg}\n\n")
-                if generated_code:
-                    f.write(generated_code)
-
+        spec_errors = validate_spec(spec)
+        if spec_errors:
+            error_msg = '; '.join(spec_errors)
+            logger.error(f"Invalid scraper spec for {discovered_source['name']}: {error_msg}")
+            save_failed_spec(func_name, discovered_source, item['category'], f"Validation error: {error_msg}", spec)
             result['pending_replacements'].append(item['original_name'])
             continue
 
-        # Phase 5: Test scraper execution
-        # Import and test the generated function
+        # Phase 5: Test the spec against the live page
         try:
-            # Create a temporary module to test the code
-            exec_globals = {
-                'requests': requests,
-                'BeautifulSoup': BeautifulSoup,
-                'urljoin': urljoin,
-                'REQUEST_HEADERS': REQUEST_HEADERS
-            }
-            exec(generated_code, exec_globals)
-
-            scraper_func = exec_globals.get(f'scrape_{func_name}')
-            if not scraper_func:
-                logger.error(f"Could not find function scrape_{func_name} in generated code")
-                result['pending_replacements'].append(item['original_name'])
-                continue
-
-            # Test execution
+            # Imported here: scrapers imports this module for health tracking
+            from .scrapers import make_spec_scraper
+            scraper_func = make_spec_scraper(CompiledSpec(func_name, spec))
             test_success, test_result = test_scraper_execution(
                 scraper_func,
                 discovered_source['url'],
@@ -825,17 +596,7 @@ def run_source_curation() -> Dict:
 
             if not test_success:
                 logger.error(f"Scraper test failed: {test_result}")
-
-                # Save failed attempt
-                os.makedirs(FAILED_SCRAPERS_DIR, exist_ok=True)
-                failed_file = os.path.join(FAILED_SCRAPERS_DIR, f"{func_name}_{int(time.time())}.py")
-                with open(failed_file, 'w') as f:
-                    f.write(f"# Failed scraper test for {discovered_source['name']}\n")
-                    f.write(f"# Category: {item['category']}\n")
-                    f.write(f"# URL: {discovered_source['url']}\n")
-                    f.write(f"# Test error: {test_result}\n\n")
-                    f.write(generated_code)
-
+                save_failed_spec(func_name, discovered_source, item['category'], f"Test error: {test_result}", spec)
                 result['pending_replacements'].append(item['original_name'])
                 continue
 
@@ -846,10 +607,10 @@ def run_source_curation() -> Dict:
             result['pending_replacements'].append(item['original_name'])
             continue
 
-        # Deploy: Add to scrapers.py and config.py
-        if not add_scraper_to_module(func_name, generated_code):
-            logger.error(f"Failed to add scraper to module")
-            result['errors'].append(f"Failed to add {discovered_source['name']} to scrapers.py")
+        # Deploy: Add spec to scraper_specs.json and source to config.py
+        if not add_scraper_spec(func_name, spec):
+            logger.error(f"Failed to add scraper spec")
+            result['errors'].append(f"Failed to add {discovered_source['name']} to scraper_specs.json")
             continue
 
         if not add_source_to_config({
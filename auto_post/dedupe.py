@@ -0,0 +1,176 @@
+"""
+Near-duplicate detection for news topics (MinHash + LSH).
+
+Every covered topic and published title is stored as a MinHash signature of
+its significant words, bucketed by LSH bands. Scraped items whose headline is
+close to something already covered, or to another item scraped in the same
+run, are dropped locally before any LLM call. A lookup is a few bucket
+probes, so it stays fast however long the history gets.
+
+The index is built from used_topics.json on first use and kept in
+used_topics_index.json (not versioned, carried between scheduled runs by the
+workflow cache). Published titles are only recorded there; if the file is
+lost, the rebuilt index covers used topics alone.
+
+This catches the same headline syndicated across sources, not rephrasings.
+Word overlap can't tell those apart from different stories written to the
+same template. Among the 180 covered topics, two summaries of one Dupixent
+story score 0.30, while different EEOC settlements ("X $N EEOC settlement
+for disability discrimination") score up to 0.53. DEDUPE_THRESHOLD (0.6)
+sits above every pair of different stories in that history. Rephrased
+stories are left to article selection, which is shown the relevant used
+topics.
+"""
+
+import os
+import json
+import random
+import hashlib
+from typing import Dict, List, Optional, Tuple
+
+from .config import USED_TOPICS_INDEX_FILE, DEDUPE_THRESHOLD
+from .ranking import tokenize
+from .utils import write_json_atomic
+
+NUM_PERM = 64
+BANDS = 32               # 32 bands x 2 rows: >99.99% recall at 0.5+ similarity, candidates are then verified
+ROWS = NUM_PERM // BANDS
+SEED = 20240611          # fixed so signatures saved in earlier runs stay comparable
+
+_PRIME = (1 << 61) - 1
+_rng = random.Random(SEED)
+_PERMUTATIONS = [(_rng.randrange(1, _PRIME), _rng.randrange(0, _PRIME)) for _ in range(NUM_PERM)]
+
+
+def _token_hash(token: str) -> int:
+    return int.from_bytes(hashlib.blake2b(token.encode('utf-8'), digest_size=8).digest(), 'big')
+
+
+def minhash(text: str) -> Optional[Tuple[int, ...]]:
+    """MinHash signature of a text's significant words, or None if it has none."""
+    hashes = [_token_hash(token) for token in tokenize(text)]
+    if not hashes:
+        return None
+    return tuple(min((a * h + b) % _PRIME for h in hashes) for a, b in _PERMUTATIONS)
+
+
+def signature_similarity(a: Tuple[int, ...], b: Tuple[int, ...]) -> float:
+    """Estimated Jaccard similarity of the texts behind two signatures."""
+    return sum(1 for x, y in zip(a, b) if x == y) / NUM_PERM
+
+
+class NearDuplicateIndex:
+    """In-memory MinHash/LSH index of short texts (topics, titles, headlines)."""
+
+    def __init__(self, threshold: float = DEDUPE_THRESHOLD):
+        self.threshold = threshold
+        self.entries = []    # [(text, kind, signature)]
+        self._texts = set()
+        self._buckets = {}   # (band, band values) -> [entry positions]
+
+    def __len__(self):
+        return len(self.entries)
+
+    def _bands(self, signature):
+        for band in range(BANDS):
+            yield band, signature[band * ROWS:(band + 1) * ROWS]
+
+    def add(self, text: str, kind: str = 'topic', signature: Optional[Tuple[int, ...]] = None) -> bool:
+        """Index a text. Returns False if it is empty or already indexed."""
+        key = text.strip().lower()
+        if not key or key in self._texts:
+            return False
+        signature = signature or minhash(text)
+        if signature is None:
+            return False
+        position = len(self.entries)
+        self.entries.append((text, kind, signature))
+        self._texts.add(key)
+        for band_key in self._bands(signature):
+            self._buckets.setdefault(band_key, []).append(position)
+        return True
+
+    def query(self, text: str, signature: Optional[Tuple[int, ...]] = None) -> Optional[Tuple[str, float]]:
+        """Closest indexed text at or above the threshold, as (text, similarity), or None."""
+        signature = signature or minhash(text)
+        if signature is None or not self.entries:
+            return None
+        candidates = set()
+        for band_key in self._bands(signature):
+            candidates.update(self._buckets.get(band_key, ()))
+        best = None
+        for position in candidates:
+            other_text, _, other_signature = self.entries[position]
+            similarity = signature_similarity(signature, other_signature)
+            if similarity >= self.threshold and (best is None or similarity > best[1]):
+                best = (other_text, similarity)
+        return best
+
+    def to_dict(self) -> Dict:
+        return {
+            'num_perm': NUM_PERM,
+            'bands': BANDS,
+            'seed': SEED,
+            'entries': [{'text': text, 'kind': kind, 'sig': list(signature)}
+                        for text, kind, signature in self.entries]
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict, threshold: float = DEDUPE_THRESHOLD) -> 'NearDuplicateIndex':
+        index = cls(threshold)
+        # Signatures from different parameters aren't comparable - recompute them
+        compatible = (data.get('num_perm'), data.get('bands'), data.get('seed')) == (NUM_PERM, BANDS, SEED)
+        for entry in data.get('entries', []):
+            signature = tuple(entry['sig']) if compatible and entry.get('sig') else None
+            index.add(entry['text'], entry.get('kind', 'topic'), signature)
+        return index
+
+
+def load_topic_index(used_topics: Optional[List[str]] = None,
+                     path: str = USED_TOPICS_INDEX_FILE) -> NearDuplicateIndex:
+    """Load the persisted index and add any used topics it doesn't have yet
+    (first run, or topics added by another tool)."""
+    index = None
+    if os.path.exists(path):
+        try:
+            with open(path, 'r') as f:
+                index = NearDuplicateIndex.from_dict(json.load(f))
+        except (OSError, ValueError, KeyError) as e:
+            print(f"  Warning: topic index unreadable, rebuilding ({e})")
+    if index is None:
+        index = NearDuplicateIndex()
+    for topic in used_topics or []:
+        index.add(topic, 'topic')
+    return index
+
+
+def save_topic_index(index: NearDuplicateIndex, path: str = USED_TOPICS_INDEX_FILE) -> bool:
+    """Write the index atomically (temp file + rename)."""
+    try:
+        write_json_atomic(path, index.to_dict(), separators=(',', ':'))
+        return True
+    except OSError as e:
+        print(f"Error saving topic index: {e}")
+        return False
+
+
+def filter_near_duplicates(news_items: List[Dict], index: NearDuplicateIndex) -> Tuple[List[Dict], List[Dict]]:
+    """Drop items whose headline is near a covered topic/title, or near an item
+    kept earlier in this batch (the same story from another source).
+    Returns (kept, rejected); rejected items carry 'duplicate_of'."""
+    batch = NearDuplicateIndex(index.threshold)
+    kept, rejected = [], []
+    for item in news_items:
+        title = item.get('title', '')
+        signature = minhash(title)
+        if signature is None:
+            kept.append(item)
+            continue
+        match = index.query(title, signature) or batch.query(title, signature)
+        if match:
+            item['duplicate_of'] = match[0]
+            rejected.append(item)
+            continue
+        batch.add(title, 'headline', signature)
+        kept.append(item)
+    return kept, rejected
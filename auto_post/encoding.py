@@ -0,0 +1,342 @@
+"""
+Shared ffmpeg encode scheduler.
+
+Every ffmpeg encode in the process (local finishing, hook text overlays)
+runs through one EncodeScheduler instead of calling subprocess.run directly:
+    slots     at most ENCODE_MAX_JOBS ffmpeg processes at once; further
+              encodes queue (FIFO) until a slot frees up
+    threads   each job is started with `-threads ENCODE_THREADS`, so the
+              running encoders split the cores instead of each one
+              spawning a thread per core
+    timeouts  the caller's timeout covers the encode only, not the time
+              spent queued, so a busy machine doesn't time out work that
+              never started
+
+Both limits default to a split of os.cpu_count(). stats() reports queue
+depth and encode times (web_app.py serves it at /encoder).
+
+get_capabilities() finds the ffmpeg/ffprobe binaries and the filters and
+encoders they support once per process, so callers can pick a working path
+up front (e.g. skip hook text without drawtext, or finish on the server
+without xfade) instead of discovering it from a failed encode.
+clip_headers() reads every clip's duration and frame rate in one ffmpeg run,
+memoised by path, size and mtime (no full-file reads).
+"""
+
+import os
+import re
+import time
+import shutil
+import threading
+import subprocess
+from collections import deque
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from .config import ENCODE_MAX_JOBS, ENCODE_THREADS, ENCODE_HWACCEL
+
+# ffmpeg-full path (has drawtext, ass, subtitles filters)
+FFMPEG_BIN = '/opt/homebrew/opt/ffmpeg-full/bin/ffmpeg'
+
+# H.264 encoders in order of preference, with comparable quality settings
+_H264_ENCODERS = [
+    ('h264_videotoolbox', ['-q:v', '65']),                  # macOS
+    ('h264_nvenc', ['-preset', 'p4', '-cq', '19']),         # NVIDIA
+    ('h264_qsv', ['-global_quality', '20']),                # Intel Quick Sync
+]
+_SOFTWARE_ENCODER = ('libx264', ['-preset', 'fast', '-crf', '18'])
+_DEFAULT_DURATION = 8.0  # Flow clips are 8s; used when a duration can't be read
+_DEFAULT_FRAME_RATE = 24.0  # Flow (Veo) clips are 24 fps
+_FLAGS_COLUMN = re.compile(r'[A-Z.|]+')
+_DURATION_LINE = re.compile(r'Duration: (\d+):(\d+):(\d+(?:\.\d+)?)')
+_FRAME_RATE = re.compile(r'Stream #\d+:\d+.*: Video: .*?(\d+(?:\.\d+)?) fps')
+
+_DEFAULT_THREADS = 4  # libx264 scales well up to about this many threads per 720p encode
+
+
+def _auto_limits(max_jobs: int = 0, threads: int = 0):
+    """Resolve 0 (= auto) limits against the core count."""
+    cores = os.cpu_count() or 1
+    if not threads:
+        threads = min(_DEFAULT_THREADS, cores) if not max_jobs else max(1, cores // max_jobs)
+    if not max_jobs:
+        max_jobs = max(1, cores // threads)
+    return max_jobs, threads
+
+
+class EncodeScheduler:
+    """Runs ffmpeg commands with a process cap and per-job thread limit (thread-safe)."""
+
+    def __init__(self, max_jobs: int = ENCODE_MAX_JOBS, threads: int = ENCODE_THREADS):
+        self.max_jobs, self.threads = _auto_limits(max_jobs, threads)
+        self._cond = threading.Condition()
+        self._waiting = deque()   # tickets in arrival order
+        self._running = 0
+        self._completed = 0
+        self._failed = 0
+        self._encode_seconds = 0.0
+        self._wait_seconds = 0.0
+        self._last_seconds = None
+
+    def _with_threads(self, cmd: List[str]) -> List[str]:
+        """Add `-threads N` as an output option (just before the output path)."""
+        if '-threads' in cmd:
+            return list(cmd)
+        return list(cmd[:-1]) + ['-threads', str(self.threads), cmd[-1]]
+
+    def _acquire(self) -> float:
+        """Wait for an encode slot in FIFO order. Returns the seconds waited."""
+        ticket = object()
+        started = time.monotonic()
+        with self._cond:
+            self._waiting.append(ticket)
+            if self._running >= self.max_jobs:
+                print(f"    Waiting for an encoder slot ({len(self._waiting)} queued, "
+                      f"{self._running} running)...")
+            while self._waiting[0] is not ticket or self._running >= self.max_jobs:
+                self._cond.wait()
+            self._waiting.popleft()
+            self._running += 1
+            self._cond.notify_all()
+        return time.monotonic() - started
+
+    def _release(self, seconds: float, waited: float, ok: bool) -> None:
+        with self._cond:
+            self._running -= 1
+            if ok:
+                self._completed += 1
+            else:
+                self._failed += 1
+            self._encode_seconds += seconds
+            self._wait_seconds += waited
+            self._last_seconds = seconds
+            self._cond.notify_all()
+
+    def run(self, cmd: List[str], timeout: Optional[float] = None,
+            label: str = 'encode') -> subprocess.CompletedProcess:
+        """Run an ffmpeg command (output path last) once a slot is free.
+        Same contract as subprocess.run(cmd, capture_output=True, timeout=timeout):
+        returns the CompletedProcess, raises TimeoutExpired."""
+        cmd = self._with_threads(cmd)
+        waited = self._acquire()
+        started = time.monotonic()
+        ok = False
+        try:
+            result = subprocess.run(cmd, capture_output=True, timeout=timeout)
+            ok = result.returncode == 0
+            return result
+        finally:
+            seconds = time.monotonic() - started
+            self._release(seconds, waited, ok)
+            queued = f", queued {waited:.1f}s" if waited >= 1 else ''
+            print(f"    Encoder: {label} took {seconds:.1f}s "
+                  f"({self.threads} thread(s){queued})")
+
+    def stats(self) -> Dict:
+        """Queue depth, limits and encode times."""
+        with self._cond:
+            finished = self._completed + self._failed
+            return {
+                'max_jobs': self.max_jobs,
+                'threads_per_job': self.threads,
+                'running': self._running,
+                'queued': len(self._waiting),
+                'completed': self._completed,
+                'failed': self._failed,
+                'avg_encode_seconds': round(self._encode_seconds / finished, 2) if finished else None,
+                'avg_wait_seconds': round(self._wait_seconds / finished, 2) if finished else None,
+                'last_encode_seconds': round(self._last_seconds, 2) if self._last_seconds is not None else None,
+            }
+
+
+_encoder = None
+_encoder_lock = threading.Lock()
+
+
+def get_encoder() -> EncodeScheduler:
+    """Process-wide scheduler shared by every video thread."""
+    global _encoder
+    if _encoder is None:
+        with _encoder_lock:
+            if _encoder is None:
+                _encoder = EncodeScheduler()
+    return _encoder
+
+
+class FFmpegCapabilities:
+    """What the local ffmpeg build can do (probed once, see get_capabilities)."""
+
+    def __init__(self, ffmpeg: Optional[str], ffprobe: Optional[str],
+                 filters: Sequence[str] = (), encoders: Sequence[str] = ()):
+        self.ffmpeg = ffmpeg
+        self.ffprobe = ffprobe
+        self.filters = frozenset(filters)
+        self.encoders = frozenset(encoders)
+
+    def has_filter(self, *names: str) -> bool:
+        return bool(self.ffmpeg) and all(name in self.filters for name in names)
+
+    @property
+    def can_overlay_text(self) -> bool:
+        return self.has_filter('drawtext')
+
+    @property
+    def can_crossfade(self) -> bool:
+        return self.has_filter('xfade', 'acrossfade')
+
+    @property
+    def hardware_encoder(self) -> Optional[str]:
+        for name, _ in _H264_ENCODERS:
+            if name in self.encoders:
+                return name
+        return None
+
+    def video_codec_args(self) -> List[str]:
+        """-c:v and quality options for H.264 output: a hardware encoder when
+        ENCODE_HWACCEL is on and one is available, else libx264."""
+        if ENCODE_HWACCEL:
+            for name, options in _H264_ENCODERS:
+                if name in self.encoders:
+                    return ['-c:v', name] + options
+        name, options = _SOFTWARE_ENCODER
+        return ['-c:v', name] + options
+
+    def describe(self) -> str:
+        if not self.ffmpeg:
+            return "ffmpeg not found"
+        features = [name for name, ok in (('drawtext', self.can_overlay_text),
+                                          ('xfade', self.can_crossfade)) if ok]
+        encoder = self.video_codec_args()[1]
+        hardware = self.hardware_encoder
+        return (f"{self.ffmpeg} (filters: {', '.join(features) or 'none'}; encoder: {encoder}"
+                + (f"; hardware available: {hardware}" if hardware and hardware != encoder else '') + ")")
+
+
+def _find_ffmpeg() -> Optional[str]:
+    if os.path.isfile(FFMPEG_BIN):
+        return FFMPEG_BIN
+    return shutil.which('ffmpeg')
+
+
+def _list_names(ffmpeg: str, option: str) -> List[str]:
+    """Names from `ffmpeg -filters` / `ffmpeg -encoders` (the column after the flags)."""
+    try:
+        result = subprocess.run([ffmpeg, '-hide_banner', option], capture_output=True, timeout=10)
+    except (OSError, subprocess.SubprocessError):
+        return []
+    names = []
+    for line in result.stdout.decode(errors='replace').splitlines():
+        parts = line.split()
+        # Rows look like " V....D libx264  ..." / " TSC xfade  VV->V ..."; legend lines have '='
+        if len(parts) >= 2 and parts[1] != '=' and _FLAGS_COLUMN.fullmatch(parts[0]):
+            names.append(parts[1])
+    return names
+
+
+def probe_capabilities() -> FFmpegCapabilities:
+    """Locate ffmpeg/ffprobe and list their filters and encoders."""
+    ffmpeg = _find_ffmpeg()
+    if not ffmpeg:
+        print("  Warning: ffmpeg not found - captions and hook text will be skipped")
+        return FFmpegCapabilities(None, None)
+    # Only replace the binary name, not directory parts like 'ffmpeg-full'
+    ffprobe = os.path.join(os.path.dirname(ffmpeg), 'ffprobe')
+    if not os.path.isfile(ffprobe):
+        ffprobe = shutil.which('ffprobe')
+    return FFmpegCapabilities(ffmpeg, ffprobe, _list_names(ffmpeg, '-filters'), _list_names(ffmpeg, '-encoders'))
+
+
+_capabilities = None
+_capabilities_lock = threading.Lock()
+
+
+def get_capabilities() -> FFmpegCapabilities:
+    """Process-wide ffmpeg capabilities (probed on first use)."""
+    global _capabilities
+    if _capabilities is None:
+        with _capabilities_lock:
+            if _capabilities is None:
+                _capabilities = probe_capabilities()
+    return _capabilities
+
+
+_clip_info: Dict[Tuple[str, int, int], Tuple[float, Optional[float]]] = {}
+_clip_info_lock = threading.Lock()
+
+
+def _file_key(path: str) -> Optional[Tuple[str, int, int]]:
+    """Memo key for a file: (real path, size, mtime). None if it can't be stat'ed."""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return os.path.realpath(path), stat.st_size, stat.st_mtime_ns
+
+
+def _probe_inputs(ffmpeg: str, paths: Sequence[str]) -> List[Tuple[Optional[float], Optional[float]]]:
+    """(duration, video frame rate) of several files from one
+    `ffmpeg -i a -i b ...` run (ffmpeg exits with "no output" after printing
+    each input's header, which is all we need). None for anything it
+    couldn't read."""
+    cmd = [ffmpeg, '-hide_banner']
+    for path in paths:
+        cmd += ['-i', path]
+    try:
+        result = subprocess.run(cmd, capture_output=True, timeout=10 + 2 * len(paths))
+    except (OSError, subprocess.SubprocessError):
+        return [(None, None)] * len(paths)
+
+    durations, rates, current = [None] * len(paths), [None] * len(paths), None
+    for line in result.stderr.decode(errors='replace').splitlines():
+        if line.startswith('Input #'):
+            try:
+                current = int(line.split('#', 1)[1].split(',', 1)[0])
+            except ValueError:
+                current = None
+            continue
+        if current is None or current >= len(paths):
+            continue
+        match = _DURATION_LINE.search(line)
+        if match and durations[current] is None:
+            hours, minutes, seconds = match.groups()
+            durations[current] = int(hours) * 3600 + int(minutes) * 60 + float(seconds)
+        match = _FRAME_RATE.search(line)
+        if match and rates[current] is None:
+            rates[current] = float(match.group(1))
+    return list(zip(durations, rates))
+
+
+def _clip_headers(paths: Sequence[str]) -> List[Tuple[Optional[float], Optional[float]]]:
+    """(duration, frame rate) of each file. Files already seen in this process
+    (same path, size and mtime) aren't probed again; the rest are probed
+    together in a single ffmpeg run."""
+    keys = [_file_key(path) for path in paths]
+    with _clip_info_lock:
+        known = [_clip_info.get(key) if key else None for key in keys]
+    missing = [i for i, info in enumerate(known) if info is None]
+    ffmpeg = get_capabilities().ffmpeg
+    if missing and ffmpeg:
+        probed = _probe_inputs(ffmpeg, [paths[i] for i in missing])
+        with _clip_info_lock:
+            for i, info in zip(missing, probed):
+                if info[0]:
+                    known[i] = info
+                    if keys[i]:
+                        _clip_info[keys[i]] = info
+    return [info or (None, None) for info in known]
+
+
+def clip_headers(paths: Sequence[str]) -> List[Tuple[float, float]]:
+    """(duration in seconds, video frame rate) of each file, from one probe
+    (8.0 and 24.0 for anything unreadable)."""
+    return [(duration or _DEFAULT_DURATION, rate or _DEFAULT_FRAME_RATE)
+            for duration, rate in _clip_headers(paths)]
+
+
+def clip_durations(paths: Sequence[str]) -> List[float]:
+    """Duration in seconds of each file (8.0 if unreadable)."""
+    return [duration or _DEFAULT_DURATION for duration, _ in _clip_headers(paths)]
+
+
+def clip_frame_rates(paths: Sequence[str]) -> List[float]:
+    """Video frame rate of each file (24.0 if unreadable)."""
+    return [rate or _DEFAULT_FRAME_RATE for _, rate in _clip_headers(paths)]
@@ -0,0 +1,104 @@
+"""
+Face-similarity scoring for scene image candidates.
+
+The reference face (ref_front.png) is read and prepared once per process,
+not once per candidate. Candidates are downloaded concurrently and scored
+by Gemini vision concurrently, so picking a scene image costs about one
+Gemini round-trip instead of one per candidate (calls go through llm.py).
+"""
+
+import io
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from google.genai import types
+from PIL import Image
+
+from .config import FACE_SCORING_WORKERS
+from .llm import get_llm
+from . import transport
+
+_SCORE_PROMPT = (
+    "Rate 1-10 how similar the face in Image A is to Image B. "
+    "Consider: bone structure, eye shape/color, nose shape, lip shape, "
+    "skin tone, freckle pattern, cheekbone definition, jawline, hair. "
+    "10 = clearly the same person. 1 = completely different person. "
+    "Respond with ONLY a single number."
+)
+
+
+def _mime_type(image: Image.Image) -> str:
+    return Image.MIME.get(image.format or '', 'image/png')
+
+
+class FaceScorer:
+    """Scores candidate images against one reference face (thread-safe)."""
+
+    def __init__(self, ref_image_path: str, workers: int = FACE_SCORING_WORKERS):
+        with open(ref_image_path, 'rb') as f:
+            ref_bytes = f.read()
+        ref_image = Image.open(io.BytesIO(ref_bytes))
+        self.ref_image_path = ref_image_path
+        self.workers = max(1, workers)
+        self._ref_part = types.Part.from_bytes(data=ref_bytes, mime_type=_mime_type(ref_image))
+
+    @staticmethod
+    def _download(url: str) -> Optional[Tuple[bytes, Image.Image]]:
+        try:
+            resp = transport.get(url, timeout=30)
+            if resp.status_code != 200:
+                print(f"    Candidate download failed: {resp.status_code}")
+                return None
+            image = Image.open(io.BytesIO(resp.content))
+            image.load()
+            return resp.content, image
+        except Exception as e:
+            print(f"    Candidate download error: {e}")
+            return None
+
+    def gemini_score(self, image_bytes: bytes, image: Image.Image) -> int:
+        """Gemini vision score 1-10, or 0 on failure."""
+        if not get_llm().api_key():
+            return 0
+        try:
+            response = get_llm().generate_content(
+                model='gemini-2.5-flash',
+                contents=[
+                    _SCORE_PROMPT,
+                    types.Part.from_bytes(data=image_bytes, mime_type=_mime_type(image)),
+                    "Image A (candidate) above. Image B (reference) below.",
+                    self._ref_part,
+                ],
+                label='face score',
+            )
+            score = int(response.text.strip().split()[0])
+            return max(1, min(10, score))
+        except Exception as e:
+            print(f"    Face scoring error: {e}")
+            return 0
+
+    def score_candidates(self, urls: Sequence[str]) -> List[int]:
+        """Scores (1-10, 0 = failed) in the order of `urls`."""
+        scores = [0] * len(urls)
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            downloads = list(executor.map(lambda url: self._download(url) if url else None, urls))
+            fetched = [i for i, downloaded in enumerate(downloads) if downloaded]
+            results = executor.map(lambda i: self.gemini_score(*downloads[i]), fetched)
+            for i, score in zip(fetched, results):
+                scores[i] = score
+        return scores
+
+
+_scorers: Dict[Tuple[str, float], FaceScorer] = {}
+_scorers_lock = threading.Lock()
+
+
+def get_face_scorer(ref_image_path: str) -> FaceScorer:
+    """Process-wide scorer per reference image (rebuilt if the file changes)."""
+    key = (os.path.abspath(ref_image_path), os.path.getmtime(ref_image_path))
+    with _scorers_lock:
+        if key not in _scorers:
+            _scorers[key] = FaceScorer(ref_image_path)
+        return _scorers[key]
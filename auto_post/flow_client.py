@@ -0,0 +1,164 @@
+"""
+useapi.net Google Flow client with an account-wide governor.
+
+Every request to the Flow account goes through one FlowGovernor, a threaded
+governor shared by all threads (video variants, web app jobs):
+    concurrency   at most FLOW_ACCOUNT_CONCURRENCY requests in flight
+    rate          token bucket of FLOW_REQUESTS_PER_MINUTE (small burst allowed)
+    captcha       a 403 reCAPTCHA failure pauses *all* callers with an
+                  exponential, jittered backoff; a success resets it
+    retries       each request gives up after FLOW_CAPTCHA_RETRIES captcha
+                  failures instead of retrying forever
+
+submit() posts a generation request and, for async (201) responses, waits
+for the job through the shared poller.
+"""
+
+import time
+import random
+import threading
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+import requests
+
+from .config import (USEAPI_TOKEN, FLOW_ACCOUNT_CONCURRENCY, FLOW_REQUESTS_PER_MINUTE,
+                     FLOW_CAPTCHA_RETRIES, FLOW_CAPTCHA_BACKOFF, FLOW_CAPTCHA_BACKOFF_MAX)
+from .flow_poller import get_poller
+from . import transport
+
+_BURST = 3  # requests allowed back to back before the rate limit applies
+
+
+def flow_headers(content_type: str = 'application/json') -> Dict[str, str]:
+    """Headers for useapi.net API requests."""
+    return {
+        'Authorization': f'Bearer {USEAPI_TOKEN}',
+        'Content-Type': content_type,
+    }
+
+
+class FlowGovernor:
+    """Shared admission control for one Flow account (thread-safe)."""
+
+    def __init__(self, concurrency: int = FLOW_ACCOUNT_CONCURRENCY,
+                 per_minute: float = FLOW_REQUESTS_PER_MINUTE,
+                 backoff: float = FLOW_CAPTCHA_BACKOFF,
+                 backoff_max: float = FLOW_CAPTCHA_BACKOFF_MAX):
+        self._slots = threading.BoundedSemaphore(max(1, concurrency))
+        self._rate = max(per_minute, 0.1) / 60.0
+        self._tokens = float(_BURST)
+        self._refilled = time.monotonic()
+        self._backoff = backoff
+        self._backoff_max = backoff_max
+        self._captcha_streak = 0
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def admission_delay(self) -> float:
+        """Seconds to wait before the next request may start (0 = go now, and a
+        token has been taken)."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(_BURST, self._tokens + (now - self._refilled) * self._rate)
+            self._refilled = now
+            if now < self._paused_until:
+                return self._paused_until - now + random.uniform(0, 1)
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return 0.0
+            return (1 - self._tokens) / self._rate + random.uniform(0, 0.5)
+
+    def report_captcha(self) -> float:
+        """A captcha failure: pause every caller. Returns the pause in seconds."""
+        with self._lock:
+            self._captcha_streak += 1
+            delay = min(self._backoff * 2 ** (self._captcha_streak - 1), self._backoff_max)
+            delay *= random.uniform(0.8, 1.2)
+            self._paused_until = max(self._paused_until, time.monotonic() + delay)
+            return delay
+
+    def report_success(self) -> None:
+        with self._lock:
+            self._captcha_streak = 0
+
+    @contextmanager
+    def slot(self):
+        """Wait for admission, then hold one of the account's request slots."""
+        while True:
+            delay = self.admission_delay()
+            if delay <= 0:
+                break
+            time.sleep(delay)
+        self._slots.acquire()
+        try:
+            yield
+        finally:
+            self._slots.release()
+
+
+class FlowClient:
+    """Generation requests against the Flow account, through a governor."""
+
+    def __init__(self, governor: Optional[FlowGovernor] = None, retries: int = FLOW_CAPTCHA_RETRIES):
+        self.governor = governor or FlowGovernor()
+        self.retries = max(1, retries)
+
+    def _post(self, url: str, payload: Dict, timeout: float):
+        return transport.post(url, headers=flow_headers(), json=payload, timeout=timeout)
+
+    def _handle(self, resp, label: str, attempt: int):
+        """Classify a response: ('done', result), ('job', job_id), ('captcha', None) or ('fail', None)."""
+        if resp.status_code == 200:
+            self.governor.report_success()
+            return 'done', resp.json()
+        if resp.status_code == 201:
+            self.governor.report_success()
+            result = resp.json()
+            job_id = result.get('jobid') or result.get('jobId')
+            if not job_id:
+                print(f"    No jobid in async {label} response: {list(result.keys())}")
+                return 'fail', None
+            print(f"    {label.capitalize()} job queued: {job_id[:60]}...")
+            return 'job', job_id
+        if resp.status_code == 403 and 'reCAPTCHA' in resp.text:
+            delay = self.governor.report_captcha()
+            print(f"    Captcha failed ({label}, attempt {attempt}/{self.retries}), "
+                  f"account paused {delay:.0f}s...")
+            return 'captcha', None
+        print(f"    Flow {label} failed: {resp.status_code} {resp.text[:500]}")
+        return 'fail', None
+
+    def submit(self, url: str, payload: Dict, label: str = 'request', timeout: float = 120) -> Optional[Dict]:
+        """POST a Flow request and return the finished result (the response
+        itself, or the completed job for async requests). None on failure."""
+        for attempt in range(1, self.retries + 1):
+            try:
+                with self.governor.slot():
+                    resp = self._post(url, payload, timeout)
+            except requests.RequestException as e:
+                print(f"    Flow {label} error: {e}")
+                return None
+            outcome, value = self._handle(resp, label, attempt)
+            if outcome == 'done':
+                return value
+            if outcome == 'job':
+                return get_poller().wait(value)
+            if outcome == 'fail':
+                return None
+        print(f"    Flow {label}: giving up after {self.retries} captcha failures")
+        return None
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_flow_client() -> FlowClient:
+    """Process-wide client, so every caller shares one governor."""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = FlowClient()
+    return _client
@@ -0,0 +1,213 @@
+"""
+Shared waiter for useapi.net async jobs.
+
+Instead of every video thread sleeping FLOW_POLL_INTERVAL between its own
+polls, callers register job IDs with one background poller and get a Future
+back (or block on it via wait). The poller checks every due job in one
+batch over the pooled HTTP session. Each job's interval starts short, so
+quick jobs (images, upscales) resolve within seconds, and backs off towards
+FLOW_POLL_MAX_INTERVAL for long ones (clips, extensions).
+
+Progress lines are handed back to the waiting thread and printed there, so
+callers that capture their thread's output (web_app.py) still see them.
+"""
+
+import time
+import queue
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, Optional
+
+import requests
+
+from .config import USEAPI_TOKEN, USEAPI_BASE_URL
+from . import transport
+
+FLOW_POLL_MIN_INTERVAL = 3     # seconds before the first check of a new job
+FLOW_POLL_MAX_INTERVAL = 15    # interval cap for long-running jobs
+FLOW_POLL_BACKOFF = 1.5        # interval multiplier after each pending check
+FLOW_JOB_TIMEOUT = 750         # ~12.5 min max per operation
+FLOW_POLL_BATCH_WORKERS = 4    # job checks in flight at once
+_PROGRESS_EVERY = 60           # seconds between "still running" lines per job
+_WAIT_MARGIN = 60              # grace past a job's deadline before wait() gives up on the poller
+
+
+class _TrackedJob:
+    __slots__ = ('job_id', 'future', 'log', 'started', 'deadline', 'interval', 'next_poll', 'status', 'last_print')
+
+    def __init__(self, job_id: str, min_interval: float, timeout: float):
+        now = time.monotonic()
+        self.job_id = job_id
+        self.future = Future()
+        self.log = queue.Queue()   # progress lines for the waiting thread to print
+        self.started = now
+        self.deadline = now + timeout
+        self.interval = min_interval
+        self.next_poll = now + min_interval
+        self.status = None
+        self.last_print = now
+
+
+class FlowJobPoller:
+    """Tracks outstanding job IDs and resolves each one's Future with the
+    completed job dict, or None if it failed, was flagged or timed out."""
+
+    def __init__(self, base_url: str = USEAPI_BASE_URL,
+                 min_interval: float = FLOW_POLL_MIN_INTERVAL,
+                 max_interval: float = FLOW_POLL_MAX_INTERVAL,
+                 backoff: float = FLOW_POLL_BACKOFF,
+                 timeout: float = FLOW_JOB_TIMEOUT):
+        self.base_url = base_url
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self.timeout = timeout
+        self._jobs: Dict[str, _TrackedJob] = {}
+        self._cond = threading.Condition()
+        self._thread = None
+        self._executor = ThreadPoolExecutor(max_workers=FLOW_POLL_BATCH_WORKERS, thread_name_prefix='flow-poll')
+
+    def _track(self, job_id: str) -> _TrackedJob:
+        with self._cond:
+            tracked = self._jobs.get(job_id)
+            if tracked is None:
+                tracked = self._jobs[job_id] = _TrackedJob(job_id, self.min_interval, self.timeout)
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name='flow-poller', daemon=True)
+                    self._thread.start()
+                self._cond.notify()
+            return tracked
+
+    def submit(self, job_id: str) -> Future:
+        """Start tracking a job (or return the Future of one already tracked)."""
+        return self._track(job_id).future
+
+    @staticmethod
+    def _print_progress(tracked: _TrackedJob):
+        while True:
+            try:
+                print(tracked.log.get_nowait())
+            except queue.Empty:
+                return
+
+    def wait(self, job_id: str) -> Optional[Dict]:
+        """Block until the job finishes, printing its progress in this thread."""
+        tracked = self._track(job_id)
+        while not tracked.future.done():
+            if time.monotonic() >= tracked.deadline + _WAIT_MARGIN:
+                # The poller should have timed the job out by now; don't hang on it
+                print(f"    Gave up waiting for job after {int(self.timeout + _WAIT_MARGIN)}s")
+                self._finish(tracked, None)
+                break
+            try:
+                print(tracked.log.get(timeout=1))
+            except queue.Empty:
+                pass
+        self._print_progress(tracked)
+        return tracked.future.result()
+
+    def pending(self) -> int:
+        with self._cond:
+            return len(self._jobs)
+
+    def _run(self):
+        try:
+            while True:
+                with self._cond:
+                    if not self._jobs:
+                        self._thread = None  # restarted by the next submit()
+                        return
+                    now = time.monotonic()
+                    due = [tracked for tracked in self._jobs.values() if tracked.next_poll <= now]
+                    if not due:
+                        self._cond.wait(min(tracked.next_poll for tracked in self._jobs.values()) - now)
+                        continue
+                list(self._executor.map(self._check, due))
+        except Exception as e:
+            # Fail every outstanding job rather than leave its waiter hanging
+            with self._cond:
+                stranded = list(self._jobs.values())
+                self._thread = None  # let the next submit() start a fresh poller
+            for tracked in stranded:
+                tracked.log.put(f"    Poller error: {e}")
+                self._finish(tracked, None)
+        finally:
+            with self._cond:
+                if self._thread is threading.current_thread():
+                    self._thread = None
+
+    def _check(self, tracked: _TrackedJob):
+        """Fetch and apply one job's status; any unexpected error fails that job."""
+        try:
+            self._update(tracked, self._fetch(tracked))
+        except Exception as e:
+            tracked.log.put(f"    Poll error: {e}")
+            self._finish(tracked, None)
+
+    def _fetch(self, tracked: _TrackedJob) -> Optional[Dict]:
+        """One job check; None (and a logged reason) if it didn't get an answer."""
+        try:
+            resp = transport.get(
+                f'{self.base_url}/jobs/{tracked.job_id}',
+                headers={'Authorization': f'Bearer {USEAPI_TOKEN}', 'Content-Type': 'application/json'},
+                timeout=30,
+            )
+        except requests.RequestException as e:
+            tracked.log.put(f"    Poll error: {e}")
+            return None
+        if resp.status_code != 200:
+            tracked.log.put(f"    Poll returned {resp.status_code}: {resp.text[:300]}")
+            return None
+        try:
+            result = resp.json()
+        except ValueError as e:
+            tracked.log.put(f"    Poll returned invalid JSON: {e}")
+            return None
+        if not isinstance(result, dict):
+            tracked.log.put(f"    Poll returned unexpected JSON: {resp.text[:300]}")
+            return None
+        return result
+
+    def _finish(self, tracked: _TrackedJob, result: Optional[Dict]):
+        with self._cond:
+            if self._jobs.get(tracked.job_id) is tracked:
+                del self._jobs[tracked.job_id]
+            if tracked.future.done():
+                return  # already resolved (wait() gave up, or the poller beat it)
+            tracked.future.set_result(result)
+
+    def _update(self, tracked: _TrackedJob, result: Optional[Dict]):
+        now = time.monotonic()
+        elapsed = int(now - tracked.started)
+        status = result.get('status', 'unknown') if result else None
+
+        if status == 'completed':
+            tracked.log.put(f"    Job completed ({elapsed}s elapsed)")
+            return self._finish(tracked, result)
+        if status in ('failed', 'nsfw'):
+            tracked.log.put(f"    Job {status}: {result}")
+            return self._finish(tracked, None)
+        if now >= tracked.deadline:
+            tracked.log.put(f"    Timeout after {int(self.timeout)}s")
+            return self._finish(tracked, None)
+
+        if status and (status != tracked.status or now - tracked.last_print >= _PROGRESS_EVERY):
+            tracked.log.put(f"    Polling... status={status} ({elapsed}s elapsed)")
+            tracked.status = status
+            tracked.last_print = now
+        tracked.interval = min(tracked.interval * self.backoff, self.max_interval)
+        tracked.next_poll = now + tracked.interval
+
+
+_poller = None
+_poller_lock = threading.Lock()
+
+
+def get_poller() -> FlowJobPoller:
+    """Process-wide poller shared by every video thread."""
+    global _poller
+    if _poller is None:
+        with _poller_lock:
+            if _poller is None:
+                _poller = FlowJobPoller()
+    return _poller
@@ -0,0 +1,191 @@
+"""
+In-memory source health store with pluggable persistence.
+
+Scraper success/failure counters are kept in memory for the run (thread-safe)
+and written once, atomically, by flush() - at the end of the scrape phase,
+when curation saves, or at interpreter exit. Backends: JSON file and SQLite.
+"""
+
+import os
+import copy
+import json
+import sqlite3
+import threading
+from datetime import datetime, timezone
+from typing import Dict
+
+from .utils import write_json_atomic
+
+
+def empty_health() -> Dict:
+    """Initial health structure."""
+    return {
+        'sources': {},
+        'replacement_queue': [],
+        'manual_review': []
+    }
+
+
+def _new_source_entry() -> Dict:
+    return {
+        'consecutive_failures': 0,
+        'last_success': None,
+        'last_failure': None,
+        'total_successes': 0,
+        'total_failures': 0
+    }
+
+
+# ============================================================================
+# BACKENDS
+# ============================================================================
+
+class JsonHealthBackend:
+    """Whole-document JSON file, replaced atomically via temp file + rename."""
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def load(self) -> Dict:
+        if not os.path.exists(self.path):
+            return empty_health()
+        with open(self.path, 'r') as f:
+            return json.load(f)
+
+    def save(self, data: Dict) -> None:
+        write_json_atomic(self.path, data, indent=2)
+
+
+class SqliteHealthBackend:
+    """One row per scraper plus JSON blobs for the curation queues.
+    Each save is a single transaction."""
+
+    def __init__(self, path: str):
+        self.path = path
+        with self._connect() as conn:
+            conn.execute('CREATE TABLE IF NOT EXISTS sources (scraper TEXT PRIMARY KEY, data TEXT NOT NULL)')
+            conn.execute('CREATE TABLE IF NOT EXISTS state (key TEXT PRIMARY KEY, value TEXT NOT NULL)')
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=30)
+
+    def load(self) -> Dict:
+        data = empty_health()
+        conn = self._connect()
+        try:
+            for scraper, blob in conn.execute('SELECT scraper, data FROM sources'):
+                data['sources'][scraper] = json.loads(blob)
+            for key, blob in conn.execute('SELECT key, value FROM state'):
+                data[key] = json.loads(blob)
+        finally:
+            conn.close()
+        return data
+
+    def save(self, data: Dict) -> None:
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute('DELETE FROM sources')
+                conn.executemany(
+                    'INSERT INTO sources (scraper, data) VALUES (?, ?)',
+                    [(name, json.dumps(entry)) for name, entry in data.get('sources', {}).items()]
+                )
+                conn.execute('DELETE FROM state')
+                conn.executemany(
+                    'INSERT INTO state (key, value) VALUES (?, ?)',
+                    [(key, json.dumps(value)) for key, value in data.items() if key != 'sources']
+                )
+        finally:
+            conn.close()
+
+
+HEALTH_BACKENDS = {
+    'json': JsonHealthBackend,
+    'sqlite': SqliteHealthBackend,
+}
+
+
+def make_health_backend(name: str, path: str):
+    """Build a backend by name ('json' or 'sqlite')."""
+    try:
+        backend_cls = HEALTH_BACKENDS[name]
+    except KeyError:
+        raise ValueError(f"Unknown source health backend '{name}' (expected one of: {', '.join(HEALTH_BACKENDS)})")
+    return backend_cls(path)
+
+
+# ============================================================================
+# STORE
+# ============================================================================
+
+class HealthStore:
+    """Thread-safe in-memory health counters, flushed once to a backend."""
+
+    def __init__(self, backend, logger=None):
+        self.backend = backend
+        self.logger = logger
+        self._lock = threading.RLock()
+        self._data = None
+        self._dirty = False
+
+    def _ensure_loaded(self) -> Dict:
+        if self._data is None:
+            try:
+                self._data = self.backend.load()
+            except Exception as e:
+                if self.logger:
+                    self.logger.error(f"Error loading source health: {e}")
+                self._data = empty_health()
+            for key, value in empty_health().items():
+                self._data.setdefault(key, value)
+        return self._data
+
+    def _source(self, scraper_name: str) -> Dict:
+        sources = self._ensure_loaded()['sources']
+        if scraper_name not in sources:
+            sources[scraper_name] = _new_source_entry()
+        return sources[scraper_name]
+
+    def record_success(self, scraper_name: str) -> Dict:
+        with self._lock:
+            source = self._source(scraper_name)
+            source['consecutive_failures'] = 0
+            source['last_success'] = datetime.now(timezone.utc).isoformat()
+            source['total_successes'] = source.get('total_successes', 0) + 1
+            self._dirty = True
+            return dict(source)
+
+    def record_failure(self, scraper_name: str, error: str) -> Dict:
+        with self._lock:
+            source = self._source(scraper_name)
+            source['consecutive_failures'] = source.get('consecutive_failures', 0) + 1
+            source['last_failure'] = datetime.now(timezone.utc).isoformat()
+            source['last_failure_reason'] = error
+            source['total_failures'] = source.get('total_failures', 0) + 1
+            self._dirty = True
+            return dict(source)
+
+    def snapshot(self) -> Dict:
+        """Deep copy of the current health data."""
+        with self._lock:
+            return copy.deepcopy(self._ensure_loaded())
+
+    def replace(self, data: Dict) -> None:
+        """Replace the in-memory data wholesale (used by curation)."""
+        with self._lock:
+            self._data = copy.deepcopy(data)
+            self._dirty = True
+
+    def flush(self) -> bool:
+        """Persist pending changes. Returns True if anything was written."""
+        with self._lock:
+            if not self._dirty or self._data is None:
+                return False
+            try:
+                self.backend.save(self._data)
+                self._dirty = False
+                return True
+            except Exception as e:
+                if self.logger:
+                    self.logger.error(f"Error saving source health: {e}")
+                return False
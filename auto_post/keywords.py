@@ -0,0 +1,90 @@
+"""
+Precompiled multi-keyword matcher for practice-area filtering.
+
+All keywords are folded into one trie-shaped regex, built once at import.
+Scanning a text is a single pass over it, and the cost barely grows with the
+number of keywords because shared prefixes are matched only once.
+"""
+
+import re
+from typing import Dict, Iterable, List, Tuple
+
+from .config import PRACTICE_AREA_KEYWORD_GROUPS
+
+_END = ''
+
+
+def _trie_pattern(node) -> str:
+    """Regex for a keyword trie. Children start with distinct characters, so
+    at most one branch can match; terminal nodes make the rest optional and
+    the greedy '?' prefers the longer keyword."""
+    branches = [re.escape(char) + _trie_pattern(child)
+                for char, child in sorted(node.items()) if char != _END]
+    if not branches:
+        return ''
+    body = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+    if _END in node:
+        return '(?:' + body + ')?'
+    return body
+
+
+class KeywordMatcher:
+    """Case-insensitive substring matcher over grouped keywords.
+
+    Matching has the same semantics as `keyword.lower() in text.lower()` for
+    every keyword, but runs as one regex scan. The lookahead finds the longest
+    keyword starting at each position. Keywords that are substrings of a
+    matched keyword are added from a closure precomputed at build time, so
+    overlapping keywords are never missed."""
+
+    def __init__(self, groups: Dict[str, Iterable[str]]):
+        self.areas_by_keyword = {}
+        for area, keywords in groups.items():
+            for keyword in keywords:
+                areas = self.areas_by_keyword.setdefault(keyword.lower(), [])
+                if area not in areas:
+                    areas.append(area)
+
+        keywords = [k for k in self.areas_by_keyword if k]
+        trie = {}
+        for keyword in keywords:
+            node = trie
+            for char in keyword:
+                node = node.setdefault(char, {})
+            node[_END] = {}
+        self._regex = re.compile('(?=(' + _trie_pattern(trie) + '))') if keywords else None
+
+        # keyword -> every keyword contained in it (itself included)
+        self._contained = {
+            keyword: tuple(other for other in keywords if other in keyword)
+            for keyword in keywords
+        }
+
+    def find_keywords(self, text: str) -> List[str]:
+        """Distinct keywords present in text, in order of first occurrence."""
+        if not self._regex or not text:
+            return []
+        found = {}
+        for match in self._regex.finditer(text.lower()):
+            longest = match.group(1)
+            if longest:
+                for keyword in self._contained[longest]:
+                    found.setdefault(keyword, None)
+        return list(found)
+
+    def match(self, text: str) -> Tuple[Dict[str, int], int]:
+        """Return ({area: distinct keyword hits}, total distinct keywords) for text."""
+        keywords = self.find_keywords(text)
+        areas = {}
+        for keyword in keywords:
+            for area in self.areas_by_keyword[keyword]:
+                areas[area] = areas.get(area, 0) + 1
+        return areas, len(keywords)
+
+
+PRACTICE_AREA_MATCHER = KeywordMatcher(PRACTICE_AREA_KEYWORD_GROUPS)
+
+
+def match_practice_areas(title: str, summary: str = '') -> Tuple[Dict[str, int], int]:
+    """Practice areas an article's title/summary touches, with keyword hit counts."""
+    return PRACTICE_AREA_MATCHER.match(f"{title} {summary}")
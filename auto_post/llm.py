@@ -0,0 +1,266 @@
+"""
+Gemini gateway: one place every Gemini/Imagen call goes through.
+
+    clients       one long-lived genai.Client per API key, shared by all
+                  threads (its HTTP connections are reused across calls)
+    concurrency   calls hold the API's slot (api_slot: 'gemini' or
+                  'imagen', sized by API_CONCURRENCY)
+    rate          per-model token bucket (LLM_MODEL_RPM)
+    retries       429/5xx responses are retried with backoff, up to
+                  LLM_MAX_RETRIES times
+    stats         latency, token counts, retries and failures are recorded
+                  per (label, model); report() summarises them for the run,
+                  heaviest prompt first
+    cache         with LLM_CACHE_ENABLED, identical text requests are answered
+                  from the on-disk cache in llm_cache.py
+
+Callers pass a short label naming the prompt ('article', 'select', ...), so
+the report shows which prompt dominates cost and time.
+"""
+
+import os
+import time
+import random
+import threading
+from typing import Any, Dict, Optional, Tuple
+
+from google import genai
+from google.genai import errors
+
+from .config import GEMINI_API_KEY, LLM_MAX_RETRIES, LLM_MODEL_RPM, LLM_CACHE_ENABLED, LLM_CACHE_BYPASS
+from .llm_cache import LLMResponseCache, CachedResponse, cache_key
+from .pipeline import api_slot
+
+_RETRYABLE_CODES = {429, 500, 502, 503, 504}
+_RETRY_BACKOFF = 2.0   # seconds before the first retry, doubled per retry
+
+
+def _api_for(model: str) -> str:
+    return 'imagen' if model.startswith('imagen') else 'gemini'
+
+
+class _RateLimiter:
+    """Token bucket of `per_minute` requests (bursts up to one minute's worth)."""
+
+    def __init__(self, per_minute: float):
+        self._rate = per_minute / 60.0
+        self._capacity = max(1.0, per_minute)
+        self._tokens = self._capacity
+        self._refilled = time.monotonic()
+        self._lock = threading.Lock()
+
+    def wait(self) -> None:
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self._capacity, self._tokens + (now - self._refilled) * self._rate)
+                self._refilled = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                delay = (1 - self._tokens) / self._rate
+            time.sleep(delay)
+
+
+class _CallStats:
+    __slots__ = ('calls', 'failures', 'retries', 'cache_hits', 'seconds', 'max_seconds',
+                 'input_tokens', 'output_tokens')
+
+    def __init__(self):
+        self.calls = self.failures = self.retries = self.cache_hits = 0
+        self.seconds = self.max_seconds = 0.0
+        self.input_tokens = self.output_tokens = 0
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            'calls': self.calls,
+            'failures': self.failures,
+            'retries': self.retries,
+            'cache_hits': self.cache_hits,
+            'seconds': round(self.seconds, 2),
+            'avg_seconds': round(self.seconds / self.calls, 2) if self.calls else 0.0,
+            'max_seconds': round(self.max_seconds, 2),
+            'input_tokens': self.input_tokens,
+            'output_tokens': self.output_tokens,
+        }
+
+
+def _usage(response) -> Tuple[int, int]:
+    """(input, output) tokens from a response's usage metadata (0, 0 if absent)."""
+    usage = getattr(response, 'usage_metadata', None)
+    if usage is None:
+        return 0, 0
+    output = (getattr(usage, 'candidates_token_count', None) or 0) + (getattr(usage, 'thoughts_token_count', None) or 0)
+    return getattr(usage, 'prompt_token_count', None) or 0, output
+
+
+class LLMGateway:
+    """Shared clients, limits and call statistics (thread-safe)."""
+
+    def __init__(self, max_retries: int = LLM_MAX_RETRIES, model_rpm: Optional[Dict[str, float]] = None,
+                 cache_enabled: bool = LLM_CACHE_ENABLED, cache_bypass: bool = LLM_CACHE_BYPASS):
+        self.max_retries = max(0, max_retries)
+        self.cache_enabled = cache_enabled
+        self.cache_bypass = cache_bypass
+        self._cache = None
+        self._model_rpm = dict(LLM_MODEL_RPM if model_rpm is None else model_rpm)
+        self._clients: Dict[str, genai.Client] = {}
+        self._limiters: Dict[str, _RateLimiter] = {}
+        self._stats: Dict[Tuple[str, str], _CallStats] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def api_key() -> str:
+        return os.environ.get('GEMINI_API_KEY') or GEMINI_API_KEY
+
+    def client(self, api_key: Optional[str] = None) -> genai.Client:
+        """The shared client for an API key (default: GEMINI_API_KEY)."""
+        api_key = api_key or self.api_key()
+        with self._lock:
+            if api_key not in self._clients:
+                self._clients[api_key] = genai.Client(api_key=api_key)
+            return self._clients[api_key]
+
+    def _limiter(self, model: str) -> Optional[_RateLimiter]:
+        per_minute = self._model_rpm.get(model)
+        if not per_minute:
+            return None
+        with self._lock:
+            if model not in self._limiters:
+                self._limiters[model] = _RateLimiter(per_minute)
+            return self._limiters[model]
+
+    def _response_cache(self) -> Optional[LLMResponseCache]:
+        if not self.cache_enabled:
+            return None
+        with self._lock:
+            if self._cache is None:
+                try:
+                    self._cache = LLMResponseCache()
+                except Exception as e:
+                    print(f"  LLM cache unavailable ({e}), continuing without it")
+                    self.cache_enabled = False
+                    return None
+            return self._cache
+
+    def _record_hit(self, label: str, model: str) -> None:
+        with self._lock:
+            self._stats.setdefault((label, model), _CallStats()).cache_hits += 1
+
+    def _record(self, label: str, model: str, seconds: float, retries: int, ok: bool, response=None) -> None:
+        input_tokens, output_tokens = _usage(response)
+        with self._lock:
+            stats = self._stats.setdefault((label, model), _CallStats())
+            stats.calls += 1
+            stats.failures += 0 if ok else 1
+            stats.retries += retries
+            stats.seconds += seconds
+            stats.max_seconds = max(stats.max_seconds, seconds)
+            stats.input_tokens += input_tokens
+            stats.output_tokens += output_tokens
+
+    def _call(self, label: str, model: str, api_key: Optional[str], send):
+        """Run send(client) under the model's limits, retrying transient errors."""
+        client = self.client(api_key)
+        limiter = self._limiter(model)
+        started = time.monotonic()
+        retries = 0
+        while True:
+            if limiter:
+                limiter.wait()
+            try:
+                with api_slot(_api_for(model)):
+                    response = send(client)
+            except errors.APIError as e:
+                if e.code in _RETRYABLE_CODES and retries < self.max_retries:
+                    delay = _RETRY_BACKOFF * 2 ** retries * random.uniform(0.8, 1.2)
+                    retries += 1
+                    print(f"  Gemini {label} ({model}) returned {e.code}, retrying in {delay:.0f}s "
+                          f"({retries}/{self.max_retries})...")
+                    time.sleep(delay)
+                    continue
+                self._record(label, model, time.monotonic() - started, retries, ok=False)
+                raise
+            except Exception:
+                self._record(label, model, time.monotonic() - started, retries, ok=False)
+                raise
+            self._record(label, model, time.monotonic() - started, retries, ok=True, response=response)
+            return response
+
+    def generate_content(self, model: str, contents, config=None, label: str = 'gemini',
+                         api_key: Optional[str] = None, cache: bool = True):
+        """client.models.generate_content through the gateway. With the response
+        cache enabled, an identical earlier request is answered from disk;
+        cache=False skips that lookup (the fresh response is still stored)."""
+        response_cache = self._response_cache()
+        key = cache_key(model, contents, config) if response_cache else None
+        if key and cache and not self.cache_bypass:
+            try:
+                text = response_cache.get(key)
+            except Exception as e:
+                print(f"  LLM cache read failed: {e}")
+                text = None
+            if text is not None:
+                self._record_hit(label, model)
+                return CachedResponse(text)
+
+        response = self._call(label, model, api_key,
+                              lambda client: client.models.generate_content(model=model, contents=contents, config=config))
+        if key:
+            try:
+                text = response.text
+                if text:
+                    response_cache.put(key, model, text, label)
+            except Exception as e:
+                print(f"  LLM cache write failed: {e}")
+        return response
+
+    def generate_images(self, model: str, prompt: str, config=None, label: str = 'imagen',
+                        api_key: Optional[str] = None):
+        """client.models.generate_images through the gateway."""
+        return self._call(label, model, api_key,
+                          lambda client: client.models.generate_images(model=model, prompt=prompt, config=config))
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """{"label (model)": {calls, failures, retries, seconds, ...}}, heaviest first."""
+        with self._lock:
+            items = sorted(self._stats.items(), key=lambda item: item[1].seconds, reverse=True)
+            return {f"{label} ({model})": stats.as_dict() for (label, model), stats in items}
+
+    def report(self) -> str:
+        """Per-prompt usage for this run, as printable lines."""
+        stats = self.stats()
+        if not stats:
+            return "LLM usage: no calls"
+        total_seconds = sum(s['seconds'] for s in stats.values()) or 1
+        lines = ["LLM usage (heaviest first):"]
+        for name, s in stats.items():
+            line = (f"  {name}: {s['calls']} call(s), {s['seconds']:.1f}s "
+                    f"({100 * s['seconds'] / total_seconds:.0f}% of time, avg {s['avg_seconds']:.1f}s), "
+                    f"{s['input_tokens']} in / {s['output_tokens']} out tokens")
+            if s['retries']:
+                line += f", {s['retries']} retr{'y' if s['retries'] == 1 else 'ies'}"
+            if s['cache_hits']:
+                line += f", {s['cache_hits']} from cache"
+            if s['failures']:
+                line += f", {s['failures']} failed"
+            lines.append(line)
+        return '\n'.join(lines)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._stats.clear()
+
+
+_gateway = None
+_gateway_lock = threading.Lock()
+
+
+def get_llm() -> LLMGateway:
+    """Process-wide gateway shared by every thread."""
+    global _gateway
+    if _gateway is None:
+        with _gateway_lock:
+            if _gateway is None:
+                _gateway = LLMGateway()
+    return _gateway
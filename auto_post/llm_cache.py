@@ -0,0 +1,147 @@
+"""
+On-disk cache of Gemini text responses (SQLite), used by the gateway in llm.py.
+
+Opt-in with LLM_CACHE_ENABLED=true. Entries are content-addressed: the key is
+a SHA-256 of the model, the prompt contents (inline images by their own hash)
+and the request config, so an identical request made again - a rerun after a
+crash, a dry run of fix_titles.py, iterating on one custom video script -
+returns the stored text without calling the API.
+
+Entries expire after LLM_CACHE_TTL hours, and the least recently used ones
+are evicted once the stored text passes LLM_CACHE_MAX_MB. LLM_CACHE_BYPASS=true
+skips lookups (fresh responses are still stored), and a caller can do the same
+for one request with cache=False (e.g. when retrying a response it rejected).
+"""
+
+import json
+import time
+import hashlib
+import sqlite3
+from typing import Any, Optional
+
+from .config import LLM_CACHE_FILE, LLM_CACHE_TTL, LLM_CACHE_MAX_MB
+
+
+class _Uncacheable(Exception):
+    pass
+
+
+def _normalise(value: Any) -> Any:
+    """JSON-safe form of prompt contents / config, with bytes replaced by their
+    hash. Raises _Uncacheable for anything it can't represent faithfully."""
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    if isinstance(value, bytes):
+        return {'sha256': hashlib.sha256(value).hexdigest()}
+    if isinstance(value, dict):
+        return {str(k): _normalise(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_normalise(v) for v in value]
+    if hasattr(value, 'model_dump'):  # google.genai types (pydantic models)
+        return _normalise(value.model_dump(exclude_none=True))
+    raise _Uncacheable(type(value).__name__)
+
+
+def cache_key(model: str, contents: Any, config: Any = None) -> Optional[str]:
+    """Content address of a request, or None if it can't be cached."""
+    try:
+        request = {'model': model, 'contents': _normalise(contents), 'config': _normalise(config)}
+    except _Uncacheable:
+        return None
+    encoded = json.dumps(request, sort_keys=True, separators=(',', ':'), ensure_ascii=False)
+    return hashlib.sha256(encoded.encode('utf-8')).hexdigest()
+
+
+class CachedResponse:
+    """Stands in for a generate_content response served from the cache."""
+
+    usage_metadata = None
+    cached = True
+
+    def __init__(self, text: str):
+        self.text = text
+
+
+class LLMResponseCache:
+    """Response texts in one SQLite table. Every method opens its own
+    connection, so one cache object can be shared by threads."""
+
+    def __init__(self, path: str = LLM_CACHE_FILE, ttl_hours: float = LLM_CACHE_TTL,
+                 max_mb: float = LLM_CACHE_MAX_MB):
+        self.path = path
+        self.ttl = ttl_hours * 3600
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        conn = self._connect()
+        try:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS responses (
+                    key TEXT PRIMARY KEY,
+                    model TEXT NOT NULL,
+                    label TEXT,
+                    text TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    created_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL
+                )''')
+            conn.execute('CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed_at)')
+        finally:
+            conn.close()
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=30, isolation_level=None)
+
+    def get(self, key: str) -> Optional[str]:
+        """Stored text for a key (None if missing or expired)."""
+        now = time.time()
+        conn = self._connect()
+        try:
+            row = conn.execute('SELECT text, created_at FROM responses WHERE key = ?', (key,)).fetchone()
+            if row is None:
+                return None
+            if self.ttl and now - row[1] > self.ttl:
+                conn.execute('DELETE FROM responses WHERE key = ?', (key,))
+                return None
+            conn.execute('UPDATE responses SET accessed_at = ? WHERE key = ?', (now, key))
+            return row[0]
+        finally:
+            conn.close()
+
+    def put(self, key: str, model: str, text: str, label: str = '') -> None:
+        now = time.time()
+        size = len(text.encode('utf-8'))
+        conn = self._connect()
+        try:
+            conn.execute('BEGIN IMMEDIATE')
+            conn.execute(
+                'INSERT OR REPLACE INTO responses (key, model, label, text, size, created_at, accessed_at) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?)', (key, model, label, text, size, now, now))
+            self._evict(conn, now)
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        finally:
+            conn.close()
+
+    def _evict(self, conn, now: float) -> None:
+        """Drop expired entries, then least recently used ones over the size cap."""
+        if self.ttl:
+            conn.execute('DELETE FROM responses WHERE created_at < ?', (now - self.ttl,))
+        total = conn.execute('SELECT COALESCE(SUM(size), 0) FROM responses').fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        excess = total - self.max_bytes
+        doomed = []
+        for key, size in conn.execute('SELECT key, size FROM responses ORDER BY accessed_at'):
+            doomed.append((key,))
+            excess -= size
+            if excess <= 0:
+                break
+        conn.executemany('DELETE FROM responses WHERE key = ?', doomed)
+
+    def clear(self) -> None:
+        conn = self._connect()
+        try:
+            conn.execute('DELETE FROM responses')
+        finally:
+            conn.close()
@@ -0,0 +1,214 @@
+"""
+Batched Sanity mutations: many create/patch operations per HTTP request.
+
+Mutations are queued and sent as one transaction per SANITY_BATCH_SIZE
+documents (or fewer, so a request stays under _MAX_TRANSACTION_BYTES), with
+returnIds and SANITY_MUTATION_VISIBILITY ('async' by default: the request
+returns once the transaction is committed, without waiting for it to be
+queryable). A site-wide fix is N / batch-size round-trips instead of N.
+
+A Sanity transaction is all-or-nothing, so a failure is narrowed down
+instead of failing every document in it:
+    429/5xx/network   the same transaction is retried with backoff, up to
+                      SANITY_MUTATION_RETRIES times
+    mutation errors   documents Sanity names in the error are marked failed
+                      and the rest of the transaction is sent again; a
+                      mutationError that names none splits the transaction
+                      in half until the bad mutation is on its own
+    anything else     (401/403 token, 413 size, malformed request, ...)
+                      fails the whole transaction at once - it would fail
+                      the same way for every document in it
+
+A document without an _id gets one up front and is sent as
+createIfNotExists, so resending a transaction whose response was lost
+neither creates the post twice nor reports the committed create as failed.
+
+Every mutation gets an outcome (ok, document id, operation, error), keyed by
+the ref it was queued with.
+"""
+
+import json
+import time
+import uuid
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import requests
+
+from .config import (
+    SANITY_BASE_URL, SANITY_HEADERS,
+    SANITY_BATCH_SIZE, SANITY_MUTATION_VISIBILITY, SANITY_MUTATION_RETRIES,
+)
+from .pipeline import api_slot
+from . import transport
+
+_RETRYABLE_CODES = {429, 500, 502, 503, 504}
+_RETRY_BACKOFF = 2.0                 # seconds before the first retry, doubled per retry
+_MAX_TRANSACTION_BYTES = 2_000_000   # well under Sanity's request size limit
+
+
+class MutationOutcome:
+    """Result of one queued mutation."""
+
+    __slots__ = ('ref', 'ok', 'id', 'operation', 'error')
+
+    def __init__(self, ref: Any, ok: bool, id: Optional[str] = None, operation: Optional[str] = None,
+                 error: Optional[str] = None):
+        self.ref = ref
+        self.ok = ok
+        self.id = id
+        self.operation = operation
+        self.error = error
+
+    def __repr__(self):
+        status = (self.operation or 'ok') if self.ok else f'failed: {self.error}'
+        return f"MutationOutcome({self.ref!r}, {status})"
+
+
+def create_mutation(document: Dict) -> Dict:
+    """A create mutation. A document without an _id gets a fresh one and is
+    created with createIfNotExists, which makes a resend of it a no-op."""
+    if not document.get('_id'):
+        return {'createIfNotExists': dict(document, _id=str(uuid.uuid4()))}
+    return {'create': document}
+
+
+def patch_mutation(doc_id: str, fields: Dict) -> Dict:
+    """A patch mutation setting `fields` on one document."""
+    return {'patch': {'id': doc_id, 'set': fields}}
+
+
+def _mutation_id(mutation: Dict) -> Optional[str]:
+    body = next(iter(mutation.values()), {})
+    return body.get('id') or body.get('_id')
+
+
+def _rejection(response) -> Tuple[bool, Dict[int, str]]:
+    """(is a Sanity mutationError, {index in transaction: description} for
+    the mutations it names) for a rejected transaction."""
+    try:
+        error = response.json().get('error') or {}
+    except ValueError:
+        return False, {}
+    if not isinstance(error, dict) or error.get('type') != 'mutationError':
+        return False, {}
+    failed = {}
+    for item in error.get('items') or []:
+        index = item.get('index')
+        if isinstance(index, int):
+            failed[index] = (item.get('error') or {}).get('description') or error.get('description', '')
+    return True, failed
+
+
+class MutationBatcher:
+    """Queue of Sanity mutations, sent a transaction at a time.
+
+    add() flushes by itself once a batch is full; call flush() (or use the
+    batcher as a context manager) to send the rest. on_results(outcomes) is
+    called after every request with the outcomes it settled.
+    """
+
+    def __init__(self, batch_size: int = SANITY_BATCH_SIZE, visibility: str = SANITY_MUTATION_VISIBILITY,
+                 max_retries: int = SANITY_MUTATION_RETRIES,
+                 on_results: Optional[Callable[[List[MutationOutcome]], None]] = None):
+        self.batch_size = max(1, batch_size)
+        self.visibility = visibility
+        self.max_retries = max(0, max_retries)
+        self.on_results = on_results
+        self.outcomes: Dict[Any, MutationOutcome] = {}
+        self.requests = 0
+        self._pending: List[tuple] = []   # (ref, mutation, encoded size)
+        self._pending_bytes = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.flush()
+
+    def add(self, mutation: Dict, ref: Any = None) -> None:
+        """Queue a mutation; ref (default: the document id) keys its outcome."""
+        size = len(json.dumps(mutation))
+        if self._pending and (len(self._pending) >= self.batch_size
+                              or self._pending_bytes + size > _MAX_TRANSACTION_BYTES):
+            self.flush()
+        self._pending.append((ref if ref is not None else _mutation_id(mutation), mutation, size))
+        self._pending_bytes += size
+
+    def create(self, document: Dict, ref: Any = None) -> None:
+        self.add(create_mutation(document), ref)
+
+    def patch(self, doc_id: str, fields: Dict, ref: Any = None) -> None:
+        self.add(patch_mutation(doc_id, fields), ref)
+
+    def flush(self) -> List[MutationOutcome]:
+        """Send everything queued. Returns the outcomes of this flush."""
+        batch, self._pending, self._pending_bytes = self._pending, [], 0
+        if not batch:
+            return []
+        return self._send([(ref, mutation) for ref, mutation, _ in batch])
+
+    def _settle(self, outcomes: List[MutationOutcome]) -> List[MutationOutcome]:
+        for outcome in outcomes:
+            self.outcomes[outcome.ref] = outcome
+        if self.on_results and outcomes:
+            self.on_results(outcomes)
+        return outcomes
+
+    def _post(self, mutations: List[Dict]):
+        self.requests += 1
+        with api_slot('sanity'):
+            return transport.post(
+                SANITY_BASE_URL,
+                params={'returnIds': 'true', 'visibility': self.visibility},
+                headers=SANITY_HEADERS,
+                json={'mutations': mutations},
+                timeout=30 + len(mutations),
+            )
+
+    def _send(self, batch: List[tuple]) -> List[MutationOutcome]:
+        retries = 0
+        while True:
+            try:
+                response = self._post([mutation for _, mutation in batch])
+                status, error = response.status_code, None
+            except requests.RequestException as e:
+                response, status, error = None, None, str(e)
+
+            if status == 200:
+                results = response.json().get('results', [])
+                outcomes = []
+                for i, (ref, mutation) in enumerate(batch):
+                    result = results[i] if i < len(results) else {}
+                    outcomes.append(MutationOutcome(ref, True, result.get('id') or _mutation_id(mutation),
+                                                    result.get('operation')))
+                return self._settle(outcomes)
+
+            if status is None or status in _RETRYABLE_CODES:
+                if retries < self.max_retries:
+                    delay = _RETRY_BACKOFF * 2 ** retries
+                    retries += 1
+                    print(f"  Sanity transaction of {len(batch)} failed ({error or status}), "
+                          f"retrying in {delay:.0f}s ({retries}/{self.max_retries})...")
+                    time.sleep(delay)
+                    continue
+                reason = error or f"{status} - {response.text[:200]}"
+                return self._settle([MutationOutcome(ref, False, _mutation_id(m), error=reason) for ref, m in batch])
+            break
+
+        # The transaction was rejected: fail what Sanity names, resend the rest
+        mutation_error, failed = _rejection(response)
+        if failed and len(failed) < len(batch):
+            outcomes = self._settle([MutationOutcome(ref, False, _mutation_id(m), error=failed[i])
+                                     for i, (ref, m) in enumerate(batch) if i in failed])
+            return outcomes + self._send([entry for i, entry in enumerate(batch) if i not in failed])
+        if mutation_error and not failed and len(batch) > 1:
+            middle = len(batch) // 2
+            return self._send(batch[:middle]) + self._send(batch[middle:])
+        reason = f"{status} - {response.text[:200]}"
+        return self._settle([MutationOutcome(ref, False, _mutation_id(m), error=failed.get(i, reason))
+                             for i, (ref, m) in enumerate(batch)])
+
+    def summary(self) -> str:
+        ok = sum(1 for outcome in self.outcomes.values() if outcome.ok)
+        return (f"Sanity: {ok} of {len(self.outcomes)} mutation(s) committed "
+                f"in {self.requests} request(s)")
@@ -0,0 +1,80 @@
+"""
+HTML parsing backends and precompiled selectors for the scrapers.
+
+Backends (SCRAPER_PARSER):
+    html.parser - BeautifulSoup's pure-Python parser over the whole page (default)
+    lxml        - lxml's C tree builder over the whole page
+    strainer    - lxml tree builder, but only the subtrees a scraper declares
+                  with a SoupStrainer are built (full page for scrapers without one)
+
+lxml and strainer are opt-in: the two tree builders repair malformed markup
+differently (unclosed or misnested tags can end up in different places), so
+check a source with benchmark_parsers.py, which compares every backend's
+items with html.parser's, before switching. lxml is optional; without it
+every backend uses html.parser.
+"""
+
+import soupsieve
+from bs4 import BeautifulSoup, SoupStrainer
+
+from .config import SCRAPER_PARSER
+
+try:
+    import lxml  # noqa: F401
+    HAVE_LXML = True
+except ImportError:
+    HAVE_LXML = False
+
+PARSER_BACKENDS = ('html.parser', 'lxml', 'strainer')
+
+_backend = SCRAPER_PARSER if SCRAPER_PARSER in PARSER_BACKENDS else 'html.parser'
+
+
+def get_parser_backend():
+    """Name of the backend scrapers currently parse with."""
+    return _backend
+
+
+def set_parser_backend(name):
+    """Switch the parsing backend (used by the benchmark)."""
+    global _backend
+    if name not in PARSER_BACKENDS:
+        raise ValueError(f"Unknown parser backend '{name}' (expected one of: {', '.join(PARSER_BACKENDS)})")
+    _backend = name
+
+
+def _tree_builder(backend):
+    if backend == 'html.parser' or not HAVE_LXML:
+        return 'html.parser'
+    return 'lxml'
+
+
+class PageSelectors:
+    """A scraper's CSS selectors, compiled once at import, plus an optional
+    SoupStrainer describing the only subtrees the scraper reads.
+
+    A strainer is only safe when nothing the scraper does needs context
+    outside the strained elements (no ancestor selectors or find_parent
+    calls that climb above them)."""
+
+    def __init__(self, strainer=None, **selectors):
+        self.strainer = SoupStrainer(**strainer) if strainer else None
+        self._compiled = {key: soupsieve.compile(css) for key, css in selectors.items()}
+
+    def parse(self, markup, backend=None):
+        """Build the soup for a page with the active (or given) backend."""
+        backend = backend or _backend
+        parse_only = self.strainer if backend == 'strainer' else None
+        return BeautifulSoup(markup, _tree_builder(backend), parse_only=parse_only)
+
+    def select(self, key, tag, limit=0):
+        """All matches of the named selector under tag (limit=0 means no limit)."""
+        return self._compiled[key].select(tag, limit=limit)
+
+    def select_one(self, key, tag):
+        """First match of the named selector under tag, or None."""
+        return self._compiled[key].select_one(tag)
+
+    def closest(self, key, tag):
+        """Nearest ancestor of tag (or tag itself) matching the named selector, or None."""
+        return self._compiled[key].closest(tag)
@@ -0,0 +1,169 @@
+"""
+Staged pipeline executor for article generation and publishing.
+
+Each job (one article) runs its stages in order - text generation, featured
+image (generation, text check, upload), document creation - on a worker
+thread, so different articles overlap: one article's image can render while
+another's text is still being written. Calls to each external API are bounded
+by a process-wide semaphore (API_CONCURRENCY) whichever job makes them.
+
+StageGraph covers work that isn't a straight line of stages: each named
+stage starts as soon as the stages it depends on have finished, and
+independent stages run concurrently (used by the Flow video pipeline).
+"""
+
+import time
+import threading
+from contextlib import contextmanager
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, List, Sequence, Tuple
+
+from .config import API_CONCURRENCY, PIPELINE_MAX_WORKERS
+
+_api_semaphores = {}
+_api_semaphores_lock = threading.Lock()
+
+
+def _api_semaphore(api: str) -> threading.BoundedSemaphore:
+    with _api_semaphores_lock:
+        if api not in _api_semaphores:
+            _api_semaphores[api] = threading.BoundedSemaphore(max(1, API_CONCURRENCY.get(api, 1)))
+        return _api_semaphores[api]
+
+
+@contextmanager
+def api_slot(api: str):
+    """Hold one of the concurrency slots for an external API ('gemini', 'imagen', 'sanity')."""
+    semaphore = _api_semaphore(api)
+    semaphore.acquire()
+    try:
+        yield
+    finally:
+        semaphore.release()
+
+
+# A stage takes the job context dict and returns False to stop the job as failed
+Stage = Tuple[str, Callable[[Dict], bool]]
+
+
+class StagedPipeline:
+    """Run jobs through a fixed list of stages, several jobs at a time.
+
+    Results come back in job order. Each job context gains:
+        ok            True if every stage passed
+        failed_stage  name of the stage that stopped it (or None)
+        error         exception message if a stage raised
+        timings       {stage: seconds}
+    """
+
+    def __init__(self, stages: Sequence[Stage], max_workers: int = PIPELINE_MAX_WORKERS):
+        self.stages = list(stages)
+        self.max_workers = max(1, max_workers)
+
+    def _run_job(self, job: Dict) -> Dict:
+        job.update(ok=False, failed_stage=None, error=None, timings={})
+        for name, stage in self.stages:
+            start = time.monotonic()
+            try:
+                passed = stage(job)
+            except Exception as e:
+                passed = False
+                job['error'] = str(e)
+                print(f"  Pipeline stage '{name}' raised for {job.get('label', 'job')}: {e}")
+            job['timings'][name] = round(time.monotonic() - start, 2)
+            if passed is False:
+                job['failed_stage'] = name
+                return job
+        job['ok'] = True
+        return job
+
+    def run(self, jobs: List[Dict]) -> List[Dict]:
+        if not jobs:
+            return []
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(jobs))) as executor:
+            futures = [executor.submit(self._run_job, job) for job in jobs]
+            return [future.result() for future in futures]
+
+
+class StageGraph:
+    """Dependency graph of stages run on a thread pool.
+
+    add(name, fn, requires, after) schedules fn() as soon as every stage in
+    `requires` has succeeded and every stage in `after` has finished either
+    way. A stage fails if it raises or returns None; stages that require it
+    are skipped (their result is None too). Stages can be added while others
+    run. Each stage runs once - result(name) waits for it and returns its value.
+    """
+
+    def __init__(self, max_workers: int = 4, label: str = 'graph'):
+        self.label = label
+        self._executor = ThreadPoolExecutor(max_workers=max(1, max_workers))
+        self._futures: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        # Stages still waiting on dependencies need the pool to start, so let
+        # every registered stage (including ones added meanwhile) finish first
+        while True:
+            with self._lock:
+                futures = list(self._futures.values())
+            wait(futures)
+            with self._lock:
+                if len(self._futures) == len(futures):
+                    break
+        self._executor.shutdown(wait=True)
+
+    def add(self, name: str, fn: Callable[[], Any], requires: Sequence[str] = (),
+            after: Sequence[str] = ()) -> Future:
+        with self._lock:
+            if name in self._futures:
+                return self._futures[name]
+            unknown = [dep for dep in list(requires) + list(after) if dep not in self._futures]
+            if unknown:
+                raise KeyError(f"stage '{name}' depends on unknown stage(s): {', '.join(unknown)}")
+            future = self._futures[name] = Future()
+            deps = [self._futures[dep] for dep in list(requires) + list(after)]
+            required = [self._futures[dep] for dep in requires]
+        remaining = [len(deps)]
+        remaining_lock = threading.Lock()
+
+        def run():
+            try:
+                future.set_result(fn())
+            except Exception as e:
+                print(f"  Stage '{name}' raised for {self.label}: {e}")
+                future.set_result(None)
+
+        def start():
+            if any(dep.result() is None for dep in required):
+                future.set_result(None)  # skipped
+            else:
+                try:
+                    self._executor.submit(run)
+                except RuntimeError as e:  # pool already shut down
+                    print(f"  Stage '{name}' not started for {self.label}: {e}")
+                    future.set_result(None)
+
+        def dep_done(_):
+            with remaining_lock:
+                remaining[0] -= 1
+                ready = remaining[0] == 0
+            if ready:
+                start()
+
+        if not deps:
+            start()
+        for dep in deps:
+            dep.add_done_callback(dep_done)
+        return future
+
+    def result(self, name: str) -> Any:
+        """Wait for a stage and return its value (None if it failed or was skipped)."""
+        return self._futures[name].result()
+
+    def has(self, name: str) -> bool:
+        with self._lock:
+            return name in self._futures
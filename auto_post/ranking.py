@@ -0,0 +1,166 @@
+"""
+Local, deterministic pre-ranking of scraped news items.
+
+Scores every item without an LLM so only a short list of candidates is sent
+to Gemini for the final pick, and so selection still works offline when
+Gemini is unavailable. The score combines:
+    relevance  practice-area keyword hits (from keywords.py)
+    priority   per-category weight (SELECTION_CATEGORY_PRIORITY)
+    recency    dates in the URL and "breaking news" wording in the title
+    novelty    1 - best token overlap (Jaccard) with an already covered topic
+"""
+
+import re
+from datetime import datetime, timezone, date
+from typing import Dict, List, Optional, Tuple
+
+from .config import SELECTION_CATEGORY_PRIORITY, SELECTION_MAX_PER_SOURCE
+
+WEIGHTS = {
+    'relevance': 2.0,
+    'priority': 1.0,
+    'recency': 1.0,
+    'novelty': 3.0,
+}
+
+# Below this novelty an item is treated as already covered by offline selection
+MIN_OFFLINE_NOVELTY = 0.5
+
+_STOPWORDS = frozenset("""
+a an and are as at be by for from has have in into is it its of on or over the
+this that to under was were will with after amid new says said about more
+""".split())
+
+_TOKEN_RE = re.compile(r"[a-z0-9$]+(?:'[a-z]+)?")
+_URL_DATE_RE = re.compile(r'/(20\d{2})[/-](\d{1,2})[/-](\d{1,2})(?=[/-]|$)')
+_FRESH_HINT_RE = re.compile(r'\b(breaking|today|tonight|this morning|live updates|just in|announces?|files?|sues?|charged|recall(?:s|ed)?)\b')
+
+
+def tokenize(text: str) -> frozenset:
+    """Significant lowercase tokens of a text (stopwords and 1-2 letter words dropped)."""
+    return frozenset(t for t in _TOKEN_RE.findall(text.lower())
+                     if len(t) > 2 and t not in _STOPWORDS)
+
+
+def jaccard(a: frozenset, b: frozenset) -> float:
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+def _item_tokens(item: Dict) -> frozenset:
+    return tokenize(f"{item.get('title', '')} {item.get('summary', '')}")
+
+
+def relevance_score(item: Dict) -> float:
+    """0..1 from keyword hits and number of practice areas touched."""
+    hits = item.get('keyword_hits', 0)
+    areas = len(item.get('matched_areas', []))
+    return min(hits, 4) / 4 * 0.75 + min(areas, 2) / 2 * 0.25
+
+
+def priority_score(item: Dict) -> float:
+    return SELECTION_CATEGORY_PRIORITY.get(item.get('category', ''), 0.5)
+
+
+def recency_score(item: Dict, today: Optional[date] = None) -> float:
+    """-0.5..1: dated URLs score by age; otherwise fresh-news wording gives a small bonus."""
+    today = today or datetime.now(timezone.utc).date()
+    match = _URL_DATE_RE.search(item.get('url', ''))
+    if match:
+        try:
+            age = (today - date(*map(int, match.groups()))).days
+        except ValueError:
+            age = None
+        if age is not None:
+            if age <= 0:
+                return 1.0
+            if age == 1:
+                return 0.6
+            if age <= 7:
+                return 0.1
+            return -0.5
+    return 0.3 if _FRESH_HINT_RE.search(item.get('title', '').lower()) else 0.0
+
+
+def novelty_score(tokens: frozenset, used_token_sets: List[frozenset]) -> float:
+    """1 for a brand-new story, towards 0 as it overlaps a covered topic."""
+    if not used_token_sets:
+        return 1.0
+    return 1.0 - max((jaccard(tokens, used) for used in used_token_sets), default=0.0)
+
+
+def rank_articles(news_items: List[Dict], used_topics: Optional[List[str]] = None,
+                  today: Optional[date] = None) -> List[Tuple[int, float, float]]:
+    """Score every item. Returns (index, score, novelty) tuples, best first;
+    ties keep scrape order so the ranking is deterministic."""
+    used_token_sets = [tokenize(topic) for topic in (used_topics or [])]
+    ranked = []
+    for i, item in enumerate(news_items):
+        novelty = novelty_score(_item_tokens(item), used_token_sets)
+        score = (WEIGHTS['relevance'] * relevance_score(item)
+                 + WEIGHTS['priority'] * priority_score(item)
+                 + WEIGHTS['recency'] * recency_score(item, today)
+                 + WEIGHTS['novelty'] * novelty)
+        ranked.append((i, round(score, 4), novelty))
+    ranked.sort(key=lambda r: (-r[1], r[0]))
+    return ranked
+
+
+def shortlist(news_items: List[Dict], ranked: List[Tuple[int, float, float]], limit: int,
+              max_per_source: int = SELECTION_MAX_PER_SOURCE) -> List[int]:
+    """Top `limit` item indices, at most max_per_source from any one source."""
+    per_source = {}
+    picked = []
+    for index, _, _ in ranked:
+        source = news_items[index].get('source', '')
+        if per_source.get(source, 0) >= max_per_source:
+            continue
+        per_source[source] = per_source.get(source, 0) + 1
+        picked.append(index)
+        if len(picked) >= limit:
+            break
+    return picked
+
+
+def relevant_used_topics(news_items: List[Dict], used_topics: List[str], limit: int) -> List[str]:
+    """The covered topics most similar to the candidates (best match first), so
+    the prompt carries the topics that could actually collide."""
+    candidate_tokens = [_item_tokens(item) for item in news_items]
+    scored = []
+    for position, topic in enumerate(used_topics):
+        tokens = tokenize(topic)
+        best = max((jaccard(tokens, c) for c in candidate_tokens), default=0.0)
+        if best > 0:
+            scored.append((best, position, topic))
+    # Most similar first; among equals prefer the most recently covered
+    scored.sort(key=lambda s: (-s[0], -s[1]))
+    return [topic for _, _, topic in scored[:limit]]
+
+
+def offline_select(news_items: List[Dict], num_articles: int, used_topics: Optional[List[str]] = None,
+                   ranked: Optional[List[Tuple[int, float, float]]] = None) -> List[Dict]:
+    """Pick articles from the local ranking alone, preferring different categories
+    and skipping items that look already covered."""
+    ranked = ranked if ranked is not None else rank_articles(news_items, used_topics)
+    eligible = [index for index, _, novelty in ranked if novelty >= MIN_OFFLINE_NOVELTY]
+
+    chosen = []
+    categories = set()
+    # First pass one per category, second pass fills any remaining slots
+    for distinct in (True, False):
+        for index in eligible:
+            if len(chosen) >= num_articles:
+                break
+            category = news_items[index].get('category', '')
+            if index in chosen or (distinct and category in categories):
+                continue
+            chosen.append(index)
+            categories.add(category)
+
+    selected = []
+    for index in chosen:
+        item = news_items[index]
+        item.setdefault('topic_summary', item.get('title', '')[:100])
+        selected.append(item)
+    return selected
@@ -0,0 +1,88 @@
+"""
+Persistent cache of spokesperson reference uploads to useapi.net.
+
+Maps (Google account, SHA-256 of the image file) to the mediaGenerationId
+Flow returned for it, so an unchanged image in assets/ is uploaded once and
+reused by every variant and every later run until the entry expires
+(FLOW_REFERENCE_CACHE_TTL hours). Entries are dropped when Flow stops
+accepting them (see video._flow_reference_images).
+"""
+
+import os
+import json
+import time
+import hashlib
+import threading
+from typing import Dict, Optional
+
+from .config import FLOW_REFERENCE_CACHE_FILE, FLOW_REFERENCE_CACHE_TTL
+from .utils import write_json_atomic
+
+
+def file_sha256(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+class ReferenceUploadCache:
+    """JSON file of {"<account>:<sha256>": {media_id, filename, uploaded_at}}."""
+
+    def __init__(self, path: str = FLOW_REFERENCE_CACHE_FILE, ttl_hours: float = FLOW_REFERENCE_CACHE_TTL):
+        self.path = path
+        self.ttl = ttl_hours * 3600
+        self._lock = threading.Lock()
+        self._entries = self._load()
+
+    def _load(self) -> Dict:
+        if not os.path.exists(self.path):
+            return {}
+        try:
+            with open(self.path, 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"    Warning: reference upload cache unreadable, ignoring it ({e})")
+            return {}
+
+    @staticmethod
+    def _key(account: str, sha: str) -> str:
+        return f"{account or 'default'}:{sha}"
+
+    def get(self, account: str, sha: str) -> Optional[str]:
+        """Cached media ID for this image and account, or None if missing or expired."""
+        with self._lock:
+            entry = self._entries.get(self._key(account, sha))
+        if not entry or time.time() - entry.get('uploaded_at', 0) > self.ttl:
+            return None
+        return entry.get('media_id')
+
+    def put(self, account: str, sha: str, media_id: str, filename: str = '') -> None:
+        with self._lock:
+            self._entries[self._key(account, sha)] = {
+                'media_id': media_id,
+                'filename': filename,
+                'uploaded_at': time.time(),
+            }
+
+    def invalidate(self, account: str, media_ids) -> int:
+        """Drop this account's entries for the given media IDs. Returns how many were dropped."""
+        media_ids = set(media_ids)
+        prefix = self._key(account, '')
+        with self._lock:
+            stale = [key for key, entry in self._entries.items()
+                     if key.startswith(prefix) and entry.get('media_id') in media_ids]
+            for key in stale:
+                del self._entries[key]
+        return len(stale)
+
+    def save(self) -> bool:
+        """Write the cache atomically (temp file + rename), leaving out expired entries."""
+        now = time.time()
+        with self._lock:
+            self._entries = {key: entry for key, entry in self._entries.items()
+                             if now - entry.get('uploaded_at', 0) <= self.ttl}
+            data = dict(self._entries)
+        try:
+            write_json_atomic(self.path, data, indent=2)
+            return True
+        except OSError as e:
+            print(f"    Warning: could not save reference upload cache: {e}")
+            return False
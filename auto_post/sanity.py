@@ -9,11 +9,14 @@ import requests
 
 from .config import (
     SANITY_PROJECT_ID, SANITY_TOKEN, SANITY_DATASET,
-    SANITY_BASE_URL, SANITY_QUERY_URL, SANITY_ASSETS_URL,
-    SANITY_HEADERS, DEFAULT_AUTHOR
+    SANITY_QUERY_URL, SANITY_ASSETS_URL,
+    DEFAULT_AUTHOR
 )
 from .utils import convert_markdown_to_portable_text
 from .content import generate_image_with_gemini
+from .pipeline import api_slot
+from .mutations import MutationBatcher
+from . import transport
 
 
 def upload_image_to_sanity(image_bytes, filename="blog-image.png"):
@@ -37,12 +40,13 @@ def upload_image_to_sanity(image_bytes, filename="blog-image.png"):
             'Content-Type': 'image/png'
         }
 
-        response = requests.post(
-            f"{SANITY_ASSETS_URL}?filename={filename}",
-            headers=headers,
-            data=image_bytes,
-            timeout=60
-        )
+        with api_slot('sanity'):
+            response = transport.post(
+                f"{SANITY_ASSETS_URL}?filename={filename}",
+                headers=headers,
+                data=image_bytes,
+                timeout=60
+            )
 
         if response.status_code == 200:
             result = response.json()
@@ -77,7 +81,7 @@ def get_existing_posts():
     encoded_query = requests.utils.quote(query)
 
     try:
-        response = requests.get(
+        response = transport.get(
             f"{SANITY_QUERY_URL}?query={encoded_query}",
             headers={'Authorization': f"Bearer {SANITY_TOKEN}"} if SANITY_TOKEN else {},
             timeout=30
@@ -102,38 +106,44 @@ def get_existing_posts():
         return "No existing posts found."
 
 
-def post_to_sanity(article_data):
-    """Post the generated article to Sanity.io CMS."""
-    print(f"Posting article to Sanity: {article_data.get('title', 'Untitled')}")
+def prepare_featured_image(article_data):
+    """
+    Generate, validate and upload the featured image for an article.
+    Returns the mainImage dict (with alt text) or None; never fails the post.
+    """
+    alt_text = article_data.get('alt_text', '')
+    enable_image_gen = os.environ.get('ENABLE_IMAGE_GENERATION', 'true').lower() == 'true'
+
+    if not alt_text or not enable_image_gen:
+        return None
 
     if not all([SANITY_PROJECT_ID, SANITY_TOKEN, SANITY_DATASET]):
-        print("Error: Missing Sanity configuration (PROJECT_ID, TOKEN, or DATASET)")
-        return False
+        # Nowhere to upload it - don't spend an Imagen call
+        return None
 
-    portable_body = convert_markdown_to_portable_text(article_data.get('body_markdown', ''))
+    print("\n--- Generating Featured Image ---")
+    image_bytes = generate_image_with_gemini(alt_text)
 
-    # Image generation
-    alt_text = article_data.get('alt_text', '')
-    main_image = None
-    enable_image_gen = os.environ.get('ENABLE_IMAGE_GENERATION', 'true').lower() == 'true'
+    if not image_bytes:
+        print("Warning: Image generation failed, continuing without image")
+        return None
 
-    if alt_text and enable_image_gen:
-        print("\n--- Generating Featured Image ---")
-        image_bytes = generate_image_with_gemini(alt_text)
-
-        if image_bytes:
-            slug = article_data.get('slug', 'blog-image')
-            filename = f"{slug}.png"
-            image_asset = upload_image_to_sanity(image_bytes, filename)
-
-            if image_asset:
-                main_image = image_asset
-                main_image['alt'] = alt_text
-                print(f"Featured image ready with alt text")
-            else:
-                print("Warning: Image upload failed, continuing without image")
-        else:
-            print("Warning: Image generation failed, continuing without image")
+    slug = article_data.get('slug', 'blog-image')
+    filename = f"{slug}.png"
+    image_asset = upload_image_to_sanity(image_bytes, filename)
+
+    if not image_asset:
+        print("Warning: Image upload failed, continuing without image")
+        return None
+
+    image_asset['alt'] = alt_text
+    print(f"Featured image ready with alt text")
+    return image_asset
+
+
+def build_post_document(article_data, main_image=None):
+    """Build the blogPost document for an article."""
+    portable_body = convert_markdown_to_portable_text(article_data.get('body_markdown', ''))
 
     # Document structure matching blogPost schema
     document = {
@@ -160,30 +170,35 @@ def post_to_sanity(article_data):
     if main_image:
         document["mainImage"] = main_image
 
-    payload = {
-        "mutations": [
-            {"create": document}
-        ]
-    }
+    return document
 
-    try:
-        response = requests.post(
-            SANITY_BASE_URL,
-            headers=SANITY_HEADERS,
-            json=payload,
-            timeout=30
-        )
 
-        if response.status_code == 200:
-            result = response.json()
-            print("SUCCESS: Article published to Sanity.io!")
-            print(f"Document ID: {result.get('results', [{}])[0].get('id', 'unknown')}")
-            return True
-        else:
-            print(f"FAILURE: Sanity API Error: {response.status_code}")
-            print(response.text)
-            return False
+def create_post(document):
+    """Create a blogPost document in Sanity. Returns True on success."""
+    if not all([SANITY_PROJECT_ID, SANITY_TOKEN, SANITY_DATASET]):
+        print("Error: Missing Sanity configuration (PROJECT_ID, TOKEN, or DATASET)")
+        return False
 
-    except requests.RequestException as e:
-        print(f"Request error: {e}")
+    with MutationBatcher() as batcher:
+        batcher.create(document, ref='post')
+    outcome = batcher.outcomes['post']
+
+    if outcome.ok:
+        print(f"SUCCESS: Article published to Sanity.io! ({document.get('title', '')[:50]})")
+        print(f"Document ID: {outcome.id}")
+        return True
+    else:
+        print(f"FAILURE: Sanity API Error: {outcome.error}")
         return False
+
+
+def post_to_sanity(article_data):
+    """Post the generated article to Sanity.io CMS (image, then document)."""
+    print(f"Posting article to Sanity: {article_data.get('title', 'Untitled')}")
+
+    if not all([SANITY_PROJECT_ID, SANITY_TOKEN, SANITY_DATASET]):
+        print("Error: Missing Sanity configuration (PROJECT_ID, TOKEN, or DATASET)")
+        return False
+
+    main_image = prepare_featured_image(article_data)
+    return create_post(build_post_document(article_data, main_image))
@@ -0,0 +1,93 @@
+"""
+Persistent conditional-GET cache for the scraper layer.
+
+Stores ETag, Last-Modified and a SHA-256 of the body per source URL, together
+with the items parsed from that body. A 304 response or an unchanged body hash
+lets scrape_all_sources reuse the cached items without re-parsing the page.
+"""
+
+import os
+import copy
+import json
+import hashlib
+import threading
+from datetime import datetime, timezone
+
+from .config import SCRAPE_CACHE_FILE
+from .utils import write_json_atomic
+
+
+def body_hash(content):
+    """SHA-256 hex digest of a response body."""
+    return hashlib.sha256(content).hexdigest()
+
+
+class ScrapeCache:
+    """URL -> {etag, last_modified, content_hash, items, fetched_at} store.
+    Thread-safe; written to disk once per run via save()."""
+
+    def __init__(self, path=SCRAPE_CACHE_FILE):
+        self.path = path
+        self._lock = threading.Lock()
+        self._entries = self._load()
+        self._dirty = False
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return {}
+        try:
+            with open(self.path, 'r') as f:
+                return json.load(f).get('entries', {})
+        except (OSError, ValueError) as e:
+            print(f"  Warning: scrape cache unreadable, starting fresh ({e})")
+            return {}
+
+    def conditional_headers(self, url):
+        """Validators to send with the next request for url."""
+        with self._lock:
+            entry = self._entries.get(url)
+        if not entry:
+            return {}
+        headers = {}
+        if entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def cached_items(self, url, content_hash=None):
+        """Return a copy of the items cached for url, or None.
+        If content_hash is given, only return them when the body is unchanged."""
+        with self._lock:
+            entry = self._entries.get(url)
+            if not entry or not entry.get('items'):
+                return None
+            if content_hash is not None and entry.get('content_hash') != content_hash:
+                return None
+            return copy.deepcopy(entry['items'])
+
+    def store(self, url, response, content_hash, items=None):
+        """Record validators for url. Items are replaced only when given;
+        empty results are never cached so a broken parse is retried next run."""
+        with self._lock:
+            entry = self._entries.setdefault(url, {})
+            entry['etag'] = response.headers.get('ETag')
+            entry['last_modified'] = response.headers.get('Last-Modified')
+            entry['content_hash'] = content_hash
+            entry['fetched_at'] = datetime.now(timezone.utc).isoformat()
+            if items:
+                entry['items'] = copy.deepcopy(items)
+            elif items is not None:
+                entry.pop('items', None)
+            self._dirty = True
+
+    def save(self):
+        """Write the cache atomically (temp file + rename) if anything changed."""
+        with self._lock:
+            if not self._dirty:
+                return
+            try:
+                write_json_atomic(self.path, {'entries': self._entries}, indent=2)
+                self._dirty = False
+            except OSError as e:
+                print(f"  Warning: could not save scrape cache: {e}")
@@ -0,0 +1,252 @@
+"""
+Declarative scraper specs and the generic engine that runs them.
+
+Each source is described by a JSON spec in scraper_specs.json instead of a
+hand-written scrape_* function:
+
+    items              CSS selector for candidate nodes (required)
+    candidate_limit    max candidate nodes examined (default 10)
+    link               list of strategies tried in order to find the <a> for a node:
+                         "self"                      the node itself, if it is an <a>
+                         "child"                     first <a> inside the node
+                         "parent"                    nearest enclosing <a>
+                         {"select": css}             first match of css inside the node
+                         {"container": [tags]}       first <a> inside the nearest enclosing tag
+                       (default ["self", "child", "parent"])
+    title              "item" (node text, default), "link" (link text) or {"select": css}
+    title_prefix       prepended to every title
+    summary            {"select": css} inside the node, {"next": tag} after it,
+                       or {"closest": css, "select": css} inside an enclosing element
+    summary_max        summary length cap (default 200)
+    base_url           base for relative links (default: the page URL)
+    min_title_length   shorter titles are skipped (default 1)
+    exclude_href_contains  hrefs containing any of these (case-insensitive) are skipped
+    dedupe             drop repeated URLs (default true)
+    max_items          items returned (default 5)
+    keyword_filter     general-news source; results are filtered by practice-area keywords
+    strainer           SoupStrainer kwargs for the 'strainer' parser backend
+    source, category   labels copied onto every item (required); label is used in log lines
+"""
+
+import os
+import json
+from urllib.parse import urljoin
+from typing import Dict, List
+
+from .parsing import PageSelectors
+from .utils import write_json_atomic
+
+SPECS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'scraper_specs.json')
+
+LINK_STRATEGIES = ('self', 'child', 'parent')
+TITLE_SOURCES = ('item', 'link')
+
+DEFAULTS = {
+    'candidate_limit': 10,
+    'link': list(LINK_STRATEGIES),
+    'title': 'item',
+    'title_prefix': '',
+    'summary': None,
+    'summary_max': 200,
+    'base_url': None,
+    'min_title_length': 1,
+    'exclude_href_contains': [],
+    'dedupe': True,
+    'max_items': 5,
+    'keyword_filter': False,
+    'strainer': None,
+}
+
+
+def validate_spec(spec: Dict) -> List[str]:
+    """Return a list of problems with a spec (empty if it is usable)."""
+    errors = []
+    for field in ('source', 'category', 'items'):
+        if not isinstance(spec.get(field), str) or not spec.get(field):
+            errors.append(f"'{field}' must be a non-empty string")
+    unknown = set(spec) - set(DEFAULTS) - {'source', 'category', 'items', 'label'}
+    if unknown:
+        errors.append(f"unknown fields: {', '.join(sorted(unknown))}")
+
+    for field in ('candidate_limit', 'summary_max', 'min_title_length', 'max_items'):
+        value = spec.get(field, DEFAULTS[field])
+        if not isinstance(value, int) or isinstance(value, bool) or value < 0:
+            errors.append(f"'{field}' must be a non-negative integer")
+
+    link = spec.get('link', DEFAULTS['link'])
+    if not isinstance(link, list) or not link:
+        errors.append("'link' must be a non-empty list of strategies")
+    else:
+        for strategy in link:
+            if strategy in LINK_STRATEGIES:
+                continue
+            if isinstance(strategy, dict) and (isinstance(strategy.get('select'), str)
+                                               or isinstance(strategy.get('container'), list)):
+                continue
+            errors.append(f"unknown link strategy: {strategy!r}")
+
+    title = spec.get('title', DEFAULTS['title'])
+    if title not in TITLE_SOURCES and not (isinstance(title, dict) and isinstance(title.get('select'), str)):
+        errors.append(f"unknown title source: {title!r}")
+
+    summary = spec.get('summary')
+    if summary is not None:
+        if not isinstance(summary, dict) or not (
+                isinstance(summary.get('next'), str) or isinstance(summary.get('select'), str)):
+            errors.append(f"unknown summary rule: {summary!r}")
+        elif 'closest' in summary and not isinstance(summary.get('select'), str):
+            errors.append("summary 'closest' needs a 'select' inside it")
+
+    if not errors:
+        # Compiling catches CSS syntax errors before the spec is ever run
+        try:
+            CompiledSpec('validate', spec)
+        except Exception as e:
+            errors.append(f"invalid selector: {e}")
+    return errors
+
+
+class CompiledSpec:
+    """A spec with defaults applied and every selector compiled once."""
+
+    def __init__(self, name: str, spec: Dict):
+        self.name = name
+        self.spec = spec
+        options = {**DEFAULTS, **spec}
+        self.source = options['source']
+        self.category = options['category']
+        self.label = options.get('label') or self.source
+        self.candidate_limit = options['candidate_limit']
+        self.title_prefix = options['title_prefix']
+        self.summary_max = options['summary_max']
+        self.base_url = options['base_url']
+        self.min_title_length = max(1, options['min_title_length'])
+        self.exclude = [s.lower() for s in options['exclude_href_contains']]
+        self.dedupe = options['dedupe']
+        self.max_items = options['max_items']
+        self.keyword_filter = options['keyword_filter']
+
+        selectors = {'items': options['items']}
+        self.link = []
+        for i, strategy in enumerate(options['link']):
+            if isinstance(strategy, dict) and 'select' in strategy:
+                selectors[f'link{i}'] = strategy['select']
+                strategy = {'select': f'link{i}'}
+            self.link.append(strategy)
+
+        self.title = options['title']
+        if isinstance(self.title, dict):
+            selectors['title'] = self.title['select']
+
+        self.summary = options['summary']
+        if self.summary:
+            if 'select' in self.summary:
+                selectors['summary'] = self.summary['select']
+            if 'closest' in self.summary:
+                selectors['summary_container'] = self.summary['closest']
+
+        self.selectors = PageSelectors(strainer=options['strainer'], **selectors)
+
+    def parse(self, markup):
+        return self.selectors.parse(markup)
+
+    def _find_link(self, node):
+        for strategy in self.link:
+            if strategy == 'self':
+                link = node if node.name == 'a' else None
+            elif strategy == 'child':
+                link = node.find('a')
+            elif strategy == 'parent':
+                link = node.find_parent('a')
+            elif 'select' in strategy:
+                link = self.selectors.select_one(strategy['select'], node)
+            else:
+                container = node.find_parent(strategy['container'])
+                link = container.find('a') if container else None
+            if link is not None:
+                return link
+        return None
+
+    def _title(self, node, link):
+        if self.title == 'item':
+            return node.get_text(strip=True)
+        if self.title == 'link':
+            return link.get_text(strip=True)
+        title_tag = self.selectors.select_one('title', node)
+        return title_tag.get_text(strip=True) if title_tag else ''
+
+    def _summary(self, node):
+        if not self.summary:
+            return ''
+        if 'next' in self.summary:
+            summary_tag = node.find_next(self.summary['next'])
+        else:
+            scope = node
+            if 'closest' in self.summary:
+                scope = self.selectors.closest('summary_container', node)
+            summary_tag = self.selectors.select_one('summary', scope) if scope else None
+        return summary_tag.get_text(strip=True)[:self.summary_max] if summary_tag else ''
+
+    def extract(self, soup, page_url: str) -> List[Dict]:
+        """Pull items out of a parsed page in one pass: filter, dedupe and stop at max_items."""
+        base_url = self.base_url or page_url
+        seen_urls = set()
+        items = []
+
+        for node in self.selectors.select('items', soup, limit=self.candidate_limit):
+            link = self._find_link(node)
+            href = link.get('href', '') if link is not None else ''
+            if not href:
+                continue
+            if self.exclude and any(s in href.lower() for s in self.exclude):
+                continue
+
+            title = self._title(node, link)
+            if len(title) < self.min_title_length:
+                continue
+
+            url = href if href.startswith('http') else urljoin(base_url, href)
+            if self.dedupe:
+                if url in seen_urls:
+                    continue
+                seen_urls.add(url)
+
+            items.append({
+                'title': f"{self.title_prefix}{title}",
+                'url': url,
+                'summary': self._summary(node),
+                'source': self.source,
+                'category': self.category
+            })
+            if len(items) >= self.max_items:
+                break
+
+        return items
+
+
+def load_specs(path: str = SPECS_FILE) -> Dict[str, CompiledSpec]:
+    """Load and compile every spec in the file. Invalid specs are reported and skipped."""
+    with open(path, 'r') as f:
+        raw = json.load(f)
+
+    specs = {}
+    for name, spec in raw.items():
+        errors = validate_spec(spec)
+        if errors:
+            print(f"  Warning: skipping scraper spec '{name}': {'; '.join(errors)}")
+            continue
+        specs[name] = CompiledSpec(name, spec)
+    return specs
+
+
+def save_spec(name: str, spec: Dict, path: str = SPECS_FILE) -> None:
+    """Add or replace one spec in the file (atomic temp file + rename)."""
+    errors = validate_spec(spec)
+    if errors:
+        raise ValueError(f"Invalid scraper spec '{name}': {'; '.join(errors)}")
+
+    with open(path, 'r') as f:
+        raw = json.load(f)
+    raw[name] = spec
+
+    write_json_atomic(path, raw, trailing_newline=True, indent=2)
@@ -1,659 +1,255 @@
 """
-News scraper functions for multiple sources.
+News scraping for multiple sources.
+
+Each source is a declarative spec (scraper_specs.json) run by the generic
+engine in scraper_specs.py; this module fetches pages and orchestrates the
+concurrent scrape.
 """
 
 import time
-from urllib.parse import urljoin
-import requests
-from bs4 import BeautifulSoup
-
-from .config import NEWS_SOURCES, REQUEST_HEADERS, PRACTICE_AREA_KEYWORDS
-from .curation import record_success, record_failure
-
-
-def matches_practice_area(title, summary=''):
-    """
-    Check if an article title/summary matches any practice area keywords.
-    Returns True if at least one keyword is found, False otherwise.
-    """
-    text = f"{title} {summary}".lower()
-    for keyword in PRACTICE_AREA_KEYWORDS:
-        if keyword.lower() in text:
-            return True
-    return False
-
-
-def scrape_aboutlawsuits(url):
-    """Scrape AboutLawsuits.com for mass tort and class action news."""
-    print(f"  Scraping AboutLawsuits...")
-    news_items = []
-
-    try:
-        response = requests.get(url, headers=REQUEST_HEADERS, timeout=30)
-        response.raise_for_status()
-        soup = BeautifulSoup(response.text, 'html.parser')
-
-        headlines = soup.find_all('h4', limit=10)
-
-        for headline in headlines:
-            link = headline.find('a') or headline.find_parent('a')
-            if link and link.get('href'):
-                title = headline.get_text(strip=True)
-                href = link.get('href')
-                if title and '/about/' not in href.lower():
-                    news_items.append({
-                        'title': title,
-                        'url': href if href.startswith('http') else urljoin(url, href),
-                        'summary': '',
-                        'source': 'AboutLawsuits',
-                        'category': 'mass_torts'
-                    })
-
-        # Deduplicate by URL
-        seen_urls = set()
-        unique_items = []
-        for item in news_items:
-            if item['url'] not in seen_urls:
-                seen_urls.add(item['url'])
-                unique_items.append(item)
-
-        return unique_items[:5]
-
-    except Exception as e:
-        print(f"  Error scraping AboutLawsuits: {e}")
-        return []
-
-
-def scrape_fda(url):
-    """Scrape FDA recalls and safety alerts."""
-    print(f"  Scraping FDA Recalls...")
-    news_items = []
-
-    try:
-        response = requests.get(url, headers=REQUEST_HEADERS, timeout=30)
-        response.raise_for_status()
-        soup = BeautifulSoup(response.text, 'html.parser')
-
-        rows = soup.select('table tbody tr, .views-row')
-
-        for row in rows[:10]:
-            brand_cell = row.select_one('.views-field-brand-name a, td a')
-            if brand_cell:
-                title = brand_cell.get_text(strip=True)
-                href = brand_cell.get('href', '')
-
-                desc_cell = row.select_one('.views-field-field-product-description-1, td:nth-child(2)')
-                summary = desc_cell.get_text(strip=True) if desc_cell else ''
-
-                if title:
-                    news_items.append({
-                        'title': f"FDA Recall: {title}",
-                        'url': href if href.startswith('http') else urljoin('https://www.fda.gov', href),
-                        'summary': summary[:200],
-                        'source': 'FDA',
-                        'category': 'mass_torts'
-                    })
-
-        return news_items[:5]
-
-    except Exception as e:
-        print(f"  Error scraping FDA: {e}")
-        return []
-
-
-def scrape_eeoc(url):
-    """Scrape EEOC newsroom for employment discrimination cases."""
-    print(f"  Scraping EEOC News...")
-    news_items = []
-
-    try:
-        response = requests.get(url, headers=REQUEST_HEADERS, timeout=30)
-        response.raise_for_status()
-        soup = BeautifulSoup(response.text, 'html.parser')
-
-        rows = soup.select('.views-row, .news-item, article')
-
-        for row in rows[:10]:
-            title_tag = row.select_one('h3 a, h2 a, .title a')
-            if title_tag:
-                title = title_tag.get_text(strip=True)
-                href = title_tag.get('href', '')
-
-                summary_tag = row.select_one('p, .summary, .description')
-                summary = summary_tag.get_text(strip=True)[:200] if summary_tag else ''
-
-                if title:
-                    news_items.append({
-                        'title': title,
-                        'url': href if href.startswith('http') else urljoin('https://www.eeoc.gov', href),
-                        'summary': summary,
-                        'source': 'EEOC',
-                        'category': 'employment_law'
-                    })
-
-        return news_items[:5]
-
-    except Exception as e:
-        print(f"  Error scraping EEOC: {e}")
-        return []
-
-
-def scrape_osha(url):
-    """Scrape OSHA news releases for workplace safety violations."""
-    print(f"  Scraping OSHA News...")
-    news_items = []
-
-    try:
-        response = requests.get(url, headers=REQUEST_HEADERS, timeout=30)
-        response.raise_for_status()
-        soup = BeautifulSoup(response.text, 'html.parser')
-
-        headlines = soup.select('h5, .views-row h3, .news-release-title')
-
-        for headline in headlines[:10]:
-            link = headline.find('a') or headline.find_parent('a')
-            if not link:
-                parent = headline.find_parent(['div', 'article', 'li'])
-                if parent:
-                    link = parent.find('a')
-
-            if link and link.get('href'):
-                title = headline.get_text(strip=True)
-                href = link.get('href', '')
-
-                summary_tag = headline.find_next('p')
-                summary = summary_tag.get_text(strip=True)[:200] if summary_tag else ''
-
-                if title:
-                    news_items.append({
-                        'title': title,
-                        'url': href if href.startswith('http') else urljoin('https://www.osha.gov', href),
-                        'summary': summary,
-                        'source': 'OSHA',
-                        'category': 'personal_injury'
-                    })
-
-        return news_items[:5]
-
-    except Exception as e:
-        print(f"  Error scraping OSHA: {e}")
-        return []
-
-
-def scrape_courthousenews(url):
-    """Scrape Courthouse News for federal/state court rulings."""
-    print(f"  Scraping Courthouse News...")
-    news_items = []
-
-    try:
-        response = requests.get(url, headers=REQUEST_HEADERS, timeout=30)
-        response.raise_for_status()
-        soup = BeautifulSoup(response.text, 'html.parser')
-
-        articles = soup.select('article, .post, .story')
-
-        for article in articles[:10]:
-            title_tag = article.select_one('h2 a, h3 a, .headline a, .title a')
-            if title_tag:
-                title = title_tag.get_text(strip=True)
-                href = title_tag.get('href', '')
-
-                summary_tag = article.select_one('p, .excerpt, .summary')
-                summary = summary_tag.get_text(strip=True)[:200] if summary_tag else ''
-
-                if title:
-                    news_items.append({
-                        'title': title,
-                        'url': href if href.startswith('http') else urljoin(url, href),
-                        'summary': summary,
-                        'source': 'Courthouse News',
-                        'category': 'general_legal'
-                    })
-
-        return news_items[:5]
-
-    except Exception as e:
-        print(f"  Error scraping Courthouse News: {e}")
-        return []
-
-
-def scrape_consumersafety(url):
-    """Scrape ConsumerSafety.org for product liability news."""
-    print(f"  Scraping ConsumerSafety...")
-    news_items = []
-
-    try:
-        response = requests.get(url, headers=REQUEST_HEADERS, timeout=30)
-        response.raise_for_status()
-        soup = BeautifulSoup(response.text, 'html.parser')
-
-        headlines = soup.select('h2 a, h3 a')
-
-        for headline in headlines[:10]:
-            title = headline.get_text(strip=True)
-            href = headline.get('href', '')
-
-            if title and href:
-                news_items.append({
-                    'title': title,
-                    'url': href if href.startswith('http') else urljoin(url, href),
-                    'summary': '',
-                    'source': 'ConsumerSafety',
-                    'category': 'mass_torts'
-                })
-
-        return news_items[:5]
-
-    except Exception as e:
-        print(f"  Error scraping ConsumerSafety: {e}")
-        return []
-
-
-def scrape_bloomberg(url):
-    """Scrape Bloomberg Law Daily Labor Report."""
-    print(f"  Scraping Bloomberg Law...")
-    news_items = []
-
-    try:
-        response = requests.get(url, headers=REQUEST_HEADERS, timeout=30)
-        response.raise_for_status()
-        soup = BeautifulSoup(response.text, 'html.parser')
-
-        headlines = soup.select('article a, h2 a, h3 a, [class*="headline"] a')
-
-        for headline in headlines[:10]:
-            title = headline.get_text(strip=True)
-            href = headline.get('href', '')
-
-            if title and href and len(title) > 20:
-                news_items.append({
-                    'title': title,
-                    'url': href if href.startswith('http') else urljoin('https://news.bloomberglaw.com', href),
-                    'summary': '',
-                    'source': 'Bloomberg Law',
-                    'category': 'employment_law'
-                })
-
-        return news_items[:5]
-
-    except Exception as e:
-        print(f"  Error scraping Bloomberg: {e}")
-        return []
-
-
-def scrape_apnews(url):
-    """Scrape AP News."""
-    print(f"  Scraping AP News...")
-    news_items = []
-
-    try:
-        response = requests.get(url, headers=REQUEST_HEADERS, timeout=30)
-        response.raise_for_status()
-        soup = BeautifulSoup(response.text, 'html.parser')
+import threading
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor, as_completed, TimeoutError as FuturesTimeoutError
+from urllib.parse import urlparse
 
-        headlines = soup.select('a[class*="Link"], h2 a, h3 a, [data-key="card-headline"] a')
+from .config import (NEWS_SOURCES, REQUEST_HEADERS,
+                     SCRAPE_MAX_WORKERS, SCRAPE_TIME_BUDGET, SCRAPE_HOST_DELAY,
+                     SCRAPE_CACHE_ENABLED)
+from .curation import record_success, record_failure, flush_source_health
+from .scrape_cache import ScrapeCache, body_hash
+from .scraper_specs import CompiledSpec, load_specs
+from .keywords import match_practice_areas
+from . import transport
 
-        for headline in headlines[:15]:
-            title = headline.get_text(strip=True)
-            href = headline.get('href', '')
+# Responses already fetched by scrape_all_sources (conditional GET), keyed by URL
+# per thread, so scrapers parse them instead of downloading the page again.
+_prefetched = threading.local()
 
-            if title and href and len(title) > 20:
-                news_items.append({
-                    'title': title,
-                    'url': href if href.startswith('http') else urljoin('https://apnews.com', href),
-                    'summary': '',
-                    'source': 'AP News',
-                    'category': 'general_legal'
-                })
 
-        return news_items[:5]
+def fetch_page(url):
+    """Return the response for a scraper's page, reusing one prefetched on this thread."""
+    responses = getattr(_prefetched, 'responses', {})
+    if url in responses:
+        return responses.pop(url)
+    response = transport.get(url, headers=REQUEST_HEADERS, timeout=30)
+    response.raise_for_status()
+    return response
 
-    except Exception as e:
-        print(f"  Error scraping AP News: {e}")
-        return []
-
-
-def scrape_cnn(url):
-    """Scrape CNN US section."""
-    print(f"  Scraping CNN US...")
-    news_items = []
-
-    try:
-        response = requests.get(url, headers=REQUEST_HEADERS, timeout=30)
-        response.raise_for_status()
-        soup = BeautifulSoup(response.text, 'html.parser')
-
-        headlines = soup.select('a[data-link-type="article"], span.container__headline-text, h3 a')
-
-        for headline in headlines[:10]:
-            if headline.name == 'span':
-                parent_link = headline.find_parent('a')
-                if parent_link:
-                    title = headline.get_text(strip=True)
-                    href = parent_link.get('href', '')
-                else:
-                    continue
-            else:
-                title = headline.get_text(strip=True)
-                href = headline.get('href', '')
-
-            if title and href and len(title) > 15:
-                news_items.append({
-                    'title': title,
-                    'url': href if href.startswith('http') else urljoin('https://www.cnn.com', href),
-                    'summary': '',
-                    'source': 'CNN',
-                    'category': 'general_legal'
-                })
-
-        return news_items[:5]
-
-    except Exception as e:
-        print(f"  Error scraping CNN: {e}")
-        return []
-
-
-def scrape_nytimes(url):
-    """Scrape NY Times US section."""
-    print(f"  Scraping NY Times US...")
-    news_items = []
-
-    try:
-        response = requests.get(url, headers=REQUEST_HEADERS, timeout=30)
-        response.raise_for_status()
-        soup = BeautifulSoup(response.text, 'html.parser')
-
-        headlines = soup.select('article h2 a, article h3 a, [class*="story"] a')
-
-        for headline in headlines[:10]:
-            title = headline.get_text(strip=True)
-            href = headline.get('href', '')
-
-            if title and href and len(title) > 15:
-                news_items.append({
-                    'title': title,
-                    'url': href if href.startswith('http') else urljoin('https://www.nytimes.com', href),
-                    'summary': '',
-                    'source': 'NY Times',
-                    'category': 'general_legal'
-                })
-
-        return news_items[:5]
-
-    except Exception as e:
-        print(f"  Error scraping NY Times: {e}")
-        return []
-
-
-def scrape_propublica(url):
-    """Scrape ProPublica."""
-    print(f"  Scraping ProPublica...")
-    news_items = []
-
-    try:
-        response = requests.get(url, headers=REQUEST_HEADERS, timeout=30)
-        response.raise_for_status()
-        soup = BeautifulSoup(response.text, 'html.parser')
-
-        headlines = soup.select('article h2 a, article h3 a, [class*="hed"] a, .story-title a')
-
-        for headline in headlines[:10]:
-            title = headline.get_text(strip=True)
-            href = headline.get('href', '')
-
-            if title and href and len(title) > 15:
-                news_items.append({
-                    'title': title,
-                    'url': href if href.startswith('http') else urljoin(url, href),
-                    'summary': '',
-                    'source': 'ProPublica',
-                    'category': 'general_legal'
-                })
-
-        return news_items[:5]
-
-    except Exception as e:
-        print(f"  Error scraping ProPublica: {e}")
-        return []
-
-
-def scrape_onscenetv(url):
-    """Scrape OnScene TV for breaking news and incidents."""
-    print(f"  Scraping OnScene TV...")
-    news_items = []
 
+@contextmanager
+def prefetched(url, response):
+    """Make fetch_page(url) on this thread return response instead of downloading it."""
+    _prefetched.responses = {url: response}
     try:
-        response = requests.get(url, headers=REQUEST_HEADERS, timeout=30)
-        response.raise_for_status()
-        soup = BeautifulSoup(response.text, 'html.parser')
-
-        headlines = soup.select('article h2 a, article h3 a, .post-title a, .entry-title a, h2 a, h3 a')
-
-        for headline in headlines[:10]:
-            title = headline.get_text(strip=True)
-            href = headline.get('href', '')
-
-            if title and href and len(title) > 15:
-                news_items.append({
-                    'title': title,
-                    'url': href if href.startswith('http') else urljoin(url, href),
-                    'summary': '',
-                    'source': 'OnScene TV',
-                    'category': 'personal_injury'
-                })
-
-        return news_items[:5]
-
-    except Exception as e:
-        print(f"  Error scraping OnScene TV: {e}")
-        return []
-
-
-def scrape_nhtsa(url):
-    """Scrape NHTSA for vehicle safety news, recalls, and crash investigations."""
-    print(f"  Scraping NHTSA...")
-    news_items = []
-
-    try:
-        response = requests.get(url, headers=REQUEST_HEADERS, timeout=30)
-        response.raise_for_status()
-        soup = BeautifulSoup(response.text, 'html.parser')
-
-        # NHTSA press releases page structure
-        headlines = soup.select('article h2 a, article h3 a, .views-row h3 a, .press-release a, h2 a, h3 a')
-
-        for headline in headlines[:10]:
-            title = headline.get_text(strip=True)
-            href = headline.get('href', '')
+        yield
+    finally:
+        _prefetched.responses = {}
 
-            if title and href and len(title) > 15:
-                news_items.append({
-                    'title': title,
-                    'url': href if href.startswith('http') else urljoin('https://www.nhtsa.gov', href),
-                    'summary': '',
-                    'source': 'NHTSA',
-                    'category': 'motor_vehicle'
-                })
 
-        return news_items[:5]
-
-    except Exception as e:
-        print(f"  Error scraping NHTSA: {e}")
-        return []
-
-
-def scrape_dol(url):
-    """Scrape Department of Labor newsroom for workers comp and workplace news."""
-    print(f"  Scraping DOL News...")
-    news_items = []
-
-    try:
-        response = requests.get(url, headers=REQUEST_HEADERS, timeout=30)
-        response.raise_for_status()
-        soup = BeautifulSoup(response.text, 'html.parser')
-
-        # DOL newsroom structure
-        headlines = soup.select('article h2 a, article h3 a, .news-item a, .views-row a, h3 a, h2 a')
-
-        for headline in headlines[:15]:
-            title = headline.get_text(strip=True)
-            href = headline.get('href', '')
-
-            if title and href and len(title) > 20:
-                news_items.append({
-                    'title': title,
-                    'url': href if href.startswith('http') else urljoin('https://www.dol.gov', href),
-                    'summary': '',
-                    'source': 'DOL',
-                    'category': 'workers_comp'
-                })
-
-        return news_items[:5]
-
-    except Exception as e:
-        print(f"  Error scraping DOL: {e}")
-        return []
-
-
-def scrape_insurancejournal(url):
-    """Scrape Insurance Journal for national accident and claims news."""
-    print(f"  Scraping Insurance Journal...")
-    news_items = []
-
-    try:
-        response = requests.get(url, headers=REQUEST_HEADERS, timeout=30)
-        response.raise_for_status()
-        soup = BeautifulSoup(response.text, 'html.parser')
-
-        # Insurance Journal article structure
-        headlines = soup.select('article h2 a, article h3 a, .entry-title a, h2 a, h3 a')
-
-        for headline in headlines[:15]:
-            title = headline.get_text(strip=True)
-            href = headline.get('href', '')
-
-            if title and href and len(title) > 15:
-                news_items.append({
-                    'title': title,
-                    'url': href if href.startswith('http') else urljoin(url, href),
-                    'summary': '',
-                    'source': 'Insurance Journal',
-                    'category': 'personal_injury'
-                })
-
-        return news_items[:5]
-
-    except Exception as e:
-        print(f"  Error scraping Insurance Journal: {e}")
-        return []
-
-
-def scrape_npr_law(url):
-    """Scrape NPR Law section for legal news."""
-    print(f"  Scraping NPR Law...")
-    news_items = []
-
-    try:
-        response = requests.get(url, headers=REQUEST_HEADERS, timeout=30)
-        response.raise_for_status()
-        soup = BeautifulSoup(response.text, 'html.parser')
-
-        # NPR uses h2 tags inside .item-info divs for article headlines
-        headlines = soup.select('.item-info h2 a')
-
-        for link in headlines[:10]:
-            title = link.get_text(strip=True)
-            href = link.get('href', '')
-
-            if title and href:
-                # Try to get summary from nearby <p> teaser
-                item_info = link.find_parent(class_='item-info')
-                summary_tag = item_info.find('p', class_='teaser') if item_info else None
-                summary = summary_tag.get_text(strip=True)[:200] if summary_tag else ''
+def matches_practice_area(title, summary=''):
+    """
+    Check if an article title/summary matches any practice area keywords.
+    Returns True if at least one keyword is found, False otherwise.
+    """
+    areas, _ = match_practice_areas(title, summary)
+    return bool(areas)
 
-                news_items.append({
-                    'title': title,
-                    'url': href if href.startswith('http') else urljoin(url, href),
-                    'summary': summary,
-                    'source': 'NPR Law',
-                    'category': 'general_law'
-                })
 
-        return news_items[:5]
+def make_spec_scraper(spec):
+    """Build a scrape(url) function that runs a compiled spec through the generic engine."""
+    def scrape(url):
+        print(f"  Scraping {spec.label}...")
+        try:
+            response = fetch_page(url)
+            soup = spec.parse(response.text)
+            return spec.extract(soup, url)
+        except Exception as e:
+            print(f"  Error scraping {spec.label}: {e}")
+            return []
 
-    except Exception as e:
-        print(f"  Error scraping NPR Law: {e}")
-        return []
+    scrape.__name__ = f"scrape_{spec.name}"
+    scrape.__doc__ = f"Scrape {spec.source} using its declarative spec."
+    return scrape
 
 
-# Map scraper names to functions
-SCRAPERS = {
-    'aboutlawsuits': scrape_aboutlawsuits,
-    'fda': scrape_fda,
-    'eeoc': scrape_eeoc,
-    'osha': scrape_osha,
-    'courthousenews': scrape_courthousenews,
-    'consumersafety': scrape_consumersafety,
-    'bloomberg': scrape_bloomberg,
-    'apnews': scrape_apnews,
-    'cnn': scrape_cnn,
-    'nytimes': scrape_nytimes,
-    'propublica': scrape_propublica,
-    'onscenetv': scrape_onscenetv,
-    'nhtsa': scrape_nhtsa,
-    'dol': scrape_dol,
-    'insurancejournal': scrape_insurancejournal,
-    'npr_law': scrape_npr_law
-}
+# Map scraper names to spec-driven scrape functions
+SCRAPER_SPECS = load_specs()
+SCRAPERS = {name: make_spec_scraper(spec) for name, spec in SCRAPER_SPECS.items()}
 
 # General news sources that need keyword filtering
-GENERAL_NEWS_SCRAPERS = {'apnews', 'cnn', 'nytimes', 'propublica', 'courthousenews'}
-
-
-def scrape_all_sources():
-    """Scrape all enabled news sources and return combined results."""
-    print("Starting multi-source news scraping...")
-    all_news = []
-
-    for source in NEWS_SOURCES:
-        if not source.get('enabled', False):
-            continue
-
-        scraper_func = SCRAPERS.get(source['scraper'])
-        if scraper_func:
+GENERAL_NEWS_SCRAPERS = {name for name, spec in SCRAPER_SPECS.items() if spec.keyword_filter}
+
+
+def register_scraper(name, spec):
+    """Make a spec live in this process (used by curation after saving a new source)."""
+    compiled = CompiledSpec(name, spec)
+    SCRAPER_SPECS[name] = compiled
+    SCRAPERS[name] = make_spec_scraper(compiled)
+    if compiled.keyword_filter:
+        GENERAL_NEWS_SCRAPERS.add(name)
+    else:
+        GENERAL_NEWS_SCRAPERS.discard(name)
+    return SCRAPERS[name]
+
+
+class _HostThrottle:
+    """Per-host politeness: one request in flight per host, spaced by a minimum delay.
+    Replaces the old global sleep between sources so unrelated hosts never wait on each other."""
+
+    def __init__(self, min_interval):
+        self.min_interval = min_interval
+        self._lock = threading.Lock()
+        self._host_locks = {}
+        self._last_request = {}
+
+    @contextmanager
+    def slot(self, url):
+        host = urlparse(url).netloc.lower()
+        with self._lock:
+            host_lock = self._host_locks.setdefault(host, threading.Lock())
+        with host_lock:
+            wait = self._last_request.get(host, 0) + self.min_interval - time.monotonic()
+            if wait > 0:
+                time.sleep(wait)
             try:
-                items = scraper_func(source['url'])
-                if items and len(items) > 0:
-                    # Apply keyword filtering for general news sources
-                    if source['scraper'] in GENERAL_NEWS_SCRAPERS:
-                        filtered_items = []
-                        for item in items:
-                            if matches_practice_area(item.get('title', ''), item.get('summary', '')):
-                                filtered_items.append(item)
-                        if filtered_items:
-                            print(f"  Found {len(items)} items from {source['name']}, {len(filtered_items)} match practice areas")
-                            all_news.extend(filtered_items)
-                        else:
-                            print(f"  Found {len(items)} items from {source['name']}, 0 match practice areas (filtered out)")
-                    else:
-                        # Specialized sources - keep all items
-                        all_news.extend(items)
-                        print(f"  Found {len(items)} items from {source['name']}")
-
-                    # Success - reset failure count
-                    record_success(source['scraper'])
-                else:
-                    # No items returned - potential failure
-                    record_failure(source['scraper'], "No items returned")
-                    print(f"  Warning: {source['name']} returned no items")
-
-                # Be polite - small delay between requests
-                time.sleep(1)
-
-            except Exception as e:
-                # Record failure for health tracking
-                record_failure(source['scraper'], str(e))
-                print(f"  Error with {source['name']}: {e}")
+                yield
+            finally:
+                self._last_request[host] = time.monotonic()
+
+
+def _scrape_source(source, throttle, cache=None):
+    """Run one source's scraper inside its host's politeness slot.
+
+    With a cache, the page is fetched with a conditional GET first; a 304 or
+    an unchanged body hash returns the items from the last parse without
+    running the scraper at all.
+
+    Returns (items, cache_update). The cache isn't written here: the caller
+    applies cache_update (ScrapeCache.store arguments, or None) once it has
+    collected the result, so a source abandoned at the time budget can't
+    change the cache while it is being saved."""
+    scraper_func = SCRAPERS[source['scraper']]
+    url = source['url']
+
+    with throttle.slot(url):
+        if cache is None:
+            return scraper_func(url), None
+
+        headers = {**REQUEST_HEADERS, **cache.conditional_headers(url)}
+        response = transport.get(url, headers=headers, timeout=30)
+        if response.status_code == 304:
+            items = cache.cached_items(url)
+            if items is not None:
+                print(f"  {source['name']}: not modified, reusing {len(items)} cached items")
+                return items, None
+            # Validators without cached items (e.g. last parse was empty) - fetch in full
+            response = transport.get(url, headers=REQUEST_HEADERS, timeout=30)
+        response.raise_for_status()
+
+        content_hash = body_hash(response.content)
+        items = cache.cached_items(url, content_hash)
+        if items is not None:
+            print(f"  {source['name']}: page unchanged, reusing {len(items)} cached items")
+            return items, (url, response, content_hash)
+
+        with prefetched(url, response):
+            items = scraper_func(url)
+        return items, (url, response, content_hash, items)
+
+
+def _collect_source_items(source, items):
+    """Apply keyword filtering and health tracking to one source's scrape results.
+    Returns the items to keep."""
+    if not items:
+        # No items returned - potential failure
+        record_failure(source['scraper'], "No items returned")
+        print(f"  Warning: {source['name']} returned no items")
+        return []
+
+    # Tag every item with the practice areas it touches (used for filtering and ranking)
+    for item in items:
+        areas, hits = match_practice_areas(item.get('title', ''), item.get('summary', ''))
+        item['matched_areas'] = sorted(areas, key=areas.get, reverse=True)
+        item['keyword_hits'] = hits
+
+    kept = items
+    # Apply keyword filtering for general news sources
+    if source['scraper'] in GENERAL_NEWS_SCRAPERS:
+        kept = [item for item in items if item['matched_areas']]
+        if kept:
+            print(f"  Found {len(items)} items from {source['name']}, {len(kept)} match practice areas")
+        else:
+            print(f"  Found {len(items)} items from {source['name']}, 0 match practice areas (filtered out)")
+    else:
+        # Specialized sources - keep all items
+        print(f"  Found {len(items)} items from {source['name']}")
+
+    # Success - reset failure count
+    record_success(source['scraper'])
+    return kept
+
+
+def scrape_all_sources(time_budget=None, max_workers=None):
+    """Scrape all enabled news sources concurrently and return combined results.
+
+    Sources run in a thread pool with per-host politeness limits. The whole
+    phase is bounded by time_budget seconds (default SCRAPE_TIME_BUDGET);
+    sources still in flight when it runs out are recorded as timeouts and
+    whatever was already collected is returned."""
+    time_budget = SCRAPE_TIME_BUDGET if time_budget is None else time_budget
+    max_workers = SCRAPE_MAX_WORKERS if max_workers is None else max_workers
+
+    sources = [s for s in NEWS_SOURCES if s.get('enabled', False) and s['scraper'] in SCRAPERS]
+    print(f"Starting multi-source news scraping ({len(sources)} sources, "
+          f"{max_workers} workers, {time_budget:g}s budget)...")
+
+    results = {}
+    throttle = _HostThrottle(SCRAPE_HOST_DELAY)
+    cache = ScrapeCache() if SCRAPE_CACHE_ENABLED else None
+    executor = ThreadPoolExecutor(max_workers=max(1, max_workers))
+    futures = {executor.submit(_scrape_source, source, throttle, cache): source for source in sources}
+
+    collected = set()
+
+    def collect(future):
+        source = futures[future]
+        collected.add(future)
+        try:
+            items, cache_update = future.result()
+            if cache_update is not None:
+                cache.store(*cache_update)
+            results[source['scraper']] = _collect_source_items(source, items)
+        except Exception as e:
+            # Record failure for health tracking
+            record_failure(source['scraper'], str(e))
+            print(f"  Error with {source['name']}: {e}")
+
+    try:
+        for future in as_completed(futures, timeout=time_budget):
+            collect(future)
+    except FuturesTimeoutError:
+        for future, source in futures.items():
+            if future in collected:
+                continue
+            if future.done():
+                # Finished as the budget ran out, before as_completed yielded it
+                collect(future)
+            else:
+                record_failure(source['scraper'], f"Timed out after {time_budget:g}s scrape budget")
+                print(f"  Timeout: {source['name']} still running when the scrape budget ran out")
+    finally:
+        # Don't wait on stragglers; their requests are bounded by the per-request timeout,
+        # and their results (and cache updates) are discarded
+        executor.shutdown(wait=False, cancel_futures=True)
+        if cache is not None:
+            cache.save()
+        # One write for the whole phase instead of one per source
+        flush_source_health()
+
+    # Keep NEWS_SOURCES order so selection indices are stable across runs
+    all_news = []
+    for source in sources:
+        all_news.extend(results.get(source['scraper'], []))
 
     print(f"\nTotal scraped: {len(all_news)} news items from all sources")
     return all_news
@@ -0,0 +1,84 @@
+"""
+Streaming helpers for large media payloads.
+
+Videos are passed between stages as file paths, never as whole-file byte
+strings: downloads go to disk in chunks (transport.download_to_file), and
+base64 video embedded in a JSON response (useapi.net concatenate) is
+decoded from the saved response straight into the output file, a chunk
+at a time.
+"""
+
+import os
+import re
+import base64
+from typing import Optional, Sequence
+
+CHUNK_SIZE = 1 << 20  # 1 MiB
+
+_B64_JUNK = re.compile(rb'[^A-Za-z0-9+/=]')  # whitespace and JSON escapes (\/ -> /)
+
+
+class Base64StreamDecoder:
+    """Decode base64 text written in arbitrary pieces into a binary file."""
+
+    def __init__(self, out):
+        self.out = out
+        self.bytes_written = 0
+        self._pending = b''
+
+    def write(self, data: bytes) -> None:
+        data = self._pending + _B64_JUNK.sub(b'', data)
+        usable = len(data) - len(data) % 4
+        self._pending = data[usable:]
+        if usable:
+            decoded = base64.b64decode(data[:usable])
+            self.out.write(decoded)
+            self.bytes_written += len(decoded)
+
+    def close(self) -> None:
+        if self._pending:
+            padded = self._pending + b'=' * (-len(self._pending) % 4)
+            decoded = base64.b64decode(padded)
+            self.out.write(decoded)
+            self.bytes_written += len(decoded)
+            self._pending = b''
+
+
+def extract_json_base64(json_path: str, keys: Sequence[str], out_path: str,
+                        chunk_size: int = CHUNK_SIZE) -> Optional[int]:
+    """Find the first string value of one of `keys` in a saved JSON document
+    and decode it (base64) into out_path without loading it whole.
+    Returns the decoded size, or None if no such key holds a string."""
+    value_start = re.compile(rb'"(?:' + b'|'.join(re.escape(k.encode()) for k in keys) + rb')"\s*:\s*"')
+    with open(json_path, 'rb') as src:
+        buf = b''
+        while True:
+            chunk = src.read(chunk_size)
+            buf += chunk
+            match = value_start.search(buf)
+            if match:
+                rest = buf[match.end():]
+                break
+            if not chunk:
+                return None
+            buf = buf[-256:]  # keep enough to catch a key split across chunks
+
+        tmp_path = out_path + '.tmp'
+        try:
+            with open(tmp_path, 'wb') as out:
+                decoder = Base64StreamDecoder(out)
+                while True:
+                    end = rest.find(b'"')
+                    if end != -1:
+                        decoder.write(rest[:end])
+                        break
+                    decoder.write(rest)
+                    rest = src.read(chunk_size)
+                    if not rest:
+                        raise ValueError("unterminated base64 string in JSON response")
+                decoder.close()
+            os.replace(tmp_path, out_path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+    return decoder.bytes_written
@@ -0,0 +1,116 @@
+"""
+Shared HTTP transport for all outbound calls.
+
+One process-wide requests.Session with per-host connection pools, keep-alive
+and a retry/backoff adapter, so repeated calls to Sanity, useapi.net and the
+news hosts reuse TCP+TLS connections instead of re-handshaking every request.
+"""
+
+import os
+import threading
+from http.cookiejar import DefaultCookiePolicy
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from .config import (HTTP_POOL_CONNECTIONS, HTTP_POOL_MAXSIZE,
+                     HTTP_MAX_RETRIES, HTTP_BACKOFF_FACTOR)
+
+# Transient statuses worth retrying. Only idempotent methods are retried;
+# POSTs (Sanity mutations, Flow generations) are never replayed by the adapter.
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+RETRY_METHODS = frozenset({'GET', 'HEAD', 'OPTIONS'})
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def _build_session():
+    """Create a pooled session with keep-alive and retry/backoff adapters."""
+    retry = Retry(
+        total=HTTP_MAX_RETRIES,
+        connect=HTTP_MAX_RETRIES,
+        read=0,  # a read timeout already cost the full timeout; don't multiply it
+        status=HTTP_MAX_RETRIES,
+        backoff_factor=HTTP_BACKOFF_FACTOR,
+        status_forcelist=RETRY_STATUSES,
+        allowed_methods=RETRY_METHODS,
+        respect_retry_after_header=False,
+        raise_on_status=False,  # callers inspect status codes themselves
+    )
+    adapter = HTTPAdapter(
+        pool_connections=HTTP_POOL_CONNECTIONS,
+        pool_maxsize=HTTP_POOL_MAXSIZE,
+        max_retries=retry,
+    )
+    session = requests.Session()
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    # Stay stateless like bare requests.get/post: no cookies carried between calls
+    session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+    return session
+
+
+def get_session():
+    """Return the shared session, creating it on first use."""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = _build_session()
+    return _session
+
+
+def close_session():
+    """Close all pooled connections (the next call opens a fresh session)."""
+    global _session
+    with _session_lock:
+        if _session is not None:
+            _session.close()
+            _session = None
+
+
+def get(url, **kwargs):
+    """GET through the shared session. Accepts the same kwargs as requests.get."""
+    return get_session().get(url, **kwargs)
+
+
+def post(url, **kwargs):
+    """POST through the shared session. Accepts the same kwargs as requests.post."""
+    return get_session().post(url, **kwargs)
+
+
+def head(url, **kwargs):
+    """HEAD through the shared session. Accepts the same kwargs as requests.head."""
+    return get_session().head(url, **kwargs)
+
+
+def save_response(response, path, chunk_size=1 << 20):
+    """Write a (stream=True) response body to path in chunks, atomically.
+    Returns the number of bytes written."""
+    tmp_path = path + '.part'
+    written = 0
+    try:
+        with open(tmp_path, 'wb') as f:
+            for chunk in response.iter_content(chunk_size=chunk_size):
+                f.write(chunk)
+                written += len(chunk)
+        os.replace(tmp_path, path)
+    finally:
+        response.close()
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return written
+
+
+def download_to_file(url, path, timeout=120, **kwargs):
+    """Stream a GET straight to disk instead of holding the body in memory.
+    Raises requests.HTTPError on a non-2xx status. Returns the bytes written."""
+    response = get_session().get(url, stream=True, timeout=timeout, **kwargs)
+    try:
+        response.raise_for_status()
+    except Exception:
+        response.close()
+        raise
+    return save_response(response, path)
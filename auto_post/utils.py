@@ -1,13 +1,15 @@
 """
 Utility functions for the auto_post package.
-Includes Portable Text conversion and title list management.
+Includes Portable Text conversion, title list management and atomic JSON writes.
 """
 
+import os
 import re
 import json
 import uuid
+import tempfile
 
-from .config import TITLES_FILE, USED_TOPICS_FILE
+from .config import TITLES_FILE, USED_TOPICS_FILE, USED_TOPICS_MAX
 
 
 def generate_key():
@@ -15,6 +17,28 @@ def generate_key():
     return uuid.uuid4().hex[:12]
 
 
+def write_json_atomic(path, data, trailing_newline=False, **dump_kwargs):
+    """Write data as JSON to path atomically: a temp file in the same
+    directory, made world-readable (mkstemp creates 0600), fsynced, then
+    renamed over path. The temp file is removed if anything fails; errors
+    are raised for the caller to handle."""
+    directory = os.path.dirname(path) or '.'
+    fd, tmp_path = tempfile.mkstemp(prefix=f'.{os.path.basename(path)}.', dir=directory)
+    try:
+        os.chmod(tmp_path, 0o644)
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(data, f, **dump_kwargs)
+            if trailing_newline:
+                f.write('\n')
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
 def load_title_list():
     """Load pending titles from titles.json."""
     try:
@@ -70,9 +94,9 @@ def add_used_topic(topic_summary):
     """Add a new topic to the used topics list."""
     topics = load_used_topics()
     topics.append(topic_summary)
-    # Keep last 500 topics to prevent file from growing too large
-    if len(topics) > 500:
-        topics = topics[-500:]
+    # Optional cap (USED_TOPICS_MAX); near-duplicate lookups go through the index, not this list
+    if USED_TOPICS_MAX and len(topics) > USED_TOPICS_MAX:
+        topics = topics[-USED_TOPICS_MAX:]
     return save_used_topics(topics)
 
 
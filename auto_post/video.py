@@ -7,21 +7,26 @@ import re
 import json
 import time
 import random
-import base64
+import shutil
+import threading
 import requests
 from concurrent.futures import ThreadPoolExecutor, as_completed
 
-from google import genai
-from google.genai import types
-
 from .config import (GEMINI_API_KEY, VIDEOS_DIR, SPOKESPERSON_IMAGES_DIR,
                      USEAPI_TOKEN, USEAPI_GOOGLE_EMAIL, USEAPI_BASE_URL,
-                     VIDEO_SEED_MODE)
+                     VIDEO_SEED_MODE, VIDEO_CONCAT_MODE)
 from .content import sanitize_json_control_chars
+from .video_state import VideoCheckpoint
+from .reference_cache import ReferenceUploadCache, file_sha256
+from .flow_client import flow_headers, get_flow_client
+from .pipeline import StageGraph
+from .streaming import extract_json_base64
+from .encoding import get_encoder, get_capabilities, clip_headers
+from .face_scoring import get_face_scorer
+from .llm import get_llm
+from . import transport
 
 # --- Flow (useapi.net) Constants ---
-FLOW_POLL_INTERVAL = 15      # seconds between polling
-FLOW_MAX_POLLS = 50          # ~12.5 min max per operation
 FLOW_MODEL = 'veo-3.1-fast'  # supports R2V, cheapest
 
 # Supported image extensions (for Veo reference images)
@@ -35,60 +40,28 @@ _MIME_TYPES = {'.jpg': 'image/jpeg', '.jpeg': 'image/jpeg', '.png': 'image/png',
 
 def _flow_headers(content_type='application/json'):
     """Return headers for useapi.net API requests."""
-    return {
-        'Authorization': f'Bearer {USEAPI_TOKEN}',
-        'Content-Type': content_type,
-    }
-
-
-def _flow_poll_job(job_id):
-    """Poll a useapi.net job until completed/failed/timeout.
-    Returns the completed job dict, or None on failure."""
-    for poll in range(FLOW_MAX_POLLS):
-        time.sleep(FLOW_POLL_INTERVAL)
-        try:
-            resp = requests.get(
-                f'{USEAPI_BASE_URL}/jobs/{job_id}',
-                headers=_flow_headers(),
-                timeout=30,
-            )
-        except requests.RequestException as e:
-            print(f"    Poll error: {e}")
-            continue
-
-        if resp.status_code != 200:
-            print(f"    Poll returned {resp.status_code}: {resp.text[:300]}")
-            continue
-
-        result = resp.json()
-        status = result.get('status', 'unknown')
-        elapsed = (poll + 1) * FLOW_POLL_INTERVAL
-        print(f"    Polling... status={status} ({elapsed}s elapsed)")
-
-        if status == 'completed':
-            return result
-        if status in ('failed', 'nsfw'):
-            print(f"    Job {status}: {result}")
-            return None
-
-    print(f"    Timeout after {FLOW_MAX_POLLS * FLOW_POLL_INTERVAL}s")
-    return None
+    return flow_headers(content_type)
 
 
-def _flow_upload_reference_images():
+def _flow_upload_reference_images(use_cache=True):
     """Upload spokesperson reference images to useapi.net as Flow assets.
-    Returns dict with 'body', 'face', 'all' ref ID lists, plus 'primary_body' and 'primary_face'.
+    Images already uploaded to this account (same SHA-256) within
+    FLOW_REFERENCE_CACHE_TTL are taken from the reference upload cache instead.
+    Returns dict with 'body', 'face', 'all' ref ID lists, plus 'primary_body' and 'primary_face'
+    ('cached' is True if any ID came from the cache).
     Images with 'body' in the filename are categorized as body refs.
     Primary refs (always used for clip generation): ref_full_body.png (body), ref_smile.png (face)."""
     if not os.path.exists(SPOKESPERSON_IMAGES_DIR):
         print("    No assets directory found")
-        return {'body': [], 'face': [], 'all': [], 'primary_body': None, 'primary_face': None}
+        return {'body': [], 'face': [], 'all': [], 'primary_body': None, 'primary_face': None, 'cached': False}
 
+    cache = _get_reference_cache()
     body_refs = []
     face_refs = []
     primary_body = None
     primary_face = None
     total = 0
+    from_cache = 0
     for filename in sorted(os.listdir(SPOKESPERSON_IMAGES_DIR)):
         ext = os.path.splitext(filename)[1].lower()
         if ext not in ('.jpg', '.jpeg', '.png'):
@@ -100,56 +73,112 @@ def _flow_upload_reference_images():
         try:
             with open(filepath, 'rb') as f:
                 image_data = f.read()
+            sha = file_sha256(image_data)
+
+            media_id = cache.get(USEAPI_GOOGLE_EMAIL, sha) if use_cache else None
+            source = "cached"
+            if not media_id:
+                source = "uploaded"
+                with get_flow_client().governor.slot():
+                    resp = transport.post(
+                        f'{USEAPI_BASE_URL}/assets/{USEAPI_GOOGLE_EMAIL}',
+                        headers=_flow_headers(content_type=content_type),
+                        data=image_data,
+                        timeout=60,
+                    )
+
+                if resp.status_code != 200:
+                    print(f"    Upload failed for {filename}: {resp.status_code} {resp.text[:300]}")
+                    continue
 
-            resp = requests.post(
-                f'{USEAPI_BASE_URL}/assets/{USEAPI_GOOGLE_EMAIL}',
-                headers=_flow_headers(content_type=content_type),
-                data=image_data,
-                timeout=60,
-            )
-
-            if resp.status_code != 200:
-                print(f"    Upload failed for {filename}: {resp.status_code} {resp.text[:300]}")
-                continue
+                result = resp.json()
+                media_id = result.get('mediaGenerationId', {}).get('mediaGenerationId')
+                if not media_id:
+                    print(f"    Upload response missing mediaGenerationId: {result}")
+                    continue
+                cache.put(USEAPI_GOOGLE_EMAIL, sha, media_id, filename)
 
-            result = resp.json()
-            media_id = result.get('mediaGenerationId', {}).get('mediaGenerationId')
-            if media_id:
-                is_body = 'body' in filename.lower()
-                category = "body" if is_body else "face"
-                print(f"    Uploaded {filename} [{category}] -> {media_id[:40]}...")
-                if is_body:
-                    body_refs.append(media_id)
-                else:
-                    face_refs.append(media_id)
-                total += 1
-
-                # Track primary refs by filename
-                if filename == 'ref_full_body.png':
-                    primary_body = media_id
-                elif filename == 'ref_smile.png':
-                    primary_face = media_id
+            is_body = 'body' in filename.lower()
+            category = "body" if is_body else "face"
+            print(f"    {source.capitalize()} {filename} [{category}] -> {media_id[:40]}...")
+            if is_body:
+                body_refs.append(media_id)
             else:
-                print(f"    Upload response missing mediaGenerationId: {result}")
+                face_refs.append(media_id)
+            total += 1
+            if source == "cached":
+                from_cache += 1
+
+            # Track primary refs by filename
+            if filename == 'ref_full_body.png':
+                primary_body = media_id
+            elif filename == 'ref_smile.png':
+                primary_face = media_id
         except Exception as e:
             print(f"    Error uploading {filename}: {e}")
 
         if total >= 10:
             break
 
+    if total > from_cache:
+        cache.save()
+
     # Fallback if primary files weren't found
     if not primary_body and body_refs:
         primary_body = body_refs[0]
     if not primary_face and face_refs:
         primary_face = face_refs[0]
 
-    print(f"    {total} reference image(s) uploaded ({len(body_refs)} body, {len(face_refs)} face)")
+    print(f"    {total} reference image(s) ready ({len(body_refs)} body, {len(face_refs)} face; "
+          f"{from_cache} from cache, {total - from_cache} uploaded)")
     return {
         'body': body_refs, 'face': face_refs, 'all': body_refs + face_refs,
         'primary_body': primary_body, 'primary_face': primary_face,
+        'cached': from_cache > 0,
     }
 
 
+_reference_cache = None
+_reference_cache_lock = threading.Lock()
+_reference_images = None
+_reference_images_lock = threading.Lock()
+
+
+def _get_reference_cache():
+    """Process-wide reference upload cache (loaded on first use)."""
+    global _reference_cache
+    if _reference_cache is None:
+        with _reference_cache_lock:
+            if _reference_cache is None:
+                _reference_cache = ReferenceUploadCache()
+    return _reference_cache
+
+
+def _flow_reference_images():
+    """Reference images for this process: uploaded (or read from the cache) once
+    and shared by every variant thread. Concurrent callers wait for the first."""
+    global _reference_images
+    with _reference_images_lock:
+        if _reference_images is None:
+            ref_data = _flow_upload_reference_images()
+            if not ref_data['all']:
+                return ref_data  # nothing usable - let the next caller try again
+            _reference_images = ref_data
+        return _reference_images
+
+
+def _invalidate_reference_images(ref_data):
+    """Forget reference IDs Flow didn't accept, in this process and in the cache,
+    so the next _flow_reference_images() call uploads fresh copies."""
+    global _reference_images
+    with _reference_images_lock:
+        if _reference_images is not None and _reference_images['all'] == ref_data['all']:
+            _reference_images = None
+    cache = _get_reference_cache()
+    if cache.invalidate(USEAPI_GOOGLE_EMAIL, ref_data['all']):
+        cache.save()
+
+
 def _extract_video_from_response(result):
     """Extract (mediaGenerationId, video_url) from a useapi.net response.
     Handles both top-level and nested 'response' structures."""
@@ -173,43 +202,17 @@ def _extract_video_from_response(result):
 
 
 FLOW_GENERATION_RETRIES = 3  # retries on clip generation/extension failure
+FLOW_STAGE_WORKERS = 4       # concurrent stages per video (upscales, scene save, hook filter)
 
 
 def _flow_post_with_retry(url, payload, label="request"):
-    """POST to a Flow endpoint with unlimited retries on 403 captcha failures.
+    """POST to a Flow endpoint through the shared client (account-wide rate
+    limit and captcha backoff, bounded retries - see flow_client.py).
     Returns (mediaGenerationId, video_url) or (None, None)."""
-    attempt = 0
-    while True:
-        attempt += 1
-        try:
-            resp = requests.post(url, headers=_flow_headers(), json=payload, timeout=120)
-        except requests.RequestException as e:
-            print(f"    Flow {label} error: {e}")
-            return None, None
-
-        if resp.status_code == 200:
-            return _extract_video_from_response(resp.json())
-
-        if resp.status_code == 201:
-            result = resp.json()
-            job_id = result.get('jobid') or result.get('jobId')
-            if not job_id:
-                print(f"    No jobid in async response: {list(result.keys())}")
-                return None, None
-            print(f"    Job queued: {job_id[:60]}...")
-            completed = _flow_poll_job(job_id)
-            if not completed:
-                return None, None
-            return _extract_video_from_response(completed)
-
-        if resp.status_code == 403 and 'reCAPTCHA' in resp.text:
-            delay = 15 if attempt % 5 == 0 else 5
-            print(f"    Captcha failed (attempt {attempt}), retrying in {delay}s...")
-            time.sleep(delay)
-            continue
-
-        print(f"    Flow {label} failed: {resp.status_code} {resp.text[:500]}")
+    result = get_flow_client().submit(url, payload, label)
+    if not result:
         return None, None
+    return _extract_video_from_response(result)
 
 
 def _extract_image_from_response(result):
@@ -253,87 +256,20 @@ def _extract_all_images_from_response(result):
 
 
 def _flow_post_image_with_retry(url, payload, label="image", return_all=False):
-    """POST to a Flow image endpoint with retries on 403 captcha failures.
+    """POST to a Flow image endpoint through the shared client (see flow_client.py).
     If return_all=True, returns list of (id, url) tuples. Otherwise returns single (id, url)."""
-    attempt = 0
-    while True:
-        attempt += 1
-        try:
-            resp = requests.post(url, headers=_flow_headers(), json=payload, timeout=120)
-        except requests.RequestException as e:
-            print(f"    Flow {label} error: {e}")
-            return [] if return_all else (None, None)
-
-        if resp.status_code == 200:
-            if return_all:
-                return _extract_all_images_from_response(resp.json())
-            return _extract_image_from_response(resp.json())
-
-        if resp.status_code == 201:
-            result = resp.json()
-            job_id = result.get('jobid') or result.get('jobId')
-            if not job_id:
-                print(f"    No jobid in async image response: {list(result.keys())}")
-                return [] if return_all else (None, None)
-            print(f"    Image job queued: {job_id[:60]}...")
-            completed = _flow_poll_job(job_id)
-            if not completed:
-                return [] if return_all else (None, None)
-            if return_all:
-                return _extract_all_images_from_response(completed)
-            return _extract_image_from_response(completed)
-
-        if resp.status_code == 403 and 'reCAPTCHA' in resp.text:
-            delay = 15 if attempt % 5 == 0 else 5
-            print(f"    Captcha failed (attempt {attempt}), retrying in {delay}s...")
-            time.sleep(delay)
-            continue
-
-        print(f"    Flow {label} failed: {resp.status_code} {resp.text[:500]}")
+    result = get_flow_client().submit(url, payload, label)
+    if not result:
         return [] if return_all else (None, None)
-
-
-def _score_face_similarity(candidate_url, ref_image_path):
-    """Use Gemini vision to score how similar a candidate face is to the reference.
-    Returns a score 1-10, or 0 on failure."""
-    gemini_key = os.environ.get('GEMINI_API_KEY') or GEMINI_API_KEY
-    if not gemini_key or not candidate_url:
-        return 0
-    try:
-        # Download candidate image
-        resp = requests.get(candidate_url, timeout=30)
-        if resp.status_code != 200:
-            return 0
-        candidate_bytes = resp.content
-
-        # Load reference image
-        with open(ref_image_path, 'rb') as f:
-            ref_bytes = f.read()
-
-        client = genai.Client(api_key=gemini_key)
-        response = client.models.generate_content(
-            model='gemini-2.5-flash',
-            contents=[
-                "Rate 1-10 how similar the face in Image A is to Image B. "
-                "Consider: bone structure, eye shape/color, nose shape, lip shape, "
-                "skin tone, freckle pattern, cheekbone definition, jawline, hair. "
-                "10 = clearly the same person. 1 = completely different person. "
-                "Respond with ONLY a single number.",
-                types.Part.from_bytes(data=candidate_bytes, mime_type='image/png'),
-                "Image A (candidate) above. Image B (reference) below.",
-                types.Part.from_bytes(data=ref_bytes, mime_type='image/png'),
-            ]
-        )
-        score = int(response.text.strip().split()[0])
-        return max(1, min(10, score))
-    except Exception as e:
-        print(f"    Face scoring error: {e}")
-        return 0
+    if return_all:
+        return _extract_all_images_from_response(result)
+    return _extract_image_from_response(result)
 
 
 def _flow_generate_scene_image(appearance_brief, ref_ids, setting=""):
     """Generate face-matched images of Valentina using nano-banana-pro.
-    Generates 4 candidates, scores each with Gemini vision, picks the best.
+    Generates 4 candidates, scores them against the reference face (see
+    face_scoring.py), picks the best.
     Returns (mediaGenerationId, fifeUrl) or (None, None)."""
     if not ref_ids:
         print("    No reference IDs for scene image generation")
@@ -401,9 +337,14 @@ RULES:
                 break
 
     best_id, best_url, best_score = None, None, 0
-    for idx, (img_id, img_url) in enumerate(candidates):
-        score = _score_face_similarity(img_url, ref_front_path)
-        print(f"    Candidate {idx + 1}: score={score}/10")
+    try:
+        scores = get_face_scorer(ref_front_path).score_candidates([img_url for _, img_url in candidates])
+    except Exception as e:
+        print(f"    Face scoring unavailable: {e}")
+        scores = [0] * len(candidates)
+    for idx, ((img_id, img_url), score) in enumerate(zip(candidates, scores)):
+        if score:
+            print(f"    Candidate {idx + 1}: score={score}/10")
         if score > best_score:
             best_id, best_url, best_score = img_id, img_url, score
 
@@ -415,6 +356,19 @@ RULES:
     return best_id, best_url
 
 
+def _save_scene_image(scene_url, slug):
+    """Download the chosen scene image next to the videos (for review).
+    Returns the saved path, or None."""
+    scene_path = os.path.join(VIDEOS_DIR, f'{slug}_scene.png')
+    try:
+        transport.download_to_file(scene_url, scene_path, timeout=30)
+        print(f"    Scene image saved: {scene_path}")
+        return scene_path
+    except Exception as e:
+        print(f"    Could not save scene image: {e}")
+    return None
+
+
 def _flow_generate_clip(prompt, ref_ids=None, start_image_id=None):
     """Generate a single video clip via Google Flow.
     Returns (mediaGenerationId, video_url) or (None, None)."""
@@ -463,9 +417,10 @@ def _flow_upscale_clip(media_id, resolution='1080p'):
     return _flow_post_with_retry(f'{USEAPI_BASE_URL}/videos/upscale', payload, "upscale")
 
 
-def _flow_concatenate(media_ids):
-    """Concatenate clips into a single video via Google Flow.
-    Returns raw video bytes or None."""
+def _flow_concatenate(media_ids, output_path):
+    """Concatenate clips into a single video via Google Flow, written to output_path.
+    The response (base64 video inside JSON) is streamed to disk and decoded
+    from there in chunks. Returns output_path or None."""
     media = []
     for i, mid in enumerate(media_ids):
         entry = {'mediaGenerationId': mid}
@@ -477,55 +432,125 @@ def _flow_concatenate(media_ids):
     payload = {'media': media}
 
     try:
-        resp = requests.post(
-            f'{USEAPI_BASE_URL}/videos/concatenate',
-            headers=_flow_headers(),
-            json=payload,
-            timeout=180,  # concatenation can take up to 3 min
-        )
+        with get_flow_client().governor.slot():
+            resp = transport.post(
+                f'{USEAPI_BASE_URL}/videos/concatenate',
+                headers=_flow_headers(),
+                json=payload,
+                timeout=180,  # concatenation can take up to 3 min
+                stream=True,
+            )
     except requests.RequestException as e:
         print(f"    Concatenate error: {e}")
         return None
 
     if resp.status_code != 200:
         print(f"    Concatenate failed: {resp.status_code} {resp.text[:500]}")
+        resp.close()
         return None
 
-    result = resp.json()
-    # Response contains base64-encoded video as 'encodedVideo' or 'video'
-    video_b64 = result.get('encodedVideo') or result.get('video')
-    if video_b64:
+    response_path = output_path + '.response.json'
+    try:
+        transport.save_response(resp, response_path)
+        # Response contains base64-encoded video as 'encodedVideo' or 'video'
         try:
-            video_bytes = base64.b64decode(video_b64)
-            print(f"    Concatenated video: {len(video_bytes) / 1024 / 1024:.1f} MB")
-            return video_bytes
+            size = extract_json_base64(response_path, ('encodedVideo', 'video'), output_path)
         except Exception as e:
             print(f"    Error decoding concatenated video: {e}")
             return None
+        if size:
+            print(f"    Concatenated video: {size / 1024 / 1024:.1f} MB")
+            return output_path
+
+        # Try URL-based response as fallback (small JSON, safe to load)
+        with open(response_path, 'r') as f:
+            result = json.load(f)
+        video_url = result.get('videoUrl') or result.get('url')
+        if video_url:
+            try:
+                transport.download_to_file(video_url, output_path, timeout=120)
+                return output_path
+            except Exception as e:
+                print(f"    Download from concat URL failed: {e}")
+                return None
 
-    # Try URL-based response as fallback
-    video_url = result.get('videoUrl') or result.get('url')
-    if video_url:
-        try:
-            dl = requests.get(video_url, timeout=120)
-            dl.raise_for_status()
-            return dl.content
-        except Exception as e:
-            print(f"    Download from concat URL failed: {e}")
-            return None
+        print(f"    No video data in concatenate response: {list(result.keys())}")
+        return None
+    except (OSError, ValueError) as e:
+        print(f"    Concatenate response error: {e}")
+        return None
+    finally:
+        if os.path.exists(response_path):
+            os.remove(response_path)
+
+
+def _finishing_filter(durations, crossfade_duration=0.3, trim_extensions=1.0, hook_filter=None, fps=24):
+    """Build one filter graph for the whole finishing stage: trim the overlap
+    off every extension, chain xfade/acrossfade across any number of clips,
+    and burn in the hook text. Outputs [v] and [a].
+    durations: length in seconds of each input clip (before trimming).
+    fps: frame rate of the clips (xfade needs a constant frame rate, which
+    trim+setpts alone don't declare)."""
+    parts = []
+    lengths = []
+    for i, duration in enumerate(durations):
+        start = trim_extensions if i > 0 else 0
+        parts.append(f"[{i}:v]trim=start={start},setpts=PTS-STARTPTS,fps={fps:g}[v{i}]")
+        parts.append(f"[{i}:a]atrim=start={start},asetpts=PTS-STARTPTS[a{i}]")
+        lengths.append(max(duration - start, crossfade_duration))
+
+    video, audio = 'v0', 'a0'
+    offset = 0.0
+    for i in range(1, len(durations)):
+        offset += lengths[i - 1] - crossfade_duration
+        parts.append(f"[{video}][v{i}]xfade=transition=fade:duration={crossfade_duration}:offset={offset:.3f}[vx{i}]")
+        parts.append(f"[{audio}][a{i}]acrossfade=d={crossfade_duration}[ax{i}]")
+        video, audio = f'vx{i}', f'ax{i}'
+
+    parts.append(f"[{video}]{hook_filter}[v]" if hook_filter else f"[{video}]null[v]")
+    parts.append(f"[{audio}]anull[a]")
+    return ';'.join(parts)
+
+
+def _finish_video_locally(clip_paths, output_path, crossfade_duration=0.3, trim_extensions=1.0, hook_filter=None):
+    """Single-pass finishing: trims, crossfades and hook text in one ffmpeg
+    run, so the video is encoded exactly once. Returns output_path or None."""
+    caps = get_capabilities()
+    if not caps.can_crossfade or not clip_paths:
+        return None
 
-    print(f"    No video data in concatenate response: {list(result.keys())}")
-    return None
+    headers = clip_headers(clip_paths)
+    durations = [duration for duration, _ in headers]
+    fps = headers[0][1]
+    cmd = [caps.ffmpeg]
+    for path in clip_paths:
+        cmd += ['-i', path]
+    cmd += [
+        '-filter_complex', _finishing_filter(durations, crossfade_duration, trim_extensions, hook_filter, fps),
+        '-map', '[v]', '-map', '[a]',
+        *caps.video_codec_args(),
+        '-c:a', 'aac', '-b:a', '128k',
+        '-movflags', '+faststart',
+        '-f', 'mp4',  # output_path may not end in .mp4 (checkpoint .concat.part)
+        '-y', output_path
+    ]
+    result = get_encoder().run(cmd, timeout=60 + 30 * len(clip_paths), label='local finishing')
+    if result.returncode != 0:
+        print(f"    Local finishing failed: {result.stderr.decode()[-300:]}")
+        return None
+    print(f"    Finished locally ({len(clip_paths)} clip(s), one encode): "
+          f"{os.path.getsize(output_path) / 1024 / 1024:.1f} MB")
+    return output_path
 
 
-def _local_concatenate_with_crossfade(clip_urls, crossfade_duration=0.3, trim_extensions=1.0):
-    """Download clips and concatenate locally with ffmpeg crossfade.
-    Returns video bytes or None."""
-    import subprocess
+def _local_concatenate_with_crossfade(clip_urls, output_path, crossfade_duration=0.3, trim_extensions=1.0,
+                                      hook_filter=None):
+    """Download clips and concatenate locally with ffmpeg crossfade into output_path,
+    burning in the hook text (hook_filter) in the same encode.
+    Returns output_path or None."""
     import tempfile
 
-    ffmpeg = _get_ffmpeg()
-    if not ffmpeg or len(clip_urls) < 2:
+    if not clip_urls:
         return None
 
     tmp_dir = tempfile.mkdtemp(prefix='autoblogger_')
@@ -536,92 +561,14 @@ def _local_concatenate_with_crossfade(clip_urls, crossfade_duration=0.3, trim_ex
         for i, url in enumerate(clip_urls):
             clip_path = os.path.join(tmp_dir, f'clip_{i}.mp4')
             try:
-                dl = requests.get(url, timeout=120)
-                dl.raise_for_status()
-                with open(clip_path, 'wb') as f:
-                    f.write(dl.content)
+                size = transport.download_to_file(url, clip_path, timeout=120)
                 clip_paths.append(clip_path)
-                print(f"    Downloaded clip {i + 1}: {len(dl.content) / 1024 / 1024:.1f} MB")
+                print(f"    Downloaded clip {i + 1}: {size / 1024 / 1024:.1f} MB")
             except Exception as e:
                 print(f"    Failed to download clip {i + 1}: {e}")
                 return None
 
-        # Trim extensions (skip first N seconds) and re-encode to ensure consistent format
-        trimmed_paths = []
-        for i, path in enumerate(clip_paths):
-            if i == 0:
-                trimmed_paths.append(path)
-            else:
-                trimmed = os.path.join(tmp_dir, f'trimmed_{i}.mp4')
-                cmd = [
-                    ffmpeg, '-i', path,
-                    '-ss', str(trim_extensions),
-                    '-c:v', 'libx264', '-preset', 'fast', '-crf', '18',
-                    '-c:a', 'aac', '-b:a', '128k',
-                    '-y', trimmed
-                ]
-                result = subprocess.run(cmd, capture_output=True, timeout=60)
-                if result.returncode != 0:
-                    print(f"    Trim failed for clip {i + 1}: {result.stderr.decode()[:150]}")
-                    return None
-                trimmed_paths.append(trimmed)
-
-        # Build xfade filter chain for video + acrossfade for audio
-        output_path = os.path.join(tmp_dir, 'final.mp4')
-
-        if len(trimmed_paths) == 2:
-            # Simple 2-clip crossfade
-            # Get duration of first clip
-            dur1 = _get_video_duration(ffmpeg, trimmed_paths[0])
-            offset = dur1 - crossfade_duration
-
-            cmd = [
-                ffmpeg,
-                '-i', trimmed_paths[0],
-                '-i', trimmed_paths[1],
-                '-filter_complex',
-                f"[0:v][1:v]xfade=transition=fade:duration={crossfade_duration}:offset={offset}[v];"
-                f"[0:a][1:a]acrossfade=d={crossfade_duration}[a]",
-                '-map', '[v]', '-map', '[a]',
-                '-c:v', 'libx264', '-preset', 'fast', '-crf', '18',
-                '-c:a', 'aac', '-b:a', '128k',
-                '-y', output_path
-            ]
-        elif len(trimmed_paths) == 3:
-            # 3-clip crossfade chain
-            dur1 = _get_video_duration(ffmpeg, trimmed_paths[0])
-            dur2 = _get_video_duration(ffmpeg, trimmed_paths[1])
-            offset1 = dur1 - crossfade_duration
-            offset2 = offset1 + dur2 - crossfade_duration
-
-            cmd = [
-                ffmpeg,
-                '-i', trimmed_paths[0],
-                '-i', trimmed_paths[1],
-                '-i', trimmed_paths[2],
-                '-filter_complex',
-                f"[0:v][1:v]xfade=transition=fade:duration={crossfade_duration}:offset={offset1}[v01];"
-                f"[v01][2:v]xfade=transition=fade:duration={crossfade_duration}:offset={offset2}[v];"
-                f"[0:a][1:a]acrossfade=d={crossfade_duration}[a01];"
-                f"[a01][2:a]acrossfade=d={crossfade_duration}[a]",
-                '-map', '[v]', '-map', '[a]',
-                '-c:v', 'libx264', '-preset', 'fast', '-crf', '18',
-                '-c:a', 'aac', '-b:a', '128k',
-                '-y', output_path
-            ]
-        else:
-            print(f"    Unsupported clip count for local concat: {len(trimmed_paths)}")
-            return None
-
-        result = subprocess.run(cmd, capture_output=True, timeout=180)
-        if result.returncode != 0:
-            print(f"    Local crossfade concat failed: {result.stderr.decode()[:300]}")
-            return None
-
-        with open(output_path, 'rb') as f:
-            video_bytes = f.read()
-        print(f"    Crossfade concatenated: {len(video_bytes) / 1024 / 1024:.1f} MB")
-        return video_bytes
+        return _finish_video_locally(clip_paths, output_path, crossfade_duration, trim_extensions, hook_filter)
 
     finally:
         # Clean up temp directory
@@ -629,53 +576,10 @@ def _local_concatenate_with_crossfade(clip_urls, crossfade_duration=0.3, trim_ex
         shutil.rmtree(tmp_dir, ignore_errors=True)
 
 
-def _get_video_duration(ffmpeg_path, video_path):
-    """Get video duration in seconds using ffprobe."""
-    import subprocess
-    # Only replace the binary name, not directory parts like 'ffmpeg-full'
-    dir_name = os.path.dirname(ffmpeg_path)
-    ffprobe = os.path.join(dir_name, 'ffprobe')
-    cmd = [
-        ffprobe, '-v', 'quiet',
-        '-show_entries', 'format=duration',
-        '-of', 'default=noprint_wrappers=1:nokey=1',
-        video_path
-    ]
-    result = subprocess.run(cmd, capture_output=True, timeout=10)
-    try:
-        return float(result.stdout.decode().strip())
-    except (ValueError, AttributeError):
-        return 8.0  # default assumption
-
-
-# ffmpeg-full path (has drawtext, ass, subtitles filters)
-FFMPEG_BIN = '/opt/homebrew/opt/ffmpeg-full/bin/ffmpeg'
-
-
-def _get_ffmpeg():
-    """Return path to ffmpeg with text/subtitle support."""
-    import shutil
-    if os.path.isfile(FFMPEG_BIN):
-        return FFMPEG_BIN
-    # Fallback to system ffmpeg
-    ffmpeg_path = shutil.which('ffmpeg')
-    if not ffmpeg_path:
-        print("  Warning: ffmpeg not found - captions and hook text will be skipped")
-    return ffmpeg_path
-
-
-def _overlay_hook_text(video_path, hook_text):
-    """Burn bold hook text onto the first 3 seconds of the video using ffmpeg.
-    Text scales in from small to full size over 0.5s (stepped), centered on screen."""
-    import subprocess
-
-    ffmpeg = _get_ffmpeg()
-    if not hook_text:
-        return video_path
-    if not ffmpeg:
-        print(f"    Hook text overlay skipped (ffmpeg not available)")
-        return video_path
-
+def _build_hook_text_filter(hook_text):
+    """Build the ffmpeg drawtext filter chain for the hook text (font lookup,
+    line wrapping, stepped scale-in). Doesn't need the video, so it can be
+    prepared while the clips are still rendering."""
     def _escape_drawtext(text):
         """Escape special chars for ffmpeg drawtext filter."""
         t = text.replace("\\", "\\\\").replace("'", "'\\''")
@@ -704,8 +608,6 @@ def _overlay_hook_text(video_path, hook_text):
             )
         return ','.join(parts)
 
-    tmp_path = video_path.replace('.mp4', '_tmp.mp4')
-
     # Find available font (cross-platform)
     font_candidates = [
         "/System/Library/Fonts/Helvetica.ttc",  # macOS
@@ -740,16 +642,32 @@ def _overlay_hook_text(video_path, hook_text):
     else:
         safe_text = _escape_drawtext(hook_text)
         filter_str = _build_filters_for_text(safe_text, '(h-text_h)/2')
+    return filter_str
+
+
+def _overlay_hook_text(video_path, hook_text, filter_str=None):
+    """Burn bold hook text onto the first 3 seconds of the video using ffmpeg.
+    Text scales in from small to full size over 0.5s (stepped), centered on screen.
+    filter_str: drawtext chain from _build_hook_text_filter, if already built."""
+    caps = get_capabilities()
+    if not hook_text:
+        return video_path
+    if not caps.can_overlay_text:
+        print(f"    Hook text overlay skipped (ffmpeg with drawtext not available)")
+        return video_path
+
+    filter_str = filter_str or _build_hook_text_filter(hook_text)
+    tmp_path = video_path.replace('.mp4', '_tmp.mp4')
 
     cmd = [
-        ffmpeg, '-i', video_path,
+        caps.ffmpeg, '-i', video_path,
         '-vf', filter_str,
         '-codec:a', 'copy',
         '-y', tmp_path
     ]
 
     try:
-        result = subprocess.run(cmd, capture_output=True, timeout=60)
+        result = get_encoder().run(cmd, timeout=60, label='hook text overlay')
         if result.returncode == 0:
             os.replace(tmp_path, video_path)
             print(f"    Hook text overlay applied")
@@ -775,6 +693,9 @@ def generate_tiktok_video_flow(article_data, variant_suffix='', precomputed_prom
         variant_suffix: Optional suffix for output filename (e.g., '_v1', '_v2')
         precomputed_prompt: Optional pre-generated prompt dict (skips generation if provided)
 
+    Each stage's output is checkpointed (see video_state.py); a rerun for the
+    same slug and variant resumes after the last completed stage.
+
     Returns file path to saved video, or None on failure."""
     slug = article_data.get('slug', 'untitled')
 
@@ -782,149 +703,242 @@ def generate_tiktok_video_flow(article_data, variant_suffix='', precomputed_prom
         print("  Error: USEAPI_TOKEN not set, skipping Flow video generation")
         return None
 
-    # Step 1: Generate prompts (or use precomputed)
+    checkpoint = VideoCheckpoint(slug, variant_suffix)
+    if precomputed_prompt and checkpoint.has('prompt') and precomputed_prompt != checkpoint.get('prompt'):
+        # The media generated so far belongs to a different script
+        print("  [Flow] New script for this video, discarding checkpoint")
+        checkpoint.clear()
+    if checkpoint.stages():
+        print(f"  [Flow] Resuming from checkpoint ({', '.join(checkpoint.stages())})")
+
+    # Step 1: Generate prompts (or use precomputed/checkpointed)
     if precomputed_prompt:
         print("  [Flow] Step 1: Using precomputed video script and prompts...")
         video_prompt = precomputed_prompt
+    elif checkpoint.has('prompt'):
+        print("  [Flow] Step 1: Using checkpointed video script and prompts...")
+        video_prompt = checkpoint.get('prompt')
     else:
         print("  [Flow] Step 1: Generating video script and prompts...")
         video_prompt = generate_video_prompt(article_data)
         if not video_prompt:
             return None
+    if not checkpoint.has('prompt'):
+        checkpoint.save('prompt', video_prompt)
 
-    # Step 2: Upload reference images
-    print("  [Flow] Step 2: Uploading reference images...")
-    ref_data = _flow_upload_reference_images()
-    ref_ids = ref_data['all']  # flat list for scene image generation
-    if ref_ids:
-        print(f"    Got {len(ref_ids)} reference ID(s)")
-
-    # Step 3: Generate scene image with nano-banana-pro (face-matched)
-    scene_image_id = None
-    if ref_ids:
-        appearance_brief = video_prompt.get('appearance', 'casual athletic wear')
-        setting_brief = video_prompt.get('setting', '')
-        print(f"  [Flow] Step 3: Generating face-matched scene image (nano-banana-pro, mode={VIDEO_SEED_MODE})...")
-        scene_image_id, scene_url = _flow_generate_scene_image(appearance_brief, ref_ids, setting=setting_brief)
-        if scene_url:
-            # Save scene image for debugging/review
-            try:
-                scene_resp = requests.get(scene_url, timeout=30)
-                if scene_resp.status_code == 200:
-                    scene_path = os.path.join(VIDEOS_DIR, f'{slug}_scene.png')
-                    with open(scene_path, 'wb') as f:
-                        f.write(scene_resp.content)
-                    print(f"    Scene image saved: {scene_path}")
-            except Exception as e:
-                print(f"    Could not save scene image: {e}")
-        if not scene_image_id:
-            print("    Falling back to original reference images")
-
-    # Step 4: Generate initial 8s clip (with retries)
-    print("  [Flow] Step 4: Generating initial 8s clip...")
-    clip1_id, clip1_url = None, None
-    for retry in range(FLOW_GENERATION_RETRIES):
-        if VIDEO_SEED_MODE == 'i2v' and scene_image_id:
-            # I2V mode: scene image becomes the first frame
-            clip1_id, clip1_url = _flow_generate_clip(
-                video_prompt['initial_prompt'], start_image_id=scene_image_id
-            )
-        else:
-            # R2V mode: fixed primary body ref + face ref + scene image
-            clip_refs = [r for r in [ref_data['primary_body'], ref_data['primary_face'], scene_image_id] if r]
-            if not clip_refs:
-                clip_refs = ref_ids[:3]  # fallback to old behavior
-            clip1_id, clip1_url = _flow_generate_clip(
-                video_prompt['initial_prompt'], ref_ids=clip_refs
-            )
-        if clip1_id:
-            break
-        if retry < FLOW_GENERATION_RETRIES - 1:
-            print(f"    Initial clip attempt {retry + 1}/{FLOW_GENERATION_RETRIES} failed, retrying in 5s...")
-            time.sleep(5)
-    if not clip1_id:
-        print(f"  Initial clip generation failed after {FLOW_GENERATION_RETRIES} attempts")
-        return None
-    print(f"    Initial clip ready: {clip1_id[:40]}...")
+    with StageGraph(max_workers=FLOW_STAGE_WORKERS, label=f"{slug}{variant_suffix}") as graph:
+        return _flow_render_stages(graph, checkpoint, slug, variant_suffix, video_prompt)
 
-    # Step 5: Extend 2x with continuation prompts (with retries)
-    media_ids = [clip1_id]
-    extension_prompts = video_prompt.get('extension_prompts', [])[:2]
-    for i, ext_prompt in enumerate(extension_prompts):
-        print(f"  [Flow] Step {5 + i}: Extending clip ({i + 1}/{len(extension_prompts)})...")
-        ext_id, ext_url = None, None
-        for retry in range(FLOW_GENERATION_RETRIES):
-            ext_id, ext_url = _flow_extend_clip(media_ids[-1], ext_prompt)
-            if ext_id:
-                break
-            if retry < FLOW_GENERATION_RETRIES - 1:
-                print(f"    Extension {i + 1} attempt {retry + 1}/{FLOW_GENERATION_RETRIES} failed, retrying in 5s...")
-                time.sleep(5)
-        if not ext_id:
-            print(f"    Extension {i + 1} failed after {FLOW_GENERATION_RETRIES} attempts, using partial video")
-            break
-        media_ids.append(ext_id)
-        print(f"    Extension {i + 1} ready: {ext_id[:40]}...")
 
-    # Step 7: Upscale all clips to 1080p (1080x1920 portrait)
-    print(f"  [Flow] Step 7: Upscaling {len(media_ids)} clip(s) to 1080p...")
-    upscaled_ids = []
-    for i, mid in enumerate(media_ids):
-        up_id, up_url = _flow_upscale_clip(mid, resolution='1080p')
-        if up_id:
-            upscaled_ids.append(up_id)
+def _flow_render_stages(graph, checkpoint, slug, variant_suffix, video_prompt):
+    """Steps 2-10 of generate_tiktok_video_flow as a stage graph. The clip and its
+    extensions form a chain; each clip's upscale starts as soon as that clip
+    exists (alongside the next extension), the scene image download and the
+    hook-text filter run in the background, and concatenation waits for the
+    upscales. Completed stages come from the checkpoint, never rerun."""
+    hook_text = video_prompt.get('hook_text', '')
+    if hook_text and not get_capabilities().can_overlay_text:
+        print("  Hook text will be skipped (ffmpeg with drawtext not available)")
+        hook_text = ''
+    if hook_text:
+        graph.add('hook_filter', lambda: _build_hook_text_filter(hook_text))
+
+    def add_upscale(i, media_id):
+        """Step 7 for one clip: upscale to 1080p (1080x1920 portrait). Never fails
+        the graph - a clip that can't be upscaled is used as is."""
+        def upscale():
+            done = checkpoint.get('upscales', {}).get(media_id)
+            if done:
+                print(f"    Clip {i + 1} upscale checkpointed: {done[0][:40]}...")
+                return done
+            up_id, up_url = _flow_upscale_clip(media_id, resolution='1080p')
+            if not up_id:
+                print(f"    Clip {i + 1} upscale failed, using original")
+                return [media_id, None]
             print(f"    Clip {i + 1} upscaled to 1080p: {up_id[:40]}...")
-        else:
-            print(f"    Clip {i + 1} upscale failed, using original")
-            upscaled_ids.append(mid)
-
-    # Step 8: Concatenate clips (server-side, no fades)
-    video_data = None
-    if len(upscaled_ids) >= 2:
-        print(f"  [Flow] Step 8: Concatenating {len(upscaled_ids)} clips (server)...")
-        video_data = _flow_concatenate(upscaled_ids)
+            checkpoint.save_item('upscales', media_id, [up_id, up_url])
+            return [up_id, up_url]
+        print(f"  [Flow] Step 7: Upscaling clip {i + 1} to 1080p (in background)...")
+        graph.add(f'upscale_{i}', upscale)
+
+    # A checkpointed concatenation means every clip stage is already done
+    concat_path = checkpoint.concat_file()
+    if concat_path:
+        print(f"  [Flow] Steps 2-8: Concatenated video checkpointed "
+              f"({os.path.getsize(concat_path) / 1024 / 1024:.1f} MB)")
     else:
-        # Only 1 clip — already upscaled, download from URL
-        print("  [Flow] Step 8: Downloading single upscaled clip...")
-        # Use the upscaled clip's URL if available
-        up_id, up_url = _flow_upscale_clip(media_ids[0], resolution='1080p')
-        if up_url:
-            try:
-                dl = requests.get(up_url, timeout=120)
-                dl.raise_for_status()
-                video_data = dl.content
-            except Exception as e:
-                print(f"    Download failed: {e}")
-        if not video_data:
-            try:
-                dl = requests.get(clip1_url, timeout=120)
-                dl.raise_for_status()
-                video_data = dl.content
-            except Exception as e:
-                print(f"    Download failed: {e}")
-                video_data = None
-
-    if not video_data:
-        print("  Failed to get final video data")
-        return None
+        os.makedirs(os.path.dirname(checkpoint.concat_path), exist_ok=True)
+        concat_path = _flow_render_clips(graph, checkpoint, slug, video_prompt, add_upscale, checkpoint.concat_path)
+        if not concat_path:
+            print("  Failed to get final video data")
+            return None
+        checkpoint.save('concat', concat_path)
 
-    # Step 9: Save
+    # Step 9: Save (a copy - the checkpointed file stays until the video is finished)
     output_path = os.path.join(VIDEOS_DIR, f"{slug}{variant_suffix}.mp4")
-    with open(output_path, 'wb') as f:
-        f.write(video_data)
+    shutil.copyfile(concat_path, output_path)
 
     file_size = os.path.getsize(output_path)
     print(f"  Video saved: {output_path} ({file_size / 1024 / 1024:.1f} MB)")
 
-    # Step 10: Overlay hook text
-    hook_text = video_prompt.get('hook_text', '')
-    if hook_text:
-        print(f"  [Flow] Step 8: Overlaying hook text: {hook_text}")
-        _overlay_hook_text(output_path, hook_text)
+    # Step 10: Overlay hook text (unless local finishing already burned it in)
+    if hook_text and not checkpoint.get('concat_has_hook'):
+        print(f"  [Flow] Step 10: Overlaying hook text: {hook_text}")
+        _overlay_hook_text(output_path, hook_text, filter_str=graph.result('hook_filter'))
 
+    # Finished: a later run for this slug/variant starts from scratch
+    checkpoint.clear()
     return output_path
 
 
+def _flow_render_clips(graph, checkpoint, slug, video_prompt, add_upscale, output_path):
+    """Steps 2-8: reference images, scene image, clip, extensions (each queued
+    for upscaling as it lands) and concatenation into output_path.
+    Returns output_path or None."""
+    if checkpoint.has('clip'):
+        clip1_id, clip1_url = checkpoint.get('clip')
+        print(f"  [Flow] Steps 2-4: Initial clip checkpointed: {clip1_id[:40]}...")
+    else:
+        # Step 2: Upload reference images
+        if checkpoint.has('refs'):
+            print("  [Flow] Step 2: Using checkpointed reference images...")
+            ref_data = checkpoint.get('refs')
+        else:
+            print("  [Flow] Step 2: Uploading reference images...")
+            ref_data = _flow_reference_images()
+            if ref_data['all']:
+                checkpoint.save('refs', ref_data)
+        ref_ids = ref_data['all']  # flat list for scene image generation
+        if ref_ids:
+            print(f"    Got {len(ref_ids)} reference ID(s)")
+
+        # Step 3: Generate scene image with nano-banana-pro (face-matched)
+        scene_image_id = None
+        if ref_ids and checkpoint.has('scene'):
+            scene_image_id, _ = checkpoint.get('scene')
+            print(f"  [Flow] Step 3: Using checkpointed scene image: {scene_image_id[:40]}...")
+        elif ref_ids:
+            appearance_brief = video_prompt.get('appearance', 'casual athletic wear')
+            setting_brief = video_prompt.get('setting', '')
+            print(f"  [Flow] Step 3: Generating face-matched scene image (nano-banana-pro, mode={VIDEO_SEED_MODE})...")
+            scene_image_id, scene_url = _flow_generate_scene_image(appearance_brief, ref_ids, setting=setting_brief)
+            if not scene_image_id and ref_data.get('cached'):
+                # First use of cached uploads failed - they may have expired on Flow's side
+                print("    Scene image failed with cached reference uploads, re-uploading and retrying...")
+                _invalidate_reference_images(ref_data)
+                ref_data = _flow_reference_images()
+                ref_ids = ref_data['all']
+                if ref_ids:
+                    checkpoint.save('refs', ref_data)
+                    scene_image_id, scene_url = _flow_generate_scene_image(appearance_brief, ref_ids, setting=setting_brief)
+            if scene_image_id:
+                checkpoint.save('scene', [scene_image_id, scene_url])
+            if scene_url:
+                # Save scene image for debugging/review, without holding up the clip
+                graph.add('scene_save', lambda: _save_scene_image(scene_url, slug))
+            if not scene_image_id:
+                print("    Falling back to original reference images")
+
+        # Step 4: Generate initial 8s clip (with retries)
+        print("  [Flow] Step 4: Generating initial 8s clip...")
+        clip1_id, clip1_url = None, None
+        for retry in range(FLOW_GENERATION_RETRIES):
+            if VIDEO_SEED_MODE == 'i2v' and scene_image_id:
+                # I2V mode: scene image becomes the first frame
+                clip1_id, clip1_url = _flow_generate_clip(
+                    video_prompt['initial_prompt'], start_image_id=scene_image_id
+                )
+            else:
+                # R2V mode: fixed primary body ref + face ref + scene image
+                clip_refs = [r for r in [ref_data['primary_body'], ref_data['primary_face'], scene_image_id] if r]
+                if not clip_refs:
+                    clip_refs = ref_ids[:3]  # fallback to old behavior
+                clip1_id, clip1_url = _flow_generate_clip(
+                    video_prompt['initial_prompt'], ref_ids=clip_refs
+                )
+            if clip1_id:
+                break
+            if retry < FLOW_GENERATION_RETRIES - 1:
+                print(f"    Initial clip attempt {retry + 1}/{FLOW_GENERATION_RETRIES} failed, retrying in 5s...")
+                time.sleep(5)
+        if not clip1_id:
+            print(f"  Initial clip generation failed after {FLOW_GENERATION_RETRIES} attempts")
+            return None
+        checkpoint.save('clip', [clip1_id, clip1_url])
+        print(f"    Initial clip ready: {clip1_id[:40]}...")
+
+    # Step 5: Extend 2x with continuation prompts (with retries)
+    media_ids = [clip1_id] + checkpoint.get('extensions', [])
+    extension_prompts = video_prompt.get('extension_prompts', [])[:2]
+    add_upscale(0, clip1_id)
+    if checkpoint.has('extensions_done'):
+        print(f"  [Flow] Steps 5-6: {len(media_ids) - 1} extension(s) checkpointed")
+        for i, ext_id in enumerate(media_ids[1:], start=1):
+            add_upscale(i, ext_id)
+    else:
+        for i, ext_prompt in enumerate(extension_prompts):
+            if i < len(media_ids) - 1:
+                print(f"  [Flow] Step {5 + i}: Extension {i + 1} checkpointed: {media_ids[i + 1][:40]}...")
+                add_upscale(i + 1, media_ids[i + 1])
+                continue
+            print(f"  [Flow] Step {5 + i}: Extending clip ({i + 1}/{len(extension_prompts)})...")
+            ext_id, ext_url = None, None
+            for retry in range(FLOW_GENERATION_RETRIES):
+                ext_id, ext_url = _flow_extend_clip(media_ids[-1], ext_prompt)
+                if ext_id:
+                    break
+                if retry < FLOW_GENERATION_RETRIES - 1:
+                    print(f"    Extension {i + 1} attempt {retry + 1}/{FLOW_GENERATION_RETRIES} failed, retrying in 5s...")
+                    time.sleep(5)
+            if not ext_id:
+                print(f"    Extension {i + 1} failed after {FLOW_GENERATION_RETRIES} attempts, using partial video")
+                break
+            media_ids.append(ext_id)
+            checkpoint.save('extensions', media_ids[1:])
+            print(f"    Extension {i + 1} ready: {ext_id[:40]}...")
+            add_upscale(i + 1, ext_id)
+        checkpoint.save('extensions_done', True)
+
+    # Step 8: Concatenate the upscaled clips once every upscale is in - locally
+    # (crossfades + hook text in one encode) or server-side (no fades)
+    upscale_stages = [f'upscale_{i}' for i in range(len(media_ids))]
+    local = VIDEO_CONCAT_MODE == 'local'
+    if local and len(media_ids) >= 2 and not get_capabilities().can_crossfade:
+        print("    ffmpeg with xfade not available, using server concatenation")
+        local = False
+    if len(media_ids) >= 2 and local:
+        clip_urls = [(graph.result(stage) or [None, None])[1] for stage in upscale_stages]
+        if all(clip_urls):
+            print(f"  [Flow] Step 8: Finishing {len(media_ids)} clips locally (single ffmpeg pass)...")
+            hook_filter = graph.result('hook_filter') if graph.has('hook_filter') else None
+            if _local_concatenate_with_crossfade(clip_urls, output_path, hook_filter=hook_filter):
+                if hook_filter:
+                    checkpoint.save('concat_has_hook', True)
+                return output_path
+            print("    Local finishing failed, falling back to server concatenation")
+        else:
+            print("    Some clips have no download URL, using server concatenation")
+    if len(media_ids) >= 2:
+        print(f"  [Flow] Step 8: Concatenating {len(media_ids)} clips (server) once upscaled...")
+        graph.add('concat', lambda: _flow_concatenate([graph.result(stage)[0] for stage in upscale_stages],
+                                                      output_path),
+                  requires=upscale_stages)
+        return graph.result('concat')
+
+    # Only 1 clip - download its upscaled version (or the original if the upscale failed)
+    print("  [Flow] Step 8: Downloading single upscaled clip...")
+    _, up_url = graph.result('upscale_0') or (None, None)
+    for url in (up_url, clip1_url):
+        if not url:
+            continue
+        try:
+            transport.download_to_file(url, output_path, timeout=120)
+            return output_path
+        except Exception as e:
+            print(f"    Download failed: {e}")
+    return None
+
+
 def generate_video_prompt(article_data, video_format=None, custom_script=None,
                           custom_setting=None, custom_actions=None, outfit_category=None):
     """
@@ -946,8 +960,6 @@ def generate_video_prompt(article_data, video_format=None, custom_script=None,
         print("  Error: GEMINI_API_KEY not set")
         return None
 
-    client = genai.Client(api_key=gemini_key)
-
     title = article_data.get('title', '')
     excerpt = article_data.get('excerpt', '')
     body = article_data.get('body_markdown', '')
@@ -1600,12 +1612,15 @@ Be creative within the style constraints above.
     max_retries = 3
     for attempt in range(1, max_retries + 1):
         try:
-            response = client.models.generate_content(
+            response = get_llm().generate_content(
                 model='gemini-3-flash-preview',
                 contents=prompt,
                 config={
                     'response_mime_type': 'application/json'
-                }
+                },
+                label='video prompt',
+                api_key=gemini_key,
+                cache=attempt == 1,  # a retry wants a fresh answer, not the rejected one
             )
 
             json_string = response.text.strip()
@@ -1793,7 +1808,15 @@ def generate_three_videos(article_data, custom_script=None, custom_setting=None,
 
     print(f"\n  Pre-generating prompts for {len(formats)} format(s)...")
     prompts = []
-    for fmt in formats:
+    for suffix, fmt in zip(suffixes, formats):
+        # An unfinished earlier attempt resumes with its own script (unless this run brings a custom one)
+        resumed = None
+        if not (custom_script or custom_setting or custom_actions):
+            resumed = VideoCheckpoint(slug, suffix).get('prompt')
+        if resumed:
+            print(f"    Reusing checkpointed prompt for {fmt}")
+            prompts.append(resumed)
+            continue
         category = FORMAT_CATEGORY_MAP.get(fmt, 1)
         print(f"    Generating prompt for {fmt} (outfit category {category})...")
         prompt = generate_video_prompt(article_data, video_format=fmt, custom_script=custom_script,
@@ -0,0 +1,240 @@
+"""
+Durable job queue for TikTok video generation (SQLite).
+
+run.py enqueues one job per article and returns as soon as the blog posts are
+published; video_worker.py drains the queue separately. A worker claims a job
+with a lease that it renews while the job runs. If the worker dies, the lease
+runs out and the next worker picks the job up again. Jobs that fail are retried
+until VIDEO_JOB_MAX_ATTEMPTS is reached, then left as 'failed' for inspection.
+A failed job isn't claimable again until its backoff (not_before) has passed:
+VIDEO_JOB_RETRY_DELAY seconds, doubled per attempt, so the attempts aren't
+all spent back to back against one outage (a captcha storm, Flow 5xx).
+
+complete() and fail() only update a job the caller still holds: a worker whose
+lease expired and was taken over can't overwrite the new owner's state.
+
+Job states: queued -> running -> done | failed (running -> queued on retry)
+"""
+
+import os
+import json
+import time
+import socket
+import sqlite3
+from typing import Dict, List, Optional
+
+from .config import VIDEO_QUEUE_FILE, VIDEO_JOB_LEASE, VIDEO_JOB_MAX_ATTEMPTS, VIDEO_JOB_RETRY_DELAY
+
+JOB_STATES = ('queued', 'running', 'done', 'failed')
+
+
+def worker_id() -> str:
+    """host:pid of this process, recorded on the jobs it claims."""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+class VideoQueue:
+    """Video jobs in one SQLite table. Every method opens its own connection,
+    so one queue object can be shared by worker threads."""
+
+    def __init__(self, path: str = VIDEO_QUEUE_FILE, lease: float = VIDEO_JOB_LEASE,
+                 max_attempts: int = VIDEO_JOB_MAX_ATTEMPTS, retry_delay: float = VIDEO_JOB_RETRY_DELAY):
+        self.path = path
+        self.lease = lease
+        self.max_attempts = max(1, max_attempts)
+        self.retry_delay = max(0.0, retry_delay)
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute('''
+                    CREATE TABLE IF NOT EXISTS jobs (
+                        id INTEGER PRIMARY KEY AUTOINCREMENT,
+                        slug TEXT NOT NULL,
+                        article TEXT NOT NULL,
+                        options TEXT NOT NULL,
+                        status TEXT NOT NULL DEFAULT 'queued',
+                        attempts INTEGER NOT NULL DEFAULT 0,
+                        worker TEXT,
+                        lease_until REAL,
+                        not_before REAL,
+                        result TEXT,
+                        error TEXT,
+                        created_at REAL NOT NULL,
+                        updated_at REAL NOT NULL
+                    )''')
+                columns = {row['name'] for row in conn.execute('PRAGMA table_info(jobs)')}
+                if 'not_before' not in columns:  # queue created before retry backoff
+                    conn.execute('ALTER TABLE jobs ADD COLUMN not_before REAL')
+                conn.execute('CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, id)')
+        finally:
+            conn.close()
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    @staticmethod
+    def _job(row) -> Dict:
+        job = dict(row)
+        job['article'] = json.loads(job['article'])
+        job['options'] = json.loads(job['options'])
+        job['result'] = json.loads(job['result']) if job['result'] else []
+        return job
+
+    def enqueue(self, article: Dict, **options) -> int:
+        """Queue a video job for an article; options are passed to
+        generate_three_videos. An article already queued or running is not
+        queued twice - its existing job id is returned."""
+        slug = article.get('slug', 'untitled')
+        now = time.time()
+        conn = self._connect()
+        try:
+            conn.execute('BEGIN IMMEDIATE')
+            row = conn.execute(
+                "SELECT id FROM jobs WHERE slug = ? AND status IN ('queued', 'running')", (slug,)
+            ).fetchone()
+            if row:
+                conn.execute('COMMIT')
+                return row['id']
+            cursor = conn.execute(
+                'INSERT INTO jobs (slug, article, options, created_at, updated_at) VALUES (?, ?, ?, ?, ?)',
+                (slug, json.dumps(article, default=str), json.dumps(options), now, now)
+            )
+            conn.execute('COMMIT')
+            return cursor.lastrowid
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        finally:
+            conn.close()
+
+    def claim(self, worker: Optional[str] = None) -> Optional[Dict]:
+        """Lease the oldest runnable job: queued (and past its retry backoff), or
+        running with an expired lease (its worker crashed). Returns the job, or
+        None if there is none."""
+        now = time.time()
+        conn = self._connect()
+        try:
+            conn.execute('BEGIN IMMEDIATE')
+            row = conn.execute(
+                "SELECT * FROM jobs WHERE (status = 'queued' AND (not_before IS NULL OR not_before <= ?)) "
+                "OR (status = 'running' AND lease_until < ?) ORDER BY id LIMIT 1", (now, now)
+            ).fetchone()
+            if row is None:
+                conn.execute('COMMIT')
+                return None
+            if row['status'] == 'running':
+                print(f"  Video job {row['id']} ({row['slug']}): lease held by {row['worker']} expired, resuming")
+                if row['attempts'] >= self.max_attempts:
+                    conn.execute(
+                        "UPDATE jobs SET status = 'failed', error = ?, lease_until = NULL, updated_at = ? WHERE id = ?",
+                        (f"worker {row['worker']} stopped on the last attempt", now, row['id'])
+                    )
+                    conn.execute('COMMIT')
+                    return self.claim(worker)
+            conn.execute(
+                "UPDATE jobs SET status = 'running', attempts = attempts + 1, worker = ?, "
+                "lease_until = ?, not_before = NULL, updated_at = ? WHERE id = ?",
+                (worker or worker_id(), now + self.lease, now, row['id'])
+            )
+            conn.execute('COMMIT')
+            row = conn.execute('SELECT * FROM jobs WHERE id = ?', (row['id'],)).fetchone()
+            return self._job(row)
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        finally:
+            conn.close()
+
+    def _execute(self, sql: str, params: tuple) -> int:
+        """Run one statement in autocommit mode; returns the rows changed."""
+        conn = self._connect()
+        try:
+            return conn.execute(sql, params).rowcount
+        finally:
+            conn.close()
+
+    def renew(self, job_id: int, worker: Optional[str] = None) -> bool:
+        """Extend a running job's lease. False if the job is no longer ours."""
+        now = time.time()
+        return self._execute(
+            "UPDATE jobs SET lease_until = ?, updated_at = ? WHERE id = ? AND status = 'running' AND worker = ?",
+            (now + self.lease, now, job_id, worker or worker_id())
+        ) > 0
+
+    def complete(self, job_id: int, paths: List[str], worker: Optional[str] = None) -> bool:
+        """Mark a job done. False if the job is no longer ours (nothing is changed)."""
+        return self._execute(
+            "UPDATE jobs SET status = 'done', result = ?, error = NULL, lease_until = NULL, updated_at = ? "
+            "WHERE id = ? AND status = 'running' AND worker = ?",
+            (json.dumps(paths), time.time(), job_id, worker or worker_id())
+        ) > 0
+
+    def fail(self, job_id: int, error: str, worker: Optional[str] = None) -> Optional[str]:
+        """Record a failed attempt. The job goes back to 'queued' with a retry
+        backoff while it has attempts left, otherwise to 'failed'. Returns the
+        new status, or None if the job is no longer ours (nothing is changed)."""
+        now = time.time()
+        conn = self._connect()
+        try:
+            conn.execute('BEGIN IMMEDIATE')
+            row = conn.execute(
+                "SELECT attempts FROM jobs WHERE id = ? AND status = 'running' AND worker = ?",
+                (job_id, worker or worker_id())
+            ).fetchone()
+            if row is None:
+                conn.execute('COMMIT')
+                return None
+            if row['attempts'] < self.max_attempts:
+                status, not_before = 'queued', now + self.retry_delay * 2 ** (row['attempts'] - 1)
+            else:
+                status, not_before = 'failed', None
+            conn.execute(
+                'UPDATE jobs SET status = ?, error = ?, lease_until = NULL, not_before = ?, updated_at = ? WHERE id = ?',
+                (status, error[:1000], not_before, now, job_id)
+            )
+            conn.execute('COMMIT')
+            return status
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        finally:
+            conn.close()
+
+    def retry_failed(self) -> int:
+        """Put every failed job back in the queue with a fresh attempt count."""
+        return self._execute(
+            "UPDATE jobs SET status = 'queued', attempts = 0, not_before = NULL, updated_at = ? WHERE status = 'failed'",
+            (time.time(),)
+        )
+
+    def next_retry_at(self) -> Optional[float]:
+        """When the earliest queued job still in its retry backoff becomes
+        claimable (None if no job is waiting)."""
+        conn = self._connect()
+        try:
+            row = conn.execute("SELECT MIN(not_before) FROM jobs WHERE status = 'queued'").fetchone()
+        finally:
+            conn.close()
+        return row[0]
+
+    def counts(self) -> Dict[str, int]:
+        """Number of jobs in each state."""
+        counts = {state: 0 for state in JOB_STATES}
+        conn = self._connect()
+        try:
+            for status, count in conn.execute('SELECT status, COUNT(*) FROM jobs GROUP BY status'):
+                counts[status] = count
+        finally:
+            conn.close()
+        return counts
+
+    def jobs(self, limit: int = 20) -> List[Dict]:
+        """Most recent jobs, newest first."""
+        conn = self._connect()
+        try:
+            rows = conn.execute('SELECT * FROM jobs ORDER BY id DESC LIMIT ?', (limit,)).fetchall()
+        finally:
+            conn.close()
+        return [self._job(row) for row in rows]
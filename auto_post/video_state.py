@@ -0,0 +1,97 @@
+"""
+Per-video checkpoints for the Flow pipeline.
+
+generate_tiktok_video_flow records each stage's output (script, reference
+uploads, scene image, clip, extensions, upscales, concatenated video) in
+videos/.state/<slug><variant>.json as soon as the stage completes. A rerun for
+the same slug and variant - a video worker retry, or a rerun after a crash -
+continues from the last completed stage, without generating and paying for
+the earlier Flow media again.
+
+Checkpoints older than VIDEO_STATE_MAX_AGE hours are discarded, because
+Flow media IDs don't stay valid indefinitely.
+"""
+
+import os
+import json
+import time
+import threading
+from typing import Any, Dict
+
+from .config import VIDEO_STATE_DIR, VIDEO_STATE_MAX_AGE
+from .utils import write_json_atomic
+
+
+class VideoCheckpoint:
+    """Stage outputs for one video variant, written atomically after each stage."""
+
+    def __init__(self, slug: str, variant_suffix: str = '', state_dir: str = VIDEO_STATE_DIR):
+        self.key = f"{slug}{variant_suffix}"
+        self.state_dir = state_dir
+        self.path = os.path.join(state_dir, f"{self.key}.json")
+        # Not .mp4, so the Drive upload (--include "*.mp4") skips it
+        self.concat_path = os.path.join(state_dir, f"{self.key}.concat.part")
+        self._lock = threading.RLock()  # stages can finish on different threads
+        self.data = self._load()
+
+    def _load(self) -> Dict:
+        if not os.path.exists(self.path):
+            return {}
+        try:
+            with open(self.path, 'r') as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"    Checkpoint {self.key} unreadable, starting over ({e})")
+            return {}
+        age_hours = (time.time() - data.get('created_at', 0)) / 3600
+        if age_hours > VIDEO_STATE_MAX_AGE:
+            print(f"    Checkpoint {self.key} is {age_hours:.0f}h old, starting over")
+            self.clear()
+            return {}
+        return data
+
+    def stages(self):
+        """Names of the completed stages, in the order they were recorded."""
+        return [stage for stage in self.data if stage not in ('created_at', 'updated_at')]
+
+    def has(self, stage: str) -> bool:
+        return stage in self.data
+
+    def get(self, stage: str, default: Any = None) -> Any:
+        return self.data.get(stage, default)
+
+    def save(self, stage: str, value: Any) -> None:
+        """Record a stage's output and write the checkpoint (temp file + rename).
+        A failed write only costs the resume, never the video."""
+        with self._lock:
+            now = time.time()
+            self.data.setdefault('created_at', now)
+            self.data[stage] = value
+            self.data['updated_at'] = now
+            try:
+                os.makedirs(self.state_dir, exist_ok=True)
+                write_json_atomic(self.path, self.data, indent=2)
+            except OSError as e:
+                print(f"    Warning: could not write checkpoint {self.key}: {e}")
+
+    def save_item(self, stage: str, key: str, value: Any) -> None:
+        """Record one entry of a dict-valued stage (e.g. one clip's upscale)."""
+        with self._lock:
+            items = dict(self.data.get(stage, {}))
+            items[key] = value
+            self.save(stage, items)
+
+    def concat_file(self):
+        """Path of the checkpointed concatenated video (written by the pipeline
+        to concat_path), or None if there isn't one."""
+        path = self.get('concat')
+        if path and os.path.exists(path):
+            return path
+        return None
+
+    def clear(self) -> None:
+        """Forget every stage (and delete the concatenated video)."""
+        for path in (self.path, self.concat_path):
+            if os.path.exists(path):
+                os.remove(path)
+        self.data = {}
@@ -2,15 +2,19 @@
 """
 Backfill existing Sanity blog posts with landing page (calculator/state) links.
 
+Gemini suggestions are computed for all posts in concurrent batches, then
+applied; progress is checkpointed (see auto_post/bulk.py), so an interrupted
+run resumes where it stopped and --apply reuses a dry run's suggestions.
+
 Usage:
     python backfill_landing_links.py          # Dry run - preview changes
     python backfill_landing_links.py --apply  # Actually update Sanity
+    python backfill_landing_links.py --fresh  # Ignore the checkpoint and start over
 """
 
 import os
 import sys
 import json
-import time
 import uuid
 import re
 from pathlib import Path
@@ -26,13 +30,16 @@ if env_file.exists():
                 os.environ.setdefault(key.strip(), value.strip().strip('"').strip("'"))
 
 import requests
-from google import genai
 
 from auto_post.config import (
-    GEMINI_API_KEY, SANITY_PROJECT_ID, SANITY_TOKEN, SANITY_DATASET,
-    SANITY_QUERY_URL, SANITY_HEADERS, CALCULATOR_SLUGS, STATE_SLUGS,
+    GEMINI_API_KEY, SANITY_PROJECT_ID, SANITY_TOKEN,
+    SANITY_QUERY_URL, CALCULATOR_SLUGS, STATE_SLUGS,
 )
 from auto_post.content import build_landing_page_database
+from auto_post import transport
+from auto_post.llm import get_llm
+from auto_post.bulk import BulkRunner, input_key
+from auto_post.mutations import patch_mutation
 
 
 def generate_key():
@@ -43,7 +50,7 @@ def fetch_all_posts():
     """Fetch all blog posts from Sanity with body content."""
     query = '*[_type == "blogPost"] | order(publishedAt desc) {_id, title, "slug": slug.current, categories, excerpt, body}'
     encoded = requests.utils.quote(query)
-    resp = requests.get(
+    resp = transport.get(
         f"{SANITY_QUERY_URL}?query={encoded}",
         headers={'Authorization': f"Bearer {SANITY_TOKEN}"},
         timeout=60,
@@ -86,7 +93,7 @@ def body_already_has_calculator_link(body):
     return False
 
 
-def ask_gemini_for_links(client, plain_text, title, categories, landing_db):
+def ask_gemini_for_links(plain_text, title, categories, landing_db):
     """Ask Gemini to identify 1-2 calculator links to add to an existing article."""
     prompt = f"""You are an SEO specialist. Given an existing blog post, identify 1-2 places to naturally insert links to calculator landing pages.
 
@@ -117,10 +124,11 @@ Return a JSON array with 1-2 objects:
 
 CRITICAL: anchor_text must be an EXACT match to text already in the article. Return ONLY the JSON, nothing else."""
 
-    response = client.models.generate_content(
+    response = get_llm().generate_content(
         model='gemini-2.5-flash',
         contents=prompt,
         config={'response_mime_type': 'application/json'},
+        label='landing links',
     )
     text = response.text.strip()
     if text.startswith('```'):
@@ -192,61 +200,36 @@ def insert_link_in_body(body, anchor_text, url):
     return False
 
 
-def patch_sanity_body(doc_id, body):
-    """PATCH a Sanity document's body field."""
-    url = f"https://{SANITY_PROJECT_ID}.api.sanity.io/v2021-06-07/data/mutate/{SANITY_DATASET}"
-    payload = {
-        "mutations": [{
-            "patch": {
-                "id": doc_id,
-                "set": {"body": body}
-            }
-        }]
-    }
-    resp = requests.post(url, headers=SANITY_HEADERS, json=payload, timeout=30)
-    resp.raise_for_status()
-    return True
-
-
-def backfill_post(post, landing_db, client, dry_run=True):
-    """Process one post: determine links, insert them, optionally patch Sanity."""
-    title = post.get('title', 'Untitled')
-    doc_id = post.get('_id', '')
+def suggest_links(post, landing_db):
+    """Compute phase for one post: ask Gemini for calculator links.
+    Returns {'links': [...]} or {'skip': reason}; raises on Gemini errors
+    (the post is retried on the next run)."""
     body = post.get('body', [])
-
     if not body:
-        print(f"  SKIP (no body): {title[:60]}")
-        return False
-
+        return {'skip': 'no body'}
     if body_already_has_calculator_link(body):
-        print(f"  SKIP (already has calculator link): {title[:60]}")
-        return False
-
+        return {'skip': 'already has calculator link'}
     plain_text = portable_text_to_plain(body)
     if len(plain_text) < 100:
-        print(f"  SKIP (too short): {title[:60]}")
-        return False
-
-    # Ask Gemini for link suggestions
-    try:
-        links = ask_gemini_for_links(
-            client, plain_text, title,
-            post.get('categories', []), landing_db,
-        )
-    except Exception as e:
-        print(f"  ERROR (Gemini): {title[:60]} - {e}")
-        return False
+        return {'skip': 'too short'}
 
+    links = ask_gemini_for_links(
+        plain_text, post.get('title', 'Untitled'),
+        post.get('categories', []), landing_db,
+    )
     if not links:
-        print(f"  SKIP (no links suggested): {title[:60]}")
-        return False
+        return {'skip': 'no links suggested'}
+    return {'links': links[:2]}
+
 
-    # Make a deep copy of body for modification
+def insert_suggested_links(post, suggestion):
+    """Insert the suggested links into a copy of the post body.
+    Returns (modified_body, inserted_count)."""
     import copy
-    modified_body = copy.deepcopy(body)
+    modified_body = copy.deepcopy(post.get('body', []))
 
     inserted = 0
-    for link in links[:2]:
+    for link in suggestion.get('links', []):
         anchor = link.get('anchor_text', '')
         url = link.get('url', '')
         if not anchor or not url:
@@ -256,22 +239,7 @@ def backfill_post(post, landing_db, client, dry_run=True):
             print(f"  + [{anchor}]({url})")
         else:
             print(f"  ~ anchor not found: \"{anchor}\"")
-
-    if inserted == 0:
-        print(f"  SKIP (no anchors matched): {title[:60]}")
-        return False
-
-    if dry_run:
-        print(f"  DRY RUN: Would update {title[:60]} ({inserted} links)")
-        return True
-    else:
-        try:
-            patch_sanity_body(doc_id, modified_body)
-            print(f"  UPDATED: {title[:60]} ({inserted} links)")
-            return True
-        except Exception as e:
-            print(f"  ERROR (patch): {title[:60]} - {e}")
-            return False
+    return modified_body, inserted
 
 
 def main():
@@ -285,31 +253,59 @@ def main():
         print("Error: Missing required env vars (GEMINI_API_KEY, SANITY_PROJECT_ID, SANITY_TOKEN)")
         sys.exit(1)
 
-    client = genai.Client(api_key=GEMINI_API_KEY)
     landing_db = build_landing_page_database()
 
     print("Fetching all blog posts from Sanity...")
     posts = fetch_all_posts()
     print(f"Found {len(posts)} posts.\n")
 
-    updated = 0
+    # Phase 1: Gemini suggestions for every post, in concurrent checkpointed batches
+    runner = BulkRunner('backfill_landing_links', fresh='--fresh' in sys.argv)
+
+    def post_key(post):
+        # Everything suggest_links() reads, so an edited post is asked about again
+        return input_key(post['_id'], post.get('title'), post.get('categories'), post.get('body'))
+
+    suggestions = runner.compute(posts, key=post_key,
+                                 work=lambda post: suggest_links(post, landing_db))
+
+    # Phase 2: insert the links and write them back
+    to_update = []
     skipped = 0
-    errors = 0
-
-    for i, post in enumerate(posts, 1):
-        print(f"[{i}/{len(posts)}] {post.get('title', 'Untitled')[:60]}")
-        result = backfill_post(post, landing_db, client, dry_run=dry_run)
-        if result:
-            updated += 1
-        elif result is False:
+    for post in posts:
+        title = post.get('title', 'Untitled')
+        suggestion = suggestions.get(post_key(post))
+        if suggestion is None:
+            print(f"  ERROR (Gemini): {title[:60]} - will retry on the next run")
+            continue
+        if 'skip' in suggestion:
+            print(f"  SKIP ({suggestion['skip']}): {title[:60]}")
             skipped += 1
+            continue
+        print(f"{title[:60]}")
+        modified_body, inserted = insert_suggested_links(post, suggestion)
+        if inserted == 0:
+            print(f"  SKIP (no anchors matched): {title[:60]}")
+            skipped += 1
+            continue
+        if dry_run:
+            print(f"  DRY RUN: Would update {title[:60]} ({inserted} links)")
+        to_update.append((post, modified_body, inserted))
 
-        # Rate limit Gemini calls
-        time.sleep(1)
-
-    print(f"\nDone. Updated: {updated}, Skipped: {skipped}")
     if dry_run:
-        print("(Dry run - no actual changes made. Use --apply to write changes.)")
+        print(f"\nDone. Would update: {len(to_update)}, Skipped: {skipped}")
+        print("(Dry run - no actual changes made. Use --apply to write changes; "
+              "Gemini results are checkpointed and reused.)")
+        print(get_llm().report())
+        return
+
+    updated, _, failed = runner.apply_mutations(
+        to_update, key=lambda entry: post_key(entry[0]),
+        mutation=lambda entry: patch_mutation(entry[0]['_id'], {'body': entry[1]}),
+        label=lambda entry: entry[0].get('title', 'Untitled'),
+    )
+    print(f"\nDone. Updated: {updated}, Skipped: {skipped}, Failed: {failed}")
+    print(get_llm().report())
 
 
 if __name__ == '__main__':
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Benchmark the scraper parsing backends against saved HTML fixtures.
+
+Runs every scraper over fixtures/html/<scraper>.html with each backend
+(html.parser, lxml, strainer), reports the mean parse+extract time and
+checks that each backend returns the same items as html.parser.
+
+The committed fixtures are small hand-written pages shaped like each
+source's markup (two with unclosed tags), so the benchmark runs offline;
+--save replaces them with the live pages.
+
+Usage:
+    python benchmark_parsers.py                 # benchmark existing fixtures
+    python benchmark_parsers.py --save          # (re)download fixtures for all sources first
+    python benchmark_parsers.py --runs 20 cnn   # more runs, selected scrapers only
+"""
+
+import io
+import os
+import sys
+import time
+import argparse
+from contextlib import redirect_stdout
+
+import requests
+
+from auto_post import transport
+from auto_post.config import NEWS_SOURCES, REQUEST_HEADERS
+from auto_post.parsing import PARSER_BACKENDS, HAVE_LXML, get_parser_backend, set_parser_backend
+from auto_post.scrapers import SCRAPERS, prefetched
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'html')
+
+
+def fixture_path(scraper_name):
+    return os.path.join(FIXTURES_DIR, f"{scraper_name}.html")
+
+
+def save_fixtures(sources):
+    """Download each source's page into the fixtures directory."""
+    os.makedirs(FIXTURES_DIR, exist_ok=True)
+    for source in sources:
+        try:
+            response = transport.get(source['url'], headers=REQUEST_HEADERS, timeout=30)
+            response.raise_for_status()
+        except Exception as e:
+            print(f"  {source['scraper']}: download failed ({e})")
+            continue
+        with open(fixture_path(source['scraper']), 'wb') as f:
+            f.write(response.content)
+        print(f"  {source['scraper']}: saved {len(response.content) / 1024:.0f} KB")
+
+
+def fake_response(url, content):
+    """A requests.Response carrying a saved page, as fetch_page would return it."""
+    response = requests.Response()
+    response.status_code = 200
+    response.url = url
+    response._content = content
+    response.encoding = 'utf-8'
+    return response
+
+
+def run_scraper(scraper_func, url, content):
+    with prefetched(url, fake_response(url, content)), redirect_stdout(io.StringIO()):
+        return scraper_func(url)
+
+
+def benchmark_source(source, runs):
+    """Mean seconds and items per backend for one source's fixture."""
+    with open(fixture_path(source['scraper']), 'rb') as f:
+        content = f.read()
+
+    scraper_func = SCRAPERS[source['scraper']]
+    results = {}
+    for backend in PARSER_BACKENDS:
+        set_parser_backend(backend)
+        items = run_scraper(scraper_func, source['url'], content)  # warm-up
+        start = time.perf_counter()
+        for _ in range(runs):
+            run_scraper(scraper_func, source['url'], content)
+        results[backend] = ((time.perf_counter() - start) / runs, items)
+    return len(content), results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('scrapers', nargs='*', help='Scraper names to benchmark (default: all)')
+    parser.add_argument('--runs', type=int, default=5, help='Timed runs per backend (default: 5)')
+    parser.add_argument('--save', action='store_true', help='Download fresh fixtures before benchmarking')
+    args = parser.parse_args()
+
+    sources = [s for s in NEWS_SOURCES if s['scraper'] in SCRAPERS]
+    if args.scrapers:
+        sources = [s for s in sources if s['scraper'] in args.scrapers]
+
+    if args.save:
+        print(f"Saving fixtures to {FIXTURES_DIR}...")
+        save_fixtures(sources)
+
+    if not HAVE_LXML:
+        print("Note: lxml is not installed - the lxml and strainer backends fall back to html.parser")
+
+    original_backend = get_parser_backend()
+    header = f"{'scraper':<18}{'size':>8}" + ''.join(f"{b:>14}" for b in PARSER_BACKENDS) + f"{'speedup':>10}  match"
+    print(f"\n{header}\n{'-' * len(header)}")
+
+    totals = dict.fromkeys(PARSER_BACKENDS, 0.0)
+    missing = []
+    try:
+        for source in sources:
+            if not os.path.exists(fixture_path(source['scraper'])):
+                missing.append(source['scraper'])
+                continue
+            size, results = benchmark_source(source, args.runs)
+            baseline_time, baseline_items = results['html.parser']
+            best_time = min(seconds for seconds, _ in results.values())
+            mismatched = [b for b, (_, items) in results.items() if items != baseline_items]
+            for backend, (seconds, _) in results.items():
+                totals[backend] += seconds
+            print(f"{source['scraper']:<18}{size / 1024:>6.0f}KB"
+                  + ''.join(f"{results[b][0] * 1000:>12.1f}ms" for b in PARSER_BACKENDS)
+                  + f"{baseline_time / best_time:>9.1f}x  "
+                  + (f"DIFF ({', '.join(mismatched)})" if mismatched else f"ok ({len(baseline_items)} items)"))
+    finally:
+        set_parser_backend(original_backend)
+
+    if totals['html.parser']:
+        print(f"{'-' * len(header)}\n{'total':<26}"
+              + ''.join(f"{totals[b] * 1000:>12.1f}ms" for b in PARSER_BACKENDS))
+    if missing:
+        print(f"\nNo fixture for: {', '.join(missing)} (run with --save to download)")
+    if not totals['html.parser'] and not missing:
+        print("No sources selected.")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
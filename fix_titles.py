@@ -3,25 +3,33 @@
 Fix long blog post titles in Sanity CMS.
 
 This script queries Sanity for blog posts with titles exceeding 60 characters,
-uses Gemini AI to generate shorter versions, and updates them via the Sanity API.
+uses Gemini AI to generate shorter versions, and updates them via the Sanity API in batched transactions.
+
+New titles are generated in concurrent batches and checkpointed (see
+auto_post/bulk.py): an interrupted run resumes where it stopped, and
+--apply reuses the titles a dry run proposed. A title Gemini fails to
+shorten is left out (and retried next run) unless --truncate is given.
 
 Usage:
     python fix_titles.py              # Dry run (preview changes only)
     python fix_titles.py --apply      # Apply changes to Sanity
+    python fix_titles.py --fresh      # Ignore the checkpoint and start over
+    python fix_titles.py --truncate   # Cut titles Gemini can't shorten to length with "..."
 """
 
 import argparse
 import sys
-import time
 
 import requests
-from google import genai
 
 from auto_post.config import (
     SANITY_PROJECT_ID, SANITY_TOKEN, SANITY_DATASET,
-    SANITY_BASE_URL, SANITY_QUERY_URL, SANITY_HEADERS,
-    GEMINI_API_KEY
+    SANITY_QUERY_URL, GEMINI_API_KEY, BULK_WORKERS
 )
+from auto_post import transport
+from auto_post.llm import get_llm
+from auto_post.bulk import BulkRunner, input_key
+from auto_post.mutations import patch_mutation
 
 MAX_TITLE_LENGTH = 60
 
@@ -39,7 +47,7 @@ def get_all_posts():
     encoded_query = requests.utils.quote(query)
 
     try:
-        response = requests.get(
+        response = transport.get(
             f"{SANITY_QUERY_URL}?query={encoded_query}",
             headers={'Authorization': f"Bearer {SANITY_TOKEN}"} if SANITY_TOKEN else {},
             timeout=30
@@ -64,15 +72,24 @@ def get_posts_with_long_titles(posts):
     return long_titles
 
 
-def shorten_title(original_title):
-    """Use Gemini AI to generate a shorter version of the title."""
+def truncate_title(title):
+    """Cut a title to MAX_TITLE_LENGTH with a trailing '...'."""
+    return title[:MAX_TITLE_LENGTH - 3] + '...'
+
+
+def shorten_title(original_title, truncate=False):
+    """Use Gemini AI to generate a shorter version of the title.
+
+    Returns None when Gemini can't produce one (so the post is retried next
+    run), or the truncated title if truncate is set."""
     if not GEMINI_API_KEY:
-        print("  Warning: GEMINI_API_KEY not set, truncating instead")
-        return original_title[:MAX_TITLE_LENGTH - 3] + '...'
+        if truncate:
+            print("  Warning: GEMINI_API_KEY not set, truncating instead")
+            return truncate_title(original_title)
+        print("  Warning: GEMINI_API_KEY not set, skipping")
+        return None
 
     try:
-        client = genai.Client(api_key=GEMINI_API_KEY)
-
         prompt = f"""Rewrite this blog post title to be {MAX_TITLE_LENGTH} characters or less while keeping the key message and SEO value.
 
 Original title ({len(original_title)} chars): {original_title}
@@ -86,9 +103,10 @@ Requirements:
 
 Return ONLY the new title, nothing else."""
 
-        response = client.models.generate_content(
+        response = get_llm().generate_content(
             model='gemini-2.0-flash',
-            contents=prompt
+            contents=prompt,
+            label='shorten title',
         )
 
         new_title = response.text.strip().strip('"\'')
@@ -102,64 +120,34 @@ Return ONLY the new title, nothing else."""
 Current ({len(new_title)} chars): {new_title}
 Return ONLY the shortened title."""
 
-            response2 = client.models.generate_content(
+            response2 = get_llm().generate_content(
                 model='gemini-2.0-flash',
-                contents=prompt2
+                contents=prompt2,
+                label='shorten title (retry)',
             )
             final_title = response2.text.strip().strip('"\'')
 
             if len(final_title) <= MAX_TITLE_LENGTH:
                 return final_title
-            else:
+            elif truncate:
                 # Last resort: truncate
-                return final_title[:MAX_TITLE_LENGTH - 3] + '...'
+                return truncate_title(final_title)
+            else:
+                print(f"  Still {len(final_title)} chars after retry, skipping: {original_title}")
+                return None
 
     except Exception as e:
         print(f"  Error with AI shortening: {e}")
-        return original_title[:MAX_TITLE_LENGTH - 3] + '...'
-
-
-def update_post_title(post_id, new_title):
-    """Update the title of a post in Sanity using patch mutation."""
-    if not all([SANITY_PROJECT_ID, SANITY_TOKEN, SANITY_DATASET]):
-        print("  Error: Missing Sanity configuration")
-        return False
-
-    payload = {
-        "mutations": [
-            {
-                "patch": {
-                    "id": post_id,
-                    "set": {
-                        "title": new_title
-                    }
-                }
-            }
-        ]
-    }
-
-    try:
-        response = requests.post(
-            SANITY_BASE_URL,
-            headers=SANITY_HEADERS,
-            json=payload,
-            timeout=30
-        )
-
-        if response.status_code == 200:
-            return True
-        else:
-            print(f"  Error updating: {response.status_code} - {response.text}")
-            return False
-
-    except requests.RequestException as e:
-        print(f"  Request error: {e}")
-        return False
+        return truncate_title(original_title) if truncate else None
 
 
 def main():
     parser = argparse.ArgumentParser(description='Fix long blog post titles in Sanity CMS')
     parser.add_argument('--apply', action='store_true', help='Apply changes (default is dry-run)')
+    parser.add_argument('--fresh', action='store_true', help='Ignore the checkpoint of an earlier run')
+    parser.add_argument('--workers', type=int, default=BULK_WORKERS, help='Concurrent Gemini calls')
+    parser.add_argument('--truncate', action='store_true',
+                        help="Truncate titles Gemini can't shorten instead of retrying them next run")
     args = parser.parse_args()
 
     dry_run = not args.apply
@@ -193,32 +181,41 @@ def main():
     print("PROPOSED TITLE CHANGES")
     print("=" * 60)
 
-    changes = []
-    for i, post in enumerate(long_title_posts, 1):
-        post_id = post.get('_id')
-        original_title = post.get('title', '')
-        slug = post.get('slug', '')
+    runner = BulkRunner('fix_titles', workers=args.workers, fresh=args.fresh)
 
-        print(f"\n[{i}/{len(long_title_posts)}] {slug}")
+    def show(post, new_title):
+        original_title = post.get('title', '')
+        print(f"\n{post.get('slug', '')}")
         print(f"  Original ({len(original_title)} chars): {original_title}")
-
-        new_title = shorten_title(original_title)
         print(f"  New      ({len(new_title)} chars): {new_title}")
 
-        changes.append({
-            'id': post_id,
-            'slug': slug,
-            'original': original_title,
-            'new': new_title
-        })
+    def title_key(post):
+        return input_key(post['_id'], post.get('title', ''))
+
+    new_titles = runner.compute(long_title_posts, key=title_key,
+                                work=lambda post: shorten_title(post.get('title', ''), truncate=args.truncate),
+                                on_result=show)
 
-        # Small delay to avoid rate limiting
-        time.sleep(0.5)
+    changes = [
+        {
+            'id': post['_id'],
+            'key': title_key(post),
+            'slug': post.get('slug', ''),
+            'original': post.get('title', ''),
+            'new': new_titles[title_key(post)]
+        }
+        for post in long_title_posts if title_key(post) in new_titles
+    ]
 
     print()
     print("=" * 60)
     print(f"SUMMARY: {len(changes)} titles to update")
     print("=" * 60)
+    unshortened = len(long_title_posts) - len(changes)
+    if unshortened:
+        print(f"{unshortened} title(s) could not be shortened; they will be retried next run "
+              f"(or pass --truncate)")
+    print(get_llm().report())
 
     if dry_run:
         print("\nThis was a dry run. To apply these changes, run:")
@@ -226,19 +223,17 @@ def main():
         return
 
     # Apply changes
+    if not all([SANITY_PROJECT_ID, SANITY_TOKEN, SANITY_DATASET]):
+        print("Error: Missing Sanity configuration")
+        return
+
     print("\nApplying changes...")
-    success_count = 0
-    fail_count = 0
-
-    for change in changes:
-        print(f"  Updating: {change['slug'][:40]}...", end=" ")
-        if update_post_title(change['id'], change['new']):
-            print("OK")
-            success_count += 1
-        else:
-            print("FAILED")
-            fail_count += 1
-        time.sleep(0.5)  # Rate limiting
+
+    success_count, _, fail_count = runner.apply_mutations(
+        changes, key=lambda change: change['key'],
+        mutation=lambda change: patch_mutation(change['id'], {'title': change['new']}),
+        label=lambda change: change['slug'],
+    )
 
     print()
     print("=" * 60)
@@ -16,7 +16,6 @@ Optional:
     DEFAULT_AUTHOR - Author name for posts (default: Case Value Expert)
 """
 
-import time
 from datetime import datetime, timezone
 
 from auto_post import (
@@ -25,17 +24,59 @@ from auto_post import (
     generate_article,
     generate_article_from_title,
     get_existing_posts,
-    post_to_sanity,
     load_title_list,
     save_title_list,
     load_used_topics,
     add_used_topic,
-    generate_three_videos,
 )
 from auto_post.content import build_landing_page_database
+from auto_post.sanity import prepare_featured_image, build_post_document, create_post
+from auto_post.pipeline import StagedPipeline
+from auto_post.dedupe import load_topic_index, save_topic_index, filter_near_duplicates
+from auto_post.video_queue import VideoQueue
+from auto_post.llm import get_llm
 from auto_post.config import GEMINI_API_KEY, SANITY_PROJECT_ID, SANITY_TOKEN, ENABLE_VIDEO_GENERATION
 
 
+def _stage_generate(job):
+    """Text generation (Gemini)."""
+    print(f"\n--- Generating: {job['label']} ---")
+    job['article'] = job['generate']()
+    return bool(job['article'])
+
+
+def _stage_image(job):
+    """Featured image: Imagen generation, text check, Sanity upload. Never fails the job."""
+    job['main_image'] = prepare_featured_image(job['article'])
+    return True
+
+
+def _stage_publish(job):
+    """Document creation in Sanity."""
+    print(f"\n--- Posting to Sanity: {job['article'].get('title', 'Untitled')} ---")
+    return create_post(build_post_document(job['article'], job.get('main_image')))
+
+
+ARTICLE_STAGES = [
+    ('generate', _stage_generate),
+    ('image', _stage_image),
+    ('publish', _stage_publish),
+]
+
+
+def print_article_summary(article):
+    """Display generated content summary."""
+    print(f"\n  Generated Content:")
+    print(f"  - Title: {article.get('title', 'N/A')}")
+    print(f"  - Slug: {article.get('slug', 'N/A')}")
+    print(f"  - Meta Title ({len(article.get('meta_title', ''))} chars): {article.get('meta_title', 'N/A')}")
+    print(f"  - Excerpt ({len(article.get('excerpt', ''))} chars): {article.get('excerpt', 'N/A')[:80]}...")
+    print(f"  - Categories: {', '.join(article.get('categories', []))}")
+    print(f"  - Keywords: {', '.join(article.get('keywords', []))}")
+    if article.get('alt_text'):
+        print(f"  - Alt Text: {article['alt_text'][:60]}...")
+
+
 def main():
     """Main execution flow."""
     print("=" * 60)
@@ -95,6 +136,17 @@ def main():
     used_topics = load_used_topics()
     print(f"Loaded {len(used_topics)} previously covered topics to avoid duplicates")
 
+    # Drop headlines already covered (or repeated across sources) before any LLM call
+    topic_index = load_topic_index(used_topics)
+    all_news, duplicates = filter_near_duplicates(all_news, topic_index)
+    if duplicates:
+        print(f"Skipped {len(duplicates)} near-duplicate items:")
+        for item in duplicates:
+            print(f"  - {item['title'][:50]}... ~ {item['duplicate_of'][:50]}...")
+    if not all_news:
+        print("Every scraped item duplicates an already covered topic. Exiting.")
+        return
+
     selected_articles = select_best_articles(all_news, num_articles=2, used_topics=used_topics)
 
     if not selected_articles:
@@ -112,110 +164,88 @@ def main():
     link_database = get_existing_posts()
     landing_page_database = build_landing_page_database()
 
-    # Step 4 & 5: Generate and Post Each Article
+    # Step 4-6: Generate and post every article (news + pre-defined title) as one pipeline.
+    # Articles overlap stage by stage; per-API limits live in auto_post.pipeline.
+    jobs = []
+    for i, selected_article in enumerate(selected_articles, 1):
+        jobs.append({
+            'label': f"Article {i} of {len(selected_articles)}",
+            'kind': 'news',
+            'source_item': selected_article,
+            'generate': lambda item=selected_article: generate_article(item, all_news, link_database, landing_page_database),
+        })
+
+    titles = load_title_list()
+    if titles:
+        current_title = titles[0]
+        print(f"\nPre-defined title queued: {current_title[:60]}...")
+        jobs.append({
+            'label': "Pre-defined Title Article",
+            'kind': 'title',
+            'generate': lambda: generate_article_from_title(current_title, link_database, landing_page_database),
+        })
+    else:
+        print("\nNo pre-defined titles remaining in titles.json")
+
+    print(f"\n--- Steps 4-6: Generating & Publishing {len(jobs)} Article(s) ---")
+    results = StagedPipeline(ARTICLE_STAGES).run(jobs)
+
+    # Accounting and topic tracking happen here, on the main thread, in job order
     success_count = 0
     fail_count = 0
     video_article = None  # First successful news article gets the video
 
-    for i, selected_article in enumerate(selected_articles, 1):
+    for job in results:
         print(f"\n{'='*60}")
-        print(f"  Processing Article {i} of {len(selected_articles)}")
+        print(f"  {job['label']}")
         print(f"{'='*60}")
 
-        # Step 4: Generate Article
-        print(f"\n--- Step 4.{i}: Generating Article ---")
-        generated_article = generate_article(selected_article, all_news, link_database, landing_page_database)
-
+        generated_article = job.get('article')
         if not generated_article:
-            print(f"Article {i} generation failed. Skipping.")
+            print(f"Generation failed. Skipping.")
             fail_count += 1
             continue
 
-        # Display generated content summary
-        print(f"\n  Generated Content:")
-        print(f"  - Title: {generated_article.get('title', 'N/A')}")
-        print(f"  - Slug: {generated_article.get('slug', 'N/A')}")
-        print(f"  - Meta Title ({len(generated_article.get('meta_title', ''))} chars): {generated_article.get('meta_title', 'N/A')}")
-        print(f"  - Excerpt ({len(generated_article.get('excerpt', ''))} chars): {generated_article.get('excerpt', 'N/A')[:80]}...")
-        print(f"  - Categories: {', '.join(generated_article.get('categories', []))}")
-        print(f"  - Keywords: {', '.join(generated_article.get('keywords', []))}")
-        print(f"  - Alt Text: {generated_article.get('alt_text', 'N/A')[:60]}...")
-
-        # Step 5: Post to Sanity
-        print(f"\n--- Step 5.{i}: Posting to Sanity ---")
-        success = post_to_sanity(generated_article)
-
-        if success:
-            success_count += 1
-            if video_article is None:
-                video_article = generated_article
-            # Track this topic to avoid duplicates in future runs
-            topic_summary = selected_article.get('topic_summary', selected_article.get('title', '')[:100])
-            if topic_summary:
-                add_used_topic(topic_summary)
-                print(f"  Added topic to tracking: {topic_summary[:50]}...")
-        else:
+        print_article_summary(generated_article)
+        print(f"  - Stage times: {', '.join(f'{name} {secs}s' for name, secs in job['timings'].items())}")
+
+        if not job['ok']:
+            print(f"  Publishing failed at stage '{job['failed_stage']}'")
             fail_count += 1
+            continue
 
-        # Small delay between posts
-        if i < len(selected_articles):
-            time.sleep(2)
+        success_count += 1
+        if job['kind'] == 'title':
+            # Remove the used title and save
+            titles.pop(0)
+            save_title_list(titles)
+            topic_index.add(generated_article.get('title', ''), 'title')
+            save_topic_index(topic_index)
+            continue
 
-    # Step 5.5: Generate 3 TikTok video variants for first successful news article
+        if video_article is None:
+            video_article = generated_article
+        # Track this topic to avoid duplicates in future runs
+        selected_article = job['source_item']
+        topic_summary = selected_article.get('topic_summary', selected_article.get('title', '')[:100])
+        if topic_summary:
+            add_used_topic(topic_summary)
+            print(f"  Added topic to tracking: {topic_summary[:50]}...")
+        topic_index.add(topic_summary, 'topic')
+        topic_index.add(generated_article.get('title', ''), 'title')
+        save_topic_index(topic_index)
+
+    # Step 7: Queue 3 TikTok video variants for the first successful news article
+    # (generated by video_worker.py, so publishing doesn't wait on Flow)
     if ENABLE_VIDEO_GENERATION and video_article:
-        print(f"\n{'='*60}")
-        print(f"  Generating 3 TikTok Video Variants for: {video_article.get('title', 'N/A')[:50]}")
-        print(f"{'='*60}")
         try:
-            video_paths = generate_three_videos(video_article)
-            if video_paths:
-                print(f"  Generated {len(video_paths)} TikTok videos:")
-                for path in video_paths:
-                    print(f"    - {path}")
-            else:
-                print(f"  Video generation unsuccessful (article still published)")
+            job_id = VideoQueue().enqueue(video_article)
+            print(f"\n  Queued video job {job_id} for: {video_article.get('title', 'N/A')[:50]}")
+            print(f"  Run 'python video_worker.py' to generate it")
         except Exception as e:
-            print(f"  Video generation failed: {e} (article still published)")
-
-    # Step 6: Generate article from pre-defined title list
-    print(f"\n{'='*60}")
-    print("  Processing Pre-defined Title Article")
-    print(f"{'='*60}")
-
-    titles = load_title_list()
-    if titles:
-        current_title = titles[0]
-        print(f"\n--- Step 6: Generating Article from Title ---")
-        print(f"Title: {current_title[:60]}...")
-
-        title_article = generate_article_from_title(current_title, link_database, landing_page_database)
-
-        if title_article:
-            # Display generated content summary
-            print(f"\n  Generated Content:")
-            print(f"  - Title: {title_article.get('title', 'N/A')}")
-            print(f"  - Slug: {title_article.get('slug', 'N/A')}")
-            print(f"  - Meta Title ({len(title_article.get('meta_title', ''))} chars): {title_article.get('meta_title', 'N/A')}")
-            print(f"  - Excerpt ({len(title_article.get('excerpt', ''))} chars): {title_article.get('excerpt', 'N/A')[:80]}...")
-            print(f"  - Categories: {', '.join(title_article.get('categories', []))}")
-            print(f"  - Keywords: {', '.join(title_article.get('keywords', []))}")
-
-            print(f"\n--- Posting Title Article to Sanity ---")
-            title_success = post_to_sanity(title_article)
-
-            if title_success:
-                success_count += 1
-                # Remove the used title and save
-                titles.pop(0)
-                save_title_list(titles)
-            else:
-                fail_count += 1
-        else:
-            print("Title article generation failed.")
-            fail_count += 1
-    else:
-        print("\nNo pre-defined titles remaining in titles.json")
+            print(f"\n  Could not queue video job: {e} (article still published)")
 
+    print("\n" + get_llm().report())
     print("\n" + "=" * 60)
     print(f"  COMPLETE: {success_count} blog post(s) published successfully!")
     if fail_count > 0:
@@ -0,0 +1,38 @@
+"""
+BulkRunner (bulk.py): checkpointed results follow the item's inputs.
+"""
+
+from auto_post.bulk import BulkCheckpoint, BulkRunner, input_key
+
+
+def _runner(tmp_path):
+    runner = BulkRunner('test', workers=1)
+    runner.checkpoint = BulkCheckpoint('test', state_dir=str(tmp_path))
+    return runner
+
+
+def _key(post):
+    return input_key(post['_id'], post['title'])
+
+
+def test_edited_item_is_recomputed(tmp_path):
+    calls = []
+
+    def shorten(post):
+        calls.append(post['title'])
+        return post['title'][:5]
+
+    _runner(tmp_path).compute([{'_id': 'a', 'title': 'Original title'}], key=_key, work=shorten)
+    edited = {'_id': 'a', 'title': 'Edited title'}
+    results = _runner(tmp_path).compute([edited], key=_key, work=shorten)
+
+    assert calls == ['Original title', 'Edited title']
+    assert results == {_key(edited): 'Edite'}
+
+
+def test_unchanged_item_is_restored(tmp_path):
+    calls = []
+    post = {'_id': 'a', 'title': 'Original title'}
+    for _ in range(2):
+        _runner(tmp_path).compute([post], key=_key, work=lambda item: calls.append(item) or 'new')
+    assert len(calls) == 1
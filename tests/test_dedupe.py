@@ -0,0 +1,51 @@
+"""
+Near-duplicate headline filter (dedupe.py), checked against the real
+covered-topic history in used_topics.json.
+"""
+
+import itertools
+import json
+import os
+
+from auto_post.config import DEDUPE_THRESHOLD, USED_TOPICS_FILE
+from auto_post.dedupe import (NearDuplicateIndex, filter_near_duplicates, load_topic_index,
+                              minhash, save_topic_index, signature_similarity)
+
+
+def _topics():
+    with open(USED_TOPICS_FILE) as f:
+        return json.load(f)['topics']
+
+
+def test_no_two_covered_stories_count_as_duplicates():
+    signatures = [minhash(topic) for topic in _topics()]
+    worst = max(signature_similarity(a, b) for a, b in itertools.combinations(signatures, 2))
+    assert worst < DEDUPE_THRESHOLD
+
+
+def test_syndicated_headline_is_rejected():
+    index = load_topic_index(_topics(), path='/nonexistent/index.json')
+    items = [
+        # The same wire headline from two sources
+        {'title': 'Bakery worker injured in mixer accident, OSHA opens inquiry'},
+        {'title': 'Bakery Worker Injured in Mixer Accident; OSHA Opens Inquiry'},
+        # A covered topic republished with a different lead-in
+        {'title': 'Report: Volvo electric SUV recall involving 40,000 vehicles with high-voltage battery fire risks'},
+        {'title': 'Volvo recalls 40,000 electric SUVs over high-voltage battery fire risk'},
+    ]
+    kept, rejected = filter_near_duplicates(items, index)
+    assert [item['title'] for item in rejected] == [items[1]['title'], items[2]['title']]
+    # A rephrasing of the covered Volvo topic isn't caught locally (left to selection)
+    assert [item['title'] for item in kept] == [items[0]['title'], items[3]['title']]
+
+
+def test_index_is_built_from_used_topics_and_reloaded(tmp_path):
+    path = str(tmp_path / 'used_topics_index.json')
+    index = load_topic_index(_topics()[:5], path=path)
+    assert len(index) == 5 and not os.path.exists(path)
+
+    assert save_topic_index(index, path)
+    assert os.stat(path).st_mode & 0o777 == 0o644
+    reloaded = load_topic_index(_topics()[:6], path=path)
+    assert len(reloaded) == 6
+    assert isinstance(reloaded, NearDuplicateIndex)
@@ -0,0 +1,77 @@
+"""
+Local finishing (video.py): the single-pass ffmpeg graph that trims,
+crossfades and overlays the clips. Runs the graph on tiny generated clips,
+so it needs an ffmpeg with xfade on PATH (skipped otherwise).
+"""
+
+import os
+import shutil
+import subprocess
+
+import pytest
+
+from auto_post import video
+from auto_post.encoding import get_capabilities, clip_durations, clip_frame_rates
+
+FFMPEG = shutil.which('ffmpeg')
+
+
+@pytest.mark.parametrize('count', [1, 2, 3])
+def test_filter_chains_every_clip(count):
+    graph = video._finishing_filter([8.0] * count, fps=24)
+    assert graph.count('fps=24') == count
+    assert graph.count('xfade=') == count - 1
+    assert graph.count('acrossfade=') == count - 1
+    assert graph.endswith('[a]') and '[v]' in graph
+
+
+def _make_clip(path, seconds=3, rate=24):
+    subprocess.run([
+        FFMPEG, '-hide_banner', '-loglevel', 'error', '-y',
+        '-f', 'lavfi', '-i', f'testsrc=size=64x64:rate={rate}:duration={seconds}',
+        '-f', 'lavfi', '-i', f'sine=frequency=440:duration={seconds}',
+        '-c:v', 'libx264', '-c:a', 'aac', '-shortest', path,
+    ], check=True)
+
+
+@pytest.mark.skipif(not FFMPEG, reason='ffmpeg not installed')
+@pytest.mark.parametrize('count', [1, 2, 3])
+def test_finish_video_locally(tmp_path, count):
+    if not get_capabilities().can_crossfade:
+        pytest.skip('ffmpeg without xfade/acrossfade')
+    clips = [str(tmp_path / f'clip_{i}.mp4') for i in range(count)]
+    for clip in clips:
+        _make_clip(clip)
+    # Same name pattern as the video checkpoint's concat file
+    output = str(tmp_path / 'video.concat.part')
+
+    assert video._finish_video_locally(clips, output, crossfade_duration=0.3, trim_extensions=1.0) == output
+    assert os.path.getsize(output) > 0
+    # 3s first clip, then 2s per trimmed extension, minus 0.3s per crossfade
+    expected = 3 + 2 * (count - 1) - 0.3 * (count - 1)
+    assert clip_durations([output])[0] == pytest.approx(expected, abs=0.2)
+    assert clip_frame_rates([output])[0] == 24
+
+
+def test_clip_headers_reprobe_only_changed_files(tmp_path, monkeypatch):
+    from auto_post import encoding
+
+    probed = []
+
+    def fake_probe(ffmpeg, paths):
+        probed.append(list(paths))
+        return [(float(os.path.getsize(path)), 24.0) for path in paths]
+
+    monkeypatch.setattr(encoding, '_probe_inputs', fake_probe)
+    monkeypatch.setattr(encoding, '_clip_info', {})
+    monkeypatch.setattr(encoding.get_capabilities(), 'ffmpeg', 'ffmpeg')
+    clip = tmp_path / 'clip.mp4'
+    clip.write_bytes(b'x' * 5)
+
+    assert encoding.clip_headers([str(clip)]) == [(5.0, 24.0)]
+    assert encoding.clip_headers([str(clip)]) == [(5.0, 24.0)]
+    assert len(probed) == 1
+
+    clip.write_bytes(b'x' * 7)   # a fresh download at the same path
+    assert encoding.clip_headers([str(clip)]) == [(7.0, 24.0)]
+    assert len(probed) == 2
@@ -0,0 +1,51 @@
+"""
+FlowJobPoller (flow_poller.py): bad poll responses never strand a waiter.
+"""
+
+from auto_post.flow_poller import FlowJobPoller
+
+
+class _Response:
+    status_code = 200
+
+    def __init__(self, body):
+        self._body = body
+        self.text = repr(body)
+
+    def json(self):
+        return self._body
+
+
+def _poller(**kwargs):
+    return FlowJobPoller(base_url='http://flow.test', min_interval=0.01, max_interval=0.01, **kwargs)
+
+
+def test_non_dict_response_is_a_failed_poll(monkeypatch):
+    responses = [_Response(['not', 'a', 'dict']), _Response({'status': 'completed', 'id': 'j1'})]
+    monkeypatch.setattr('auto_post.flow_poller.transport.get', lambda *a, **kw: responses.pop(0))
+
+    poller = _poller(timeout=5)
+    assert poller.wait('j1') == {'status': 'completed', 'id': 'j1'}
+    assert poller.pending() == 0
+
+
+def test_unexpected_error_fails_the_job_and_poller_restarts(monkeypatch):
+    def boom(*args, **kwargs):
+        raise RuntimeError('boom')
+    monkeypatch.setattr('auto_post.flow_poller.transport.get', boom)
+
+    poller = _poller(timeout=5)
+    assert poller.wait('j1') is None
+    assert poller.pending() == 0
+
+    monkeypatch.setattr('auto_post.flow_poller.transport.get',
+                        lambda *a, **kw: _Response({'status': 'completed'}))
+    assert poller.wait('j2') == {'status': 'completed'}
+
+
+def test_wait_gives_up_after_its_own_deadline(monkeypatch):
+    monkeypatch.setattr('auto_post.flow_poller._WAIT_MARGIN', 0)
+    poller = _poller(timeout=0)
+    poller._thread = object()   # a poller that never answers
+    assert poller.wait('j1') is None
+    assert poller.pending() == 0
@@ -0,0 +1,147 @@
+"""
+MutationBatcher (mutations.py) against a fake Sanity mutate endpoint:
+batching, retries, and how a rejected transaction is narrowed down.
+"""
+
+import json
+
+import pytest
+
+from auto_post import mutations
+
+
+class FakeResponse:
+    def __init__(self, status_code, body):
+        self.status_code = status_code
+        self._body = body
+        self.text = json.dumps(body)
+
+    def json(self):
+        return self._body
+
+
+class FakeSanity:
+    """Commits transactions like Sanity; `replies` overrides the next responses."""
+
+    def __init__(self, missing=(), replies=()):
+        self.missing = set(missing)      # patch targets that don't exist
+        self.replies = list(replies)
+        self.documents = {}
+        self.requests = []
+
+    def post(self, url, params, headers, json, timeout):
+        self.requests.append(json['mutations'])
+        if self.replies:
+            reply = self.replies.pop(0)
+            if isinstance(reply, Exception):
+                raise reply
+            if reply is not None:
+                return reply
+        results, errors, staged = [], [], {}
+        for i, mutation in enumerate(json['mutations']):
+            (operation, body), = mutation.items()
+            doc_id = body.get('id') or body.get('_id')
+            if operation == 'patch' and doc_id in self.missing:
+                errors.append({'index': i, 'error': {'description': f'Document "{doc_id}" not found'}})
+            elif operation == 'createIfNotExists' and doc_id in self.documents:
+                results.append({'id': doc_id, 'operation': 'none'})
+            else:
+                results.append({'id': doc_id, 'operation': 'update' if operation == 'patch' else 'create'})
+                staged[doc_id] = body
+        if errors:
+            # All-or-nothing: nothing in the transaction is kept
+            return FakeResponse(409, {'error': {'type': 'mutationError', 'description': 'failed', 'items': errors}})
+        self.documents.update(staged)
+        return FakeResponse(200, {'transactionId': 'tx', 'results': results})
+
+
+@pytest.fixture
+def sanity(monkeypatch):
+    def install(**kwargs):
+        fake = FakeSanity(**kwargs)
+        monkeypatch.setattr(mutations.transport, 'post', fake.post)
+        monkeypatch.setattr(mutations, '_RETRY_BACKOFF', 0)
+        return fake
+    return install
+
+
+def _patch_all(batcher, ids):
+    for doc_id in ids:
+        batcher.patch(doc_id, {'title': doc_id})
+    batcher.flush()
+
+
+def test_batches_mutations_into_transactions(sanity):
+    fake = sanity()
+    batcher = mutations.MutationBatcher(batch_size=3)
+    _patch_all(batcher, [f'doc{i}' for i in range(7)])
+    assert [len(request) for request in fake.requests] == [3, 3, 1]
+    assert all(outcome.ok for outcome in batcher.outcomes.values())
+    assert len(batcher.outcomes) == 7
+
+
+def test_transient_errors_retry_the_same_transaction(sanity):
+    fake = sanity(replies=[FakeResponse(503, {}), mutations.requests.ConnectionError('reset')])
+    batcher = mutations.MutationBatcher(batch_size=5, max_retries=3)
+    _patch_all(batcher, ['a', 'b', 'c'])
+    assert len(fake.requests) == 3
+    assert all(outcome.ok for outcome in batcher.outcomes.values())
+
+
+def test_transient_errors_give_up_after_max_retries(sanity):
+    fake = sanity(replies=[FakeResponse(503, {})] * 3)
+    batcher = mutations.MutationBatcher(batch_size=5, max_retries=2)
+    _patch_all(batcher, ['a', 'b'])
+    assert len(fake.requests) == 3
+    assert not any(outcome.ok for outcome in batcher.outcomes.values())
+
+
+def test_mutation_error_fails_named_documents_and_resends_the_rest(sanity):
+    fake = sanity(missing={'b', 'd'})
+    batcher = mutations.MutationBatcher(batch_size=10)
+    _patch_all(batcher, ['a', 'b', 'c', 'd', 'e'])
+    assert [len(request) for request in fake.requests] == [5, 3]
+    assert {ref for ref, outcome in batcher.outcomes.items() if not outcome.ok} == {'b', 'd'}
+    assert 'not found' in batcher.outcomes['b'].error
+    assert set(fake.documents) == {'a', 'c', 'e'}
+
+
+def test_unattributed_mutation_error_is_bisected(sanity):
+    unattributed = FakeResponse(409, {'error': {'type': 'mutationError', 'description': 'conflict'}})
+    fake = sanity(replies=[unattributed, None, unattributed, unattributed, None])
+    batcher = mutations.MutationBatcher(batch_size=10)
+    _patch_all(batcher, ['a', 'b', 'c', 'd'])
+    # [a b c d] -> [a b] ok, [c d] -> [c] fails, [d] ok
+    assert [len(request) for request in fake.requests] == [4, 2, 2, 1, 1]
+    assert not batcher.outcomes['c'].ok
+    assert all(batcher.outcomes[ref].ok for ref in 'abd')
+
+
+@pytest.mark.parametrize('status', [400, 401, 403, 413])
+def test_non_mutation_errors_fail_the_whole_transaction_at_once(sanity, status):
+    fake = sanity(replies=[FakeResponse(status, {'error': {'description': 'nope'}})])
+    batcher = mutations.MutationBatcher(batch_size=50)
+    _patch_all(batcher, [f'doc{i}' for i in range(50)])
+    assert len(fake.requests) == 1
+    assert not any(outcome.ok for outcome in batcher.outcomes.values())
+    assert batcher.outcomes['doc0'].error.startswith(str(status))
+
+
+def test_resent_create_after_lost_response_succeeds(sanity, monkeypatch):
+    fake = sanity()
+    # The first attempt commits but the response is lost; the resend must not fail
+    original_post = fake.post
+
+    def lose_first_response(*args, **kwargs):
+        response = original_post(*args, **kwargs)
+        if len(fake.requests) == 1:
+            raise mutations.requests.ConnectionError('response lost')
+        return response
+    monkeypatch.setattr(mutations.transport, 'post', lose_first_response)
+
+    with mutations.MutationBatcher() as batcher:
+        batcher.create({'_type': 'blogPost', 'title': 'Hello'}, ref='post')
+    outcome = batcher.outcomes['post']
+    assert outcome.ok
+    assert len(fake.requests) == 2
+    assert list(fake.documents) == [outcome.id]
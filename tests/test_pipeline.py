@@ -0,0 +1,31 @@
+"""
+StageGraph (pipeline.py): stages always resolve, even across shutdown.
+"""
+
+import time
+
+import pytest
+
+from auto_post.pipeline import StageGraph
+
+
+def test_dependent_stage_runs_after_the_with_block():
+    with StageGraph(max_workers=2) as graph:
+        graph.add('a', lambda: time.sleep(0.2) or 'a')
+        graph.add('b', lambda: graph.result('a') + 'b', requires=['a'])
+    assert graph.result('b') == 'ab'
+
+
+def test_stage_submitted_after_shutdown_resolves_to_none():
+    graph = StageGraph(max_workers=1)
+    graph.add('a', lambda: time.sleep(0.2) or 'a')
+    graph.add('b', lambda: 'b', requires=['a'])
+    graph._executor.shutdown(wait=False)
+    assert graph.result('b') is None
+
+
+def test_unknown_dependency_does_not_register_the_stage():
+    with StageGraph() as graph:
+        with pytest.raises(KeyError):
+            graph.add('b', lambda: 'b', requires=['missing'])
+        assert not graph.has('b')
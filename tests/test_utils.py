@@ -0,0 +1,27 @@
+"""
+write_json_atomic (utils.py): readable, complete files and no temp leftovers.
+"""
+
+import os
+import json
+import stat
+
+import pytest
+
+from auto_post.utils import write_json_atomic
+
+
+def test_written_file_is_world_readable(tmp_path):
+    path = tmp_path / 'state.json'
+    write_json_atomic(str(path), {'a': 1}, indent=2)
+    assert json.loads(path.read_text()) == {'a': 1}
+    assert stat.S_IMODE(os.stat(path).st_mode) == 0o644
+
+
+def test_failed_write_keeps_old_file_and_leaves_no_temp(tmp_path):
+    path = tmp_path / 'state.json'
+    write_json_atomic(str(path), {'a': 1})
+    with pytest.raises(TypeError):
+        write_json_atomic(str(path), {'a': object()})
+    assert json.loads(path.read_text()) == {'a': 1}
+    assert os.listdir(tmp_path) == ['state.json']
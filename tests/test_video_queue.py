@@ -0,0 +1,68 @@
+"""
+VideoQueue (video_queue.py): retry backoff and lease ownership.
+"""
+
+import sqlite3
+
+from auto_post.video_queue import VideoQueue
+
+
+def _queue(tmp_path, **kwargs):
+    kwargs.setdefault('retry_delay', 60)
+    return VideoQueue(path=str(tmp_path / 'queue.db'), max_attempts=3, **kwargs)
+
+
+def test_failed_job_waits_out_its_backoff(tmp_path, monkeypatch):
+    queue = _queue(tmp_path)
+    job_id = queue.enqueue({'slug': 'a'})
+    clock = [1000.0]
+    monkeypatch.setattr('auto_post.video_queue.time.time', lambda: clock[0])
+
+    assert queue.claim('w1')['id'] == job_id
+    assert queue.fail(job_id, 'captcha', 'w1') == 'queued'
+    assert queue.claim('w1') is None
+    assert queue.next_retry_at() == 1060
+
+    clock[0] = 1061
+    assert queue.claim('w1')['attempts'] == 2
+    assert queue.fail(job_id, 'captcha', 'w1') == 'queued'
+    assert queue.next_retry_at() == 1061 + 120   # doubled per attempt
+
+    clock[0] = 1200
+    queue.claim('w1')
+    assert queue.fail(job_id, 'captcha', 'w1') == 'failed'
+    assert queue.next_retry_at() is None
+
+
+def test_only_the_lease_holder_can_finish_a_job(tmp_path, monkeypatch):
+    queue = _queue(tmp_path, lease=10)
+    job_id = queue.enqueue({'slug': 'a'})
+    clock = [1000.0]
+    monkeypatch.setattr('auto_post.video_queue.time.time', lambda: clock[0])
+
+    queue.claim('stale')
+    clock[0] = 1011                      # lease expired, another worker takes over
+    assert queue.claim('fresh')['worker'] == 'fresh'
+
+    assert queue.complete(job_id, ['x.mp4'], 'stale') is False
+    assert queue.fail(job_id, 'late error', 'stale') is None
+    job = queue.jobs()[0]
+    assert (job['status'], job['worker'], job['error']) == ('running', 'fresh', None)
+
+    assert queue.complete(job_id, ['y.mp4'], 'fresh') is True
+    assert queue.jobs()[0]['result'] == ['y.mp4']
+
+
+def test_adds_backoff_column_to_an_existing_queue(tmp_path):
+    path = str(tmp_path / 'queue.db')
+    conn = sqlite3.connect(path)
+    conn.execute('''CREATE TABLE jobs (
+        id INTEGER PRIMARY KEY AUTOINCREMENT, slug TEXT NOT NULL, article TEXT NOT NULL,
+        options TEXT NOT NULL, status TEXT NOT NULL DEFAULT 'queued', attempts INTEGER NOT NULL DEFAULT 0,
+        worker TEXT, lease_until REAL, result TEXT, error TEXT, created_at REAL NOT NULL, updated_at REAL NOT NULL)''')
+    conn.execute("INSERT INTO jobs (slug, article, options, created_at, updated_at) VALUES ('a', '{}', '{}', 0, 0)")
+    conn.commit()
+    conn.close()
+
+    queue = VideoQueue(path=path)
+    assert queue.claim('w1')['slug'] == 'a'
@@ -0,0 +1,79 @@
+"""
+web_app.py log capture with parallel variants: prints from the variant
+threads generate_three_videos() starts (and from pools they start in turn)
+must land in their own job's log, never in another job's or on stdout.
+"""
+
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+pytest.importorskip('flask')
+
+import web_app
+from auto_post import video
+
+
+def _fake_variant(article_data, variant_suffix='', precomputed_prompt=None):
+    slug = article_data['slug']
+    print(f"{slug} variant {variant_suffix} start")
+
+    def clip(i):
+        time.sleep(0.01)
+        print(f"{slug} variant {variant_suffix} clip {i}")
+
+    # Variants fan out further (downloads, clip polling) in their own pools
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        list(pool.map(clip, range(3)))
+    return f"/tmp/{slug}{variant_suffix}.mp4"
+
+
+@pytest.fixture
+def fake_pipeline(monkeypatch, tmp_path):
+    monkeypatch.setattr(video, 'VIDEOS_DIR', str(tmp_path))
+    monkeypatch.setattr(video, 'generate_video_prompt', lambda article_data, **kwargs: 'prompt')
+    monkeypatch.setattr(video, 'generate_tiktok_video_flow', _fake_variant)
+    monkeypatch.setattr(web_app.os.path, 'getsize', lambda path: 1024 * 1024)
+    monkeypatch.setattr(web_app, 'upload_to_drive', lambda path: None)
+
+
+def _start_job(slug):
+    job_id = f'job-{slug}'
+    with web_app.jobs_lock:
+        web_app.jobs[job_id] = {'status': 'running', 'log_queue': queue.Queue(),
+                                'drive_links': [], 'local_files': [], 'error': None}
+    thread = threading.Thread(target=web_app.run_job,
+                              args=(job_id, {'slug': slug}, 'a script', '', '',
+                                    ['static', 'walk-and-talk', 'location-tour']))
+    thread.start()
+    return job_id, thread
+
+
+def _drain(job_id):
+    log_q = web_app.jobs[job_id]['log_queue']
+    lines = []
+    while True:
+        line = log_q.get(timeout=5)
+        if line is None:
+            return lines
+        lines.append(line)
+
+
+def test_parallel_variant_logs_stay_with_their_job(fake_pipeline, capsys):
+    started = [_start_job(slug) for slug in ('alpha', 'beta')]
+    for _, thread in started:
+        thread.join(timeout=10)
+
+    for (job_id, _), slug, other in zip(started, ('alpha', 'beta'), ('beta', 'alpha')):
+        lines = _drain(job_id)
+        assert web_app.jobs[job_id]['status'] == 'done'
+        assert 'Generating 3 videos in parallel...' in '\n'.join(lines)
+        for suffix in ('_v1', '_v2', '_v3'):
+            assert f"{slug} variant {suffix} start" in lines
+            assert all(f"{slug} variant {suffix} clip {i}" in lines for i in range(3))
+        assert not any(line.startswith(other) for line in lines)
+
+    assert 'variant' not in capsys.readouterr().out
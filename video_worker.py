@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Drain the video job queue filled by run.py.
+
+Claims queued jobs (and jobs whose worker crashed mid-run) from
+video_queue.db, generates each article's TikTok variants with
+generate_three_videos, and records the result. Runs until nothing is
+claimable; failed jobs still in their retry backoff are left for the next
+run rather than waited out. Exits non-zero if a job ran out of attempts
+(a failed attempt that will be retried doesn't fail the run).
+
+Usage:
+    python video_worker.py                 # drain the queue
+    python video_worker.py --workers 2     # run two jobs at once
+    python video_worker.py --status        # show queue counts and recent jobs
+    python video_worker.py --retry-failed  # requeue failed jobs, then drain
+
+Environment variables: as for run.py (GEMINI_API_KEY, USEAPI_TOKEN,
+USEAPI_GOOGLE_EMAIL), plus VIDEO_WORKER_CONCURRENCY, VIDEO_JOB_LEASE,
+VIDEO_JOB_MAX_ATTEMPTS and VIDEO_JOB_RETRY_DELAY.
+"""
+
+import sys
+import argparse
+import threading
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+
+from auto_post import generate_three_videos
+from auto_post.config import VIDEO_WORKER_CONCURRENCY
+from auto_post.encoding import get_capabilities
+from auto_post.llm import get_llm
+from auto_post.video_queue import VideoQueue, worker_id
+
+
+def _renew_lease(queue, job_id, worker, stop):
+    """Keep the job's lease alive while it runs (renews at a third of the lease)."""
+    while not stop.wait(queue.lease / 3):
+        if not queue.renew(job_id, worker):
+            print(f"  Video job {job_id}: lease lost")
+            return
+
+
+def run_job(queue, job, worker):
+    """Generate one job's videos. Returns the job's new status: 'done',
+    'queued' (will retry), 'failed' (out of attempts), or None if the lease
+    was taken over."""
+    article = job['article']
+    print(f"\n{'='*60}")
+    print(f"  Video job {job['id']} (attempt {job['attempts']}/{queue.max_attempts}): "
+          f"{article.get('title', job['slug'])[:50]}")
+    print(f"{'='*60}")
+
+    stop = threading.Event()
+    renewer = threading.Thread(target=_renew_lease, args=(queue, job['id'], worker, stop), daemon=True)
+    renewer.start()
+    try:
+        paths = generate_three_videos(article, **job['options'])
+        error = None if paths else 'no videos generated'
+    except Exception as e:
+        paths, error = [], str(e)
+    finally:
+        stop.set()
+        renewer.join()
+
+    if error is None:
+        if not queue.complete(job['id'], paths, worker):
+            print(f"  Video job {job['id']}: lease was taken over, result not recorded")
+            return None
+        print(f"  Video job {job['id']} done: {len(paths)} video(s)")
+        for path in paths:
+            print(f"    - {path}")
+        return 'done'
+    status = queue.fail(job['id'], error, worker)
+    if status is None:
+        print(f"  Video job {job['id']} failed: {error} (lease was taken over, not recorded)")
+    else:
+        print(f"  Video job {job['id']} failed: {error} ({'will retry' if status == 'queued' else 'giving up'})")
+    return status
+
+
+def worker_loop(queue, slot):
+    """Claim and run jobs until none is claimable.
+    Returns (succeeded, failed attempts, jobs given up on)."""
+    worker = f"{worker_id()}/{slot}"
+    succeeded = failed = given_up = 0
+    while True:
+        job = queue.claim(worker)
+        if job is None:
+            return succeeded, failed, given_up
+        status = run_job(queue, job, worker)
+        if status == 'done':
+            succeeded += 1
+        else:
+            failed += 1
+            if status == 'failed':
+                given_up += 1
+
+
+def drain(queue, workers):
+    """Run `workers` claim loops in parallel until nothing is claimable.
+    Returns True unless a job ran out of attempts."""
+    workers = max(1, workers)
+    print(f"Video worker: {queue.counts()['queued']} queued job(s), {workers} worker(s)")
+    print(f"ffmpeg: {get_capabilities().describe()}")
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        results = list(executor.map(lambda slot: worker_loop(queue, slot), range(workers)))
+    succeeded = sum(r[0] for r in results)
+    failed = sum(r[1] for r in results)
+    given_up = sum(r[2] for r in results)
+    print(f"\nVideo worker finished: {succeeded} job(s) succeeded, {failed} attempt(s) failed, "
+          f"{given_up} job(s) out of attempts")
+    retry_at = queue.next_retry_at()
+    if retry_at is not None:
+        # Backoffs run to many minutes; don't hold the runner, the next run claims them
+        waiting = datetime.fromtimestamp(retry_at).strftime('%Y-%m-%d %H:%M')
+        print(f"  {queue.counts()['queued']} job(s) waiting to retry (next from {waiting}), left for the next run")
+    print(get_llm().report())
+    return given_up == 0
+
+
+def print_status(queue, limit):
+    counts = queue.counts()
+    print("Video queue: " + ", ".join(f"{count} {state}" for state, count in counts.items()))
+    for job in queue.jobs(limit):
+        updated = datetime.fromtimestamp(job['updated_at']).strftime('%Y-%m-%d %H:%M')
+        line = f"  #{job['id']:<4} {job['status']:<8} {job['attempts']}x  {updated}  {job['slug'][:50]}"
+        if job['status'] == 'done':
+            line += f"  ({len(job['result'])} video(s))"
+        elif job['error']:
+            line += f"  - {job['error'][:60]}"
+        print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate queued TikTok videos.")
+    parser.add_argument('--workers', type=int, default=VIDEO_WORKER_CONCURRENCY,
+                        help=f"jobs to run at once (default {VIDEO_WORKER_CONCURRENCY})")
+    parser.add_argument('--status', action='store_true', help="show queue status and exit")
+    parser.add_argument('--limit', type=int, default=20, help="jobs listed by --status")
+    parser.add_argument('--retry-failed', action='store_true', help="requeue failed jobs before draining")
+    args = parser.parse_args()
+
+    queue = VideoQueue()
+    if args.status:
+        print_status(queue, args.limit)
+        return
+    if args.retry_failed:
+        print(f"Requeued {queue.retry_failed()} failed job(s)")
+    if not drain(queue, args.workers):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -76,6 +76,8 @@ _TPE.submit = _propagating_submit
 
 # ── Import video module (after print patch so its prints are capturable) ─────
 from auto_post.video import generate_three_videos
+from auto_post.encoding import get_encoder, get_capabilities
+from auto_post.llm import get_llm
 
 from flask import Flask, request, jsonify, Response, stream_with_context, send_file
 
@@ -140,7 +142,7 @@ def run_job(job_id: str, article_data: dict, script: str, setting: str,
             custom_setting=setting,
             custom_actions=actions,
             formats=formats,
-            parallel=False,
+            parallel=True,  # the shared Flow governor keeps variants from tripping captchas
         )
 
         drive_links = []
@@ -498,6 +500,16 @@ def status(job_id):
     })
 
 
+@app.route('/encoder')
+def encoder_status():
+    return jsonify(get_encoder().stats())
+
+
+@app.route('/llm')
+def llm_status():
+    return jsonify(get_llm().stats())
+
+
 @app.route('/download/<job_id>/<filename>')
 def download(job_id, filename):
     with jobs_lock:
@@ -512,4 +524,5 @@ def download(job_id, filename):
 
 if __name__ == '__main__':
     port = int(os.environ.get('PORT', 5000))
+    print(f"ffmpeg: {get_capabilities().describe()}")
     app.run(host='0.0.0.0', port=port, threaded=True)